@@ -0,0 +1,122 @@
+"""
+Benchmark: vectorized analytics functions vs. the per-ticker loops the LLM
+usually writes (see coding/fetch_and_plot_stocks.py).
+
+Runs offline on synthetic prices and checks that both versions agree.
+
+Usage:
+    python benchmark_analytics.py --tickers 2000 --days 252
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from stock_analytics import (
+    correlation_matrix,
+    drawdowns,
+    normalized_returns,
+    rolling_volatility,
+    top_movers,
+)
+
+
+def make_prices(tickers, days, seed=0):
+    rng = np.random.default_rng(seed)
+    log_returns = rng.normal(0.0003, 0.02, size=(days, tickers))
+    prices = 100 * np.exp(np.cumsum(log_returns, axis=0))
+    index = pd.bdate_range("2025-01-01", periods=days)
+    return pd.DataFrame(prices, index=index, columns=[f"T{i:05d}" for i in range(tickers)])
+
+
+# --------------------------------------------------------------------------------
+# Loop baselines (what generated code typically does)
+# --------------------------------------------------------------------------------
+def loop_normalized_returns(prices):
+    out = {}
+    for ticker in prices.columns:
+        out[ticker] = (prices[ticker] / prices[ticker].iloc[0] - 1) * 100
+    return pd.DataFrame(out)
+
+
+def loop_rolling_volatility(prices, window=21):
+    out = {}
+    for ticker in prices.columns:
+        log_returns = np.log(prices[ticker]).diff()
+        out[ticker] = log_returns.rolling(window, min_periods=window).std() * np.sqrt(252)
+    return pd.DataFrame(out)
+
+
+def loop_drawdowns(prices):
+    out = {}
+    for ticker in prices.columns:
+        peak = prices[ticker].iloc[0]
+        values = []
+        for price in prices[ticker]:
+            peak = max(peak, price)
+            values.append(price / peak - 1)
+        out[ticker] = pd.Series(values, index=prices.index)
+    return pd.DataFrame(out)
+
+
+def loop_correlation_matrix(prices):
+    returns = prices.pct_change().iloc[1:]
+    tickers = list(prices.columns)
+    matrix = pd.DataFrame(index=tickers, columns=tickers, dtype="float64")
+    for a in tickers:
+        for b in tickers:
+            matrix.loc[a, b] = returns[a].corr(returns[b])
+    return matrix
+
+
+def loop_top_movers(prices, n=5):
+    gains = {}
+    for ticker in prices.columns:
+        gains[ticker] = (prices[ticker].iloc[-1] / prices[ticker].iloc[0] - 1) * 100
+    return pd.Series(gains).sort_values(ascending=False).head(n)
+
+
+def timed(fn, *args, repeat=3):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tickers", type=int, default=2000)
+    parser.add_argument("--days", type=int, default=252)
+    # The pairwise loop is O(tickers^2) Python calls, so it gets its own, smaller size.
+    parser.add_argument("--corr-tickers", type=int, default=150)
+    args = parser.parse_args()
+
+    prices = make_prices(args.tickers, args.days)
+    corr_prices = prices.iloc[:, : args.corr_tickers]
+
+    cases = [
+        ("normalized_returns", normalized_returns, loop_normalized_returns, prices),
+        ("rolling_volatility", rolling_volatility, loop_rolling_volatility, prices),
+        ("drawdowns", drawdowns, loop_drawdowns, prices),
+        ("correlation_matrix", correlation_matrix, loop_correlation_matrix, corr_prices),
+        ("top_movers", top_movers, loop_top_movers, prices),
+    ]
+
+    print(f"\n{args.tickers} tickers x {args.days} days "
+          f"(correlation: {corr_prices.shape[1]} tickers)\n")
+    print(f"{'Function':<22}{'Vectorized':>12}{'Loop':>12}{'Speedup':>10}  Match")
+    for name, fast, slow, data in cases:
+        fast_time, fast_result = timed(fast, data)
+        slow_time, slow_result = timed(slow, data, repeat=1)
+        match = np.allclose(
+            np.asarray(fast_result, dtype="float64"),
+            np.asarray(slow_result, dtype="float64"),
+            equal_nan=True,
+        )
+        print(f"{name:<22}{fast_time * 1000:>10.1f}ms{slow_time * 1000:>10.1f}ms"
+              f"{slow_time / fast_time:>9.1f}x  {'yes' if match else 'NO'}")
@@ -0,0 +1,92 @@
+"""
+Benchmark: fast plotting path (Agg + LTTB downsampling + process pool) vs. the
+original `plot_stock_prices`.
+
+Two offline scenarios on synthetic data:
+1. Long intraday history: a few tickers with hundreds of thousands of points.
+2. Many tickers: hundreds of daily series in one figure.
+Plus a batch of figures rendered serially vs. in a process pool.
+
+Usage:
+    python benchmark_plotting.py --out bench_plots
+"""
+
+import argparse
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+from fast_plotting import render_batch, render_price_figure
+
+
+def original_plot_stock_prices(stock_prices, filename):
+    """Same drawing code as plot_stock_prices in financial_analysis.py
+    (copied so the benchmark does not need the agent setup or an API key)."""
+    import matplotlib
+    matplotlib.use("Agg")  # headless benchmark; the original uses the default backend
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(10, 5))
+    for column in stock_prices.columns:
+        plt.plot(stock_prices.index, stock_prices[column], label=column)
+    plt.title("Stock Prices")
+    plt.xlabel("Date")
+    plt.ylabel("Price")
+    plt.grid(True)
+    plt.legend()
+    plt.savefig(filename)
+    plt.close()
+
+
+def make_prices(points, tickers, freq, seed=0):
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0, 0.001, size=(points, tickers))
+    index = pd.date_range("2020-01-01", periods=points, freq=freq)
+    return pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), index=index,
+                        columns=[f"T{i:03d}" for i in range(tickers)])
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--out", default="bench_plots")
+    parser.add_argument("--intraday-points", type=int, default=300_000)
+    parser.add_argument("--tickers", type=int, default=300)
+    parser.add_argument("--batch", type=int, default=8)
+    parser.add_argument("--max-points", type=int, default=2000)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+
+    scenarios = [
+        ("intraday", make_prices(args.intraday_points, 4, "min")),
+        ("many tickers", make_prices(2520, args.tickers, "B")),
+    ]
+
+    print(f"\n{'Scenario':<14}{'Original':>11}{'Fast':>10}{'Speedup':>9}{'Orig KB':>10}{'Fast KB':>9}")
+    for name, prices in scenarios:
+        slug = name.replace(" ", "_")
+        orig_file = os.path.join(args.out, f"{slug}_original.png")
+        fast_file = os.path.join(args.out, f"{slug}_fast.png")
+        t_orig = timed(original_plot_stock_prices, prices, orig_file)
+        t_fast = timed(render_price_figure, prices, fast_file, max_points=args.max_points)
+        print(f"{name:<14}{t_orig:>10.2f}s{t_fast:>9.2f}s{t_orig / t_fast:>8.1f}x"
+              f"{os.path.getsize(orig_file) / 1024:>10.0f}{os.path.getsize(fast_file) / 1024:>9.0f}")
+
+    # Batch: same figures, serial vs. process pool.
+    prices = scenarios[0][1]
+    jobs = [(prices, os.path.join(args.out, f"batch_{i}.png")) for i in range(args.batch)]
+    t_serial = timed(render_batch, jobs, max_workers=1, max_points=args.max_points)
+    t_pool = timed(render_batch, jobs, max_points=args.max_points)
+    print(f"\nBatch of {args.batch} figures: serial {t_serial:.2f}s, "
+          f"process pool {t_pool:.2f}s ({t_serial / t_pool:.1f}x)")
+
+    if args.out == "bench_plots":
+        shutil.rmtree(args.out)
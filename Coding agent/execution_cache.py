@@ -0,0 +1,228 @@
+"""
+Result cache for executed code blocks.
+
+When the code writer / code executor loop retries, the same code block is often
+executed again unchanged, repeating the download and plot work. `CachedCodeExecutor`
+wraps any AutoGen code executor (LocalCommandLineCodeExecutor, the Docker executor,
+WarmKernelCodeExecutor...) and replays earlier results instead.
+
+Cache key:
+    the code blocks (language + code),
+    a hash of the registered functions' source,
+    fingerprints (content hashes) of the workspace files the run read.
+
+A run's "inputs" are the workspace files that existed before it and were left
+unchanged; its "artifacts" are the files it created or modified. On a hit, the
+stored output and exit code are returned and the artifacts are restored into the
+workspace. If any input file changed since, or the entry is older than `ttl`
+seconds (code that depends on the date or on live data goes stale), the entry is
+invalid and the code runs again. Only successful runs are cached unless
+`cache_failures=True`.
+
+Layout (default `<work_dir>/.exec_cache`):
+    entries/<key>.json   result, input fingerprints, artifact blob ids
+    blobs/<sha256>       artifact contents
+
+Stateful executors (`stateful = True`, e.g. WarmKernelCodeExecutor) are rejected:
+a hit does not run the block, so the variables it defines would be missing from the
+kernel, and the result of a block depends on the blocks run before it. Wrap a
+stateless executor (one process per block) instead.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import time
+
+from autogen.coding.base import CommandLineCodeResult
+
+_SKIP_DIRS = {"__pycache__"}
+_CODE_FILE_PREFIX = "tmp_code_"
+_CHUNK = 1 << 20
+DEFAULT_TTL = 3600
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def functions_hash(functions):
+    """Hash of the source of the functions registered with an executor."""
+    digest = hashlib.sha256()
+    for func in functions or []:
+        func = getattr(func, "func", func)  # FunctionWithRequirements
+        try:
+            digest.update(inspect.getsource(func).encode())
+        except (OSError, TypeError):
+            digest.update(repr(func).encode())
+    return digest.hexdigest()
+
+
+class CachedCodeExecutor:
+    """Code executor wrapper that replays results of previously executed blocks.
+
+    Args:
+        executor: The AutoGen code executor to wrap (must have `work_dir`).
+        cache_dir (str): Defaults to `<work_dir>/.exec_cache`.
+        cache_failures (bool): Also replay runs with a non-zero exit code.
+        ttl (float): Seconds an entry stays valid; None keeps entries until an
+            input file changes.
+    """
+
+    def __init__(self, executor, cache_dir=None, cache_failures=False, ttl=DEFAULT_TTL):
+        if getattr(executor, "stateful", False):
+            raise ValueError(
+                f"{type(executor).__name__} keeps state between blocks; replayed blocks would not "
+                "define their variables in it. Cache a stateless executor instead.")
+        self.executor = executor
+        self.work_dir = os.path.abspath(str(executor.work_dir))
+        self.cache_dir = cache_dir or os.path.join(self.work_dir, ".exec_cache")
+        self.cache_failures = cache_failures
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        # path -> (size, mtime_ns, sha256), so unchanged files are not re-hashed.
+        self._hash_memo = {}
+        os.makedirs(os.path.join(self.cache_dir, "entries"), exist_ok=True)
+        os.makedirs(os.path.join(self.cache_dir, "blobs"), exist_ok=True)
+
+    # ----------------------------------------------------------------------------
+    # CodeExecutor protocol
+    # ----------------------------------------------------------------------------
+    @property
+    def code_extractor(self):
+        return self.executor.code_extractor
+
+    def restart(self):
+        self.executor.restart()
+
+    def __getattr__(self, name):
+        # format_functions_for_prompt, functions, timeout, ... of the wrapped executor.
+        if name == "executor":
+            raise AttributeError(name)
+        return getattr(self.executor, name)
+
+    def execute_code_blocks(self, code_blocks):
+        key = self._key(code_blocks)
+        entry = self._load_entry(key)
+        if entry is not None:
+            if not self._expired(entry) and self._inputs_unchanged(entry["inputs"]):
+                self.hits += 1
+                self._restore_artifacts(entry["artifacts"])
+                result = dict(entry["result"])
+                if result["code_file"] is not None:
+                    result["code_file"] = os.path.join(self.work_dir, result["code_file"])
+                return CommandLineCodeResult(**result)
+            self.invalidations += 1
+        self.misses += 1
+
+        before = self._snapshot()
+        result = self.executor.execute_code_blocks(code_blocks)
+        if result.exit_code == 0 or self.cache_failures:
+            self._store_entry(key, result, before, self._snapshot())
+        return result
+
+    # ----------------------------------------------------------------------------
+    # Keys and fingerprints
+    # ----------------------------------------------------------------------------
+    def _key(self, code_blocks):
+        payload = {
+            "executor": type(self.executor).__name__,
+            "blocks": [[block.language.lower(), block.code] for block in code_blocks],
+            "functions": functions_hash(getattr(self.executor, "functions", None)),
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def _fingerprint(self, path):
+        stat = os.stat(path)
+        memo = self._hash_memo.get(path)
+        if memo and memo[0] == stat.st_size and memo[1] == stat.st_mtime_ns:
+            return memo[2]
+        sha = _sha256_file(path)
+        self._hash_memo[path] = (stat.st_size, stat.st_mtime_ns, sha)
+        return sha
+
+    def _snapshot(self):
+        """relative path -> content hash for every workspace file (hidden dirs excluded)."""
+        files = {}
+        for root, dirs, names in os.walk(self.work_dir):
+            dirs[:] = [d for d in dirs if not d.startswith(".") and d not in _SKIP_DIRS]
+            for name in names:
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, self.work_dir)] = self._fingerprint(path)
+        return files
+
+    def _expired(self, entry):
+        return self.ttl is not None and time.time() - entry.get("created", 0) > self.ttl
+
+    def _inputs_unchanged(self, inputs):
+        for rel, sha in inputs.items():
+            path = os.path.join(self.work_dir, rel)
+            if not os.path.exists(path) or self._fingerprint(path) != sha:
+                return False
+        return True
+
+    # ----------------------------------------------------------------------------
+    # Entries and artifacts
+    # ----------------------------------------------------------------------------
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, "entries", key + ".json")
+
+    def _load_entry(self, key):
+        try:
+            with open(self._entry_path(key), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _store_entry(self, key, result, before, after):
+        # Code files written by the executor for other blocks are not inputs.
+        inputs = {
+            rel: sha for rel, sha in before.items()
+            if after.get(rel) == sha and not os.path.basename(rel).startswith(_CODE_FILE_PREFIX)
+        }
+        artifacts = {rel: sha for rel, sha in after.items() if before.get(rel) != sha}
+        for rel, sha in artifacts.items():
+            blob = os.path.join(self.cache_dir, "blobs", sha)
+            if not os.path.exists(blob):
+                shutil.copyfile(os.path.join(self.work_dir, rel), blob)
+        code_file = getattr(result, "code_file", None)
+        if code_file is not None:
+            # Relative, so the cache still works if the workspace is moved or copied.
+            code_file = os.path.relpath(os.path.abspath(code_file), self.work_dir)
+        entry = {
+            "result": {"exit_code": result.exit_code, "output": result.output, "code_file": code_file},
+            "created": time.time(),
+            "inputs": inputs,
+            "artifacts": artifacts,
+        }
+        tmp = self._entry_path(key) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, self._entry_path(key))
+
+    def _restore_artifacts(self, artifacts):
+        for rel, sha in artifacts.items():
+            path = os.path.join(self.work_dir, rel)
+            if os.path.exists(path) and self._fingerprint(path) == sha:
+                continue
+            blob = os.path.join(self.cache_dir, "blobs", sha)
+            if os.path.exists(blob):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                shutil.copyfile(blob, path)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
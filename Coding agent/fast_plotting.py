@@ -0,0 +1,151 @@
+"""
+Fast plotting path for large price series.
+
+`plot_stock_prices` draws every point of every column through pyplot on the default
+backend. With long intraday histories or hundreds of tickers, rendering becomes the
+slowest step of the agent loop. This module:
+
+* renders with the non-interactive Agg canvas (no pyplot state, no GUI backend),
+* downsamples each series with LTTB (Largest-Triangle-Three-Buckets), which keeps the
+  visual shape - peaks, troughs and trends - while drawing a fixed number of points,
+* renders batches of figures in a process pool.
+
+The executor-facing wrappers live in financial_analysis.py; see benchmark_plotting.py
+for render time and file size against the original function.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling.
+
+    Args:
+        x (numpy.ndarray): Monotonic x values (float).
+        y (numpy.ndarray): y values, same length as x, without NaNs.
+        n_out (int): Number of points to keep (>= 3).
+
+    Returns:
+        numpy.ndarray: Indices of the selected points, sorted.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # First and last points are always kept; the rest is split into n_out - 2 buckets.
+    every = (n - 2) / (n_out - 2)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo = int(i * every) + 1
+        hi = int((i + 1) * every) + 1
+        # Average of the next bucket (or the last point) is the third triangle vertex.
+        nlo, nhi = hi, min(int((i + 2) * every) + 1, n)
+        if i == n_out - 3:
+            nlo, nhi = n - 1, n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        ax, ay = x[a], y[a]
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        a = lo + int(np.argmax(areas))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample(series, max_points):
+    """Return `series` (pandas.Series) reduced to about `max_points` with LTTB.
+
+    Series shorter than twice `max_points` are returned as-is: drawing them directly
+    is cheaper than running LTTB's per-bucket loop.
+    """
+    series = series.dropna()
+    if max_points is None or len(series) <= 2 * max_points:
+        return series
+    index = series.index
+    if hasattr(index, "asi8"):
+        x = index.asi8.astype("float64")
+    else:
+        x = np.asarray(index, dtype="float64")
+    keep = lttb(x, series.to_numpy(dtype="float64"), max_points)
+    return series.iloc[keep]
+
+
+def render_price_figure(stock_prices, filename, max_points=2000, title="Stock Prices",
+                        figsize=(10, 5), dpi=100, max_legend_entries=20):
+    """Render stock_prices (DataFrame or Series) to `filename` with the Agg canvas.
+
+    Returns:
+        str: The filename written.
+    """
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    if not hasattr(stock_prices, "columns"):
+        stock_prices = stock_prices.to_frame(name=stock_prices.name or "price")
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    columns = list(stock_prices.columns)
+    if len(columns) <= max_legend_entries:
+        for column in columns:
+            series = downsample(stock_prices[column], max_points)
+            ax.plot(series.index, series.to_numpy(), label=str(column), linewidth=1)
+        ax.legend()
+    else:
+        # Hundreds of tickers: one LineCollection instead of one Line2D (and legend
+        # entry) per column, which is where most of the render time goes.
+        from matplotlib.collections import LineCollection
+        import matplotlib.dates as mdates
+
+        segments = []
+        for column in columns:
+            series = downsample(stock_prices[column], max_points)
+            x = mdates.date2num(series.index) if hasattr(series.index, "asi8") else series.index
+            segments.append(np.column_stack([np.asarray(x, dtype="float64"), series.to_numpy(dtype="float64")]))
+        ax.add_collection(LineCollection(segments, linewidths=0.5, colors=[f"C{i % 10}" for i in range(len(segments))]))
+        ax.autoscale()
+        if hasattr(stock_prices.index, "asi8"):
+            ax.xaxis_date()
+
+    ax.set_title(title)
+    ax.set_xlabel("Date")
+    ax.set_ylabel("Price")
+    ax.grid(True)
+    fig.savefig(filename)
+    return filename
+
+
+def _render_job(job):
+    stock_prices, filename, kwargs = job
+    return render_price_figure(stock_prices, filename, **kwargs)
+
+
+def render_batch(jobs, max_workers=None, **kwargs):
+    """Render many figures in parallel.
+
+    Args:
+        jobs (list): (stock_prices, filename) pairs.
+        max_workers (int): Process pool size; defaults to os.cpu_count().
+        **kwargs: Passed to render_price_figure.
+
+    Returns:
+        list[str]: Filenames written, in job order.
+    """
+    payload = [(prices, filename, kwargs) for prices, filename in jobs]
+    if len(payload) <= 1 or max_workers == 1:
+        return [_render_job(job) for job in payload]
+
+    import multiprocessing
+
+    # "fork" starts workers without re-importing the caller's script, which matters
+    # because generated code rarely has an `if __name__ == "__main__":` guard.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else "spawn")
+    workers = min(len(payload), max_workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_render_job, payload))
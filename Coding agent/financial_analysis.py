@@ -2,38 +2,12 @@
 import os
 import sys
 import datetime
-import yfinance
-import matplotlib.pyplot as plt
-from autogen import ConversableAgent, AssistantAgent
-from autogen.coding import LocalCommandLineCodeExecutor
 
 # Add parent directory to sys.path to import utils
 # Assuming this script is in "Coding agent/" and utils.py is in the root
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from utils import get_gemini_api_key
-
-# --------------------------------------------------------------------------------
-# Environment Setup (Fix for Subprocesses)
-# --------------------------------------------------------------------------------
-# Ensure the executor uses the same python environment as this script
-# by prepending the current python's directory to PATH.
-venv_scripts = os.path.dirname(sys.executable)
-os.environ["PATH"] = venv_scripts + os.pathsep + os.environ["PATH"]
-
-# --------------------------------------------------------------------------------
-# Setup LLM Configuration
-# --------------------------------------------------------------------------------
-GOOGLE_API_KEY = get_gemini_api_key()
-
-llm_config = {
-    "config_list": [
-        {
-            "model": "gemini-2.0-flash",
-            "api_key": GOOGLE_API_KEY,
-            "api_type": "google"
-        }
-    ]
-}
+from utils import configure_agents, get_gemini_api_key, get_llm_config
+from stock_analytics import ANALYTICS_FUNCTIONS
 
 # --------------------------------------------------------------------------------
 # User Defined Functions
@@ -61,19 +35,13 @@ def get_stock_prices(stock_symbols, start_date, end_date):
     # IMPORT IS REQUIRED HERE: 
     # AutoGen execution happens in a separate script/process 
     # where global imports from the main file are NOT available.
-    import yfinance
+    # price_store is importable there because this script adds its own
+    # directory to PYTHONPATH (see Environment Setup above).
+    from price_store import PriceStore
 
-    stock_data = yfinance.download(
-        stock_symbols, start=start_date, end=end_date
-    )
-    
-    # If multiple stocks, yfinance returns a MultiIndex column. We want just the Close prices.
-    # If single stock, it returns just columns.
-    if "Close" in stock_data:
-        return stock_data["Close"]
-    else:
-        # Fallback or different version of yfinance might behave differently
-        return stock_data
+    # Answered from the local cache in the work_dir; only missing date
+    # gaps are downloaded (set PRICE_SOURCE=synthetic to work offline).
+    return PriceStore.default().get(stock_symbols, start_date, end_date)
 
 def plot_stock_prices(stock_prices, filename):
     """Plot the stock prices for the given stock symbols.
@@ -109,55 +77,145 @@ def plot_stock_prices(stock_prices, filename):
     plt.savefig(filename)
     print(f"Plot saved to {filename}")
 
-# --------------------------------------------------------------------------------
-# Agents and Executor Setup
-# --------------------------------------------------------------------------------
+def plot_stock_prices_fast(stock_prices, filename, max_points=2000):
+    """Plot the stock prices quickly: renders off-screen and downsamples
+    long series to at most max_points per stock while keeping their shape.
+    Prefer this over plot_stock_prices for intraday data or many stocks.
 
-# Create the coding directory if it doesn't exist
-work_dir = "coding"
-if not os.path.exists(work_dir):
-    os.makedirs(work_dir)
-
-# Create the executor with User Defined Functions
-executor = LocalCommandLineCodeExecutor(
-    timeout=60,
-    work_dir=work_dir,
-    functions=[get_stock_prices, plot_stock_prices],
-)
-
-# Initialize the Code Writer Agent
-# We need to manually add the function definitions to the system message 
-# because we are registering them with the executor, but the writer needs to know about them.
-code_writer_agent = AssistantAgent(
-    name="code_writer_agent",
-    llm_config=llm_config,
-    code_execution_config=False,
-    human_input_mode="NEVER",
-)
-
-code_writer_agent_system_message = code_writer_agent.system_message + executor.format_functions_for_prompt()
-
-code_writer_agent = ConversableAgent(
-    name="code_writer_agent",
-    system_message=code_writer_agent_system_message,
-    llm_config=llm_config,
-    code_execution_config=False,
-    human_input_mode="NEVER",
-)
-
-# Initialize the Code Executor Agent
-code_executor_agent = ConversableAgent(
-    name="code_executor_agent",
-    llm_config=False,
-    code_execution_config={"executor": executor},
-    human_input_mode="ALWAYS",
-    default_auto_reply="Please continue. If everything is done, reply 'TERMINATE'.",
-)
+    Args:
+        stock_prices (pandas.DataFrame): The stock prices for the 
+        given stock symbols.
+        filename (str): The filename to save the plot to.
+        max_points (int): Maximum number of points drawn per stock.
+    """
 
-# --------------------------------------------------------------------------------
-# Main Task Execution
-# --------------------------------------------------------------------------------
-if __name__ == "__main__":
+    # IMPORT IS REQUIRED HERE: 
+    # AutoGen execution happens in a separate script/process.
+    from fast_plotting import render_price_figure
+
+    render_price_figure(stock_prices, filename, max_points=max_points)
+    print(f"Plot saved to {filename}")
+
+def plot_stock_prices_batch(plots, max_points=2000):
+    """Plot several figures in parallel, one file per entry.
+
+    Args:
+        plots (list): List of (stock_prices, filename) pairs, where
+        stock_prices is a pandas.DataFrame like in plot_stock_prices.
+        max_points (int): Maximum number of points drawn per stock.
+    """
+
+    # IMPORT IS REQUIRED HERE: 
+    # AutoGen execution happens in a separate script/process.
+    from fast_plotting import render_batch
+
+    for filename in render_batch(plots, max_points=max_points):
+        print(f"Plot saved to {filename}")
+
+
+def main():
+    # --------------------------------------------------------------------------------
+    # Environment Setup (Fix for Subprocesses)
+    # --------------------------------------------------------------------------------
+    # Ensure the executor uses the same python environment as this script
+    # by prepending the current python's directory to PATH.
+    venv_scripts = os.path.dirname(sys.executable)
+    if venv_scripts not in os.environ["PATH"].split(os.pathsep):
+        os.environ["PATH"] = venv_scripts + os.pathsep + os.environ["PATH"]
+
+    # Make helper modules next to this script (e.g. price_store.py) importable
+    # from the code the executor runs inside the work_dir.
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    if script_dir not in os.environ.get("PYTHONPATH", "").split(os.pathsep):
+        os.environ["PYTHONPATH"] = os.pathsep.join(
+            p for p in (script_dir, os.environ.get("PYTHONPATH")) if p
+        )
+
+    # --------------------------------------------------------------------------------
+    # Setup LLM Configuration
+    # --------------------------------------------------------------------------------
+    GOOGLE_API_KEY = get_gemini_api_key()
+
+    if not GOOGLE_API_KEY:
+        print("Error: GOOGLE_API_KEY not found in environment variables.")
+        sys.exit(1)
+
+    # Imported after the key check: loading AG2 takes seconds (see startup_benchmark.py).
+    # matplotlib/pandas/yfinance are only needed by the executed code, which
+    # imports them itself (see the UDFs above).
+    from autogen import ConversableAgent, AssistantAgent
+    from autogen.coding import LocalCommandLineCodeExecutor
+    from warm_executor import WarmKernelCodeExecutor
+    from execution_cache import CachedCodeExecutor
+
+    # Shared factory: cached .env loading, rate limiting and 429 retries (utils.py)
+    llm_config = get_llm_config()
+
+    # --------------------------------------------------------------------------------
+    # Agents and Executor Setup
+    # --------------------------------------------------------------------------------
+
+    # Create the coding directory if it doesn't exist
+    work_dir = "coding"
+    if not os.path.exists(work_dir):
+        os.makedirs(work_dir)
+
+    # Create the executor with User Defined Functions
+    # WarmKernelCodeExecutor is a LocalCommandLineCodeExecutor that runs Python blocks
+    # in one long-lived worker: pandas/yfinance/matplotlib are imported once and data
+    # loaded by one block is still there for the next (see warm_executor.py).
+    # With EXEC_CACHE=1 every block runs in a fresh process instead, behind
+    # CachedCodeExecutor, which replays the output and files of a block that was
+    # already executed unchanged (see execution_cache.py). The two do not combine: a
+    # replayed block would not define its variables in the warm kernel.
+    # ANALYTICS_FUNCTIONS (stock_analytics.py) adds vectorized returns, volatility,
+    # drawdowns, correlations and top movers, so the writer does not hand-roll loops.
+    functions = [
+        get_stock_prices,
+        plot_stock_prices,
+        plot_stock_prices_fast,
+        plot_stock_prices_batch,
+        *ANALYTICS_FUNCTIONS,
+    ]
+    if os.getenv("EXEC_CACHE", "0").lower() in ("1", "true", "yes"):
+        executor = CachedCodeExecutor(LocalCommandLineCodeExecutor(
+            timeout=60, work_dir=work_dir, functions=functions))
+    else:
+        executor = WarmKernelCodeExecutor(timeout=60, work_dir=work_dir, functions=functions)
+
+    # Initialize the Code Writer Agent
+    # We need to manually add the function definitions to the system message 
+    # because we are registering them with the executor, but the writer needs to know about them.
+    code_writer_agent = AssistantAgent(
+        name="code_writer_agent",
+        llm_config=llm_config,
+        code_execution_config=False,
+        human_input_mode="NEVER",
+    )
+
+    code_writer_agent_system_message = code_writer_agent.system_message + executor.format_functions_for_prompt()
+
+    code_writer_agent = ConversableAgent(
+        name="code_writer_agent",
+        system_message=code_writer_agent_system_message,
+        llm_config=llm_config,
+        code_execution_config=False,
+        human_input_mode="NEVER",
+    )
+
+    configure_agents(code_writer_agent)
+
+    # Initialize the Code Executor Agent
+    code_executor_agent = ConversableAgent(
+        name="code_executor_agent",
+        llm_config=False,
+        code_execution_config={"executor": executor},
+        human_input_mode="ALWAYS",
+        default_auto_reply="Please continue. If everything is done, reply 'TERMINATE'.",
+    )
+
+    # --------------------------------------------------------------------------------
+    # Main Task Execution
     today = datetime.datetime.now().date()
     
     # Ensure cleaner chat history by resetting/initiating fresh if needed, 
@@ -178,3 +236,11 @@ if __name__ == "__main__":
     )
     
     # print("Chat finished.")
+    # Stop the warm kernel now rather than at exit (main() may run repeatedly).
+    if isinstance(executor, WarmKernelCodeExecutor):
+        executor.shutdown()
+    return chat_result
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Local time-series store for daily close prices.
+
+`get_stock_prices` used to call `yfinance.download` for the full date range on every
+invocation. `PriceStore` keeps one memory-mapped NumPy file per ticker plus a small
+JSON file recording which date ranges have already been fetched. A query is answered
+from disk and only the missing gaps are requested from the data source.
+
+Layout (inside `root`, default `.price_cache` in the executor's work_dir):
+    NVDA.npy    structured array [("day", int64), ("close", float64)], sorted by day
+    NVDA.json   {"ranges": [[first_day, end_day_exclusive], ...]}
+
+Days are integers (days since 1970-01-01). Ranges are tracked separately from the rows
+because weekends and holidays have no rows but are still "covered".
+
+Data sources are pluggable: anything with `fetch(symbols, start, end)` returning a
+DataFrame indexed by date with one column per symbol. `SyntheticSource` and
+`FixtureSource` work offline, e.g. for tests: `PRICE_SOURCE=synthetic`.
+
+A range is recorded as covered only for symbols the source returned data for (or when
+it has no weekdays at all). An empty answer for a past range longer than a holiday
+raises `PriceFetchError` and leaves the cache untouched, so the next query retries it
+instead of treating the dates as empty forever.
+"""
+
+import datetime
+import json
+import math
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+ROW_DTYPE = np.dtype([("day", "<i8"), ("close", "<f8")])
+
+# Exchange holidays close at most this many weekdays in a row; an empty answer for a
+# longer past range means the download failed.
+MAX_CLOSED_WEEKDAYS = 2
+
+
+class PriceFetchError(RuntimeError):
+    """The data source failed (network error, rate limit...); nothing was cached."""
+
+
+def to_day(value):
+    """Convert a date-like value ('YYYY-MM-DD', date, Timestamp) to days since epoch."""
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype("int64"))
+
+
+def from_days(days):
+    return pd.to_datetime(np.asarray(days, dtype="int64").astype("datetime64[D]"))
+
+
+# --------------------------------------------------------------------------------
+# Range bookkeeping
+# --------------------------------------------------------------------------------
+def merge_ranges(ranges):
+    """Merge overlapping / touching [start, end) ranges."""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def trading_days(start, end):
+    """Number of weekdays in [start, end) (days since epoch)."""
+    if end <= start:
+        return 0
+    return len(pd.bdate_range(from_days([start])[0], from_days([end - 1])[0]))
+
+
+def missing_ranges(ranges, start, end):
+    """Return the parts of [start, end) not covered by `ranges`."""
+    gaps = []
+    cursor = start
+    for r_start, r_end in merge_ranges(ranges):
+        if r_end <= cursor:
+            continue
+        if r_start >= end:
+            break
+        if r_start > cursor:
+            gaps.append((cursor, r_start))
+        cursor = max(cursor, r_end)
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+# --------------------------------------------------------------------------------
+# Data Sources
+# --------------------------------------------------------------------------------
+class YFinanceSource:
+    """Downloads daily close prices with yfinance."""
+
+    def fetch(self, symbols, start, end):
+        import yfinance
+
+        data = yfinance.download(list(symbols), start=start, end=end, progress=False)
+        if data is None or len(data) == 0:
+            # Also what yfinance returns on network errors and rate limits (it does
+            # not raise); PriceStore tells the two apart, see PriceStore.get.
+            return pd.DataFrame(columns=list(symbols))
+        close = data["Close"] if "Close" in data else data
+        if isinstance(close, pd.Series):
+            close = close.to_frame(name=symbols[0])
+        return close
+
+
+class SyntheticSource:
+    """Deterministic, offline prices for tests and demos.
+
+    The price of a symbol on a given day depends only on (seed, symbol, day), so any
+    sub-range query returns the same values as a full-range query.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    def _price(self, symbol, day):
+        key = zlib.crc32(f"{self.seed}:{symbol}".encode())
+        base = 20 + key % 480
+        phase = (key >> 8) % 628 / 100
+        noise = zlib.crc32(f"{key}:{day}".encode()) / 0xFFFFFFFF - 0.5
+        trend = 0.0002 * (day - 18000)
+        wave = 0.08 * math.sin(day / 23 + phase) + 0.03 * math.sin(day / 5.7 + 2 * phase)
+        return round(base * math.exp(trend + wave) * (1 + 0.01 * noise), 4)
+
+    def fetch(self, symbols, start, end):
+        index = pd.bdate_range(start, pd.Timestamp(end) - pd.Timedelta(days=1))
+        days = [to_day(d) for d in index]
+        return pd.DataFrame(
+            {s: [self._price(s, d) for d in days] for s in symbols}, index=index
+        )
+
+
+class FixtureSource:
+    """Serves prices from an in-memory DataFrame or a CSV file (Date index, one column per symbol)."""
+
+    def __init__(self, frame):
+        if isinstance(frame, (str, os.PathLike)):
+            frame = pd.read_csv(frame, index_col=0, parse_dates=True)
+        self.frame = frame.sort_index()
+
+    def fetch(self, symbols, start, end):
+        mask = (self.frame.index >= pd.Timestamp(start)) & (self.frame.index < pd.Timestamp(end))
+        return self.frame.loc[mask, [s for s in symbols if s in self.frame.columns]]
+
+
+SOURCES = {
+    "yfinance": YFinanceSource,
+    "synthetic": SyntheticSource,
+}
+
+
+# --------------------------------------------------------------------------------
+# Price Store
+# --------------------------------------------------------------------------------
+class PriceStore:
+    """Per-ticker on-disk cache that fetches only missing date gaps.
+
+    Args:
+        root (str): Directory holding the .npy / .json files.
+        source: Data source with `fetch(symbols, start, end)`.
+    """
+
+    def __init__(self, root=".price_cache", source=None):
+        self.root = root
+        self.source = source if source is not None else YFinanceSource()
+        self.fetches = 0
+        os.makedirs(root, exist_ok=True)
+
+    @classmethod
+    def default(cls):
+        """Store configured from PRICE_STORE_DIR and PRICE_SOURCE (yfinance | synthetic)."""
+        source = SOURCES[os.environ.get("PRICE_SOURCE", "yfinance")]()
+        return cls(os.environ.get("PRICE_STORE_DIR", ".price_cache"), source)
+
+    def _paths(self, symbol):
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in symbol.upper())
+        base = os.path.join(self.root, safe)
+        return base + ".npy", base + ".json"
+
+    def _load_ranges(self, symbol):
+        _, meta_path = self._paths(symbol)
+        if not os.path.exists(meta_path):
+            return []
+        with open(meta_path) as f:
+            return json.load(f)["ranges"]
+
+    def _load_rows(self, symbol):
+        data_path, _ = self._paths(symbol)
+        if not os.path.exists(data_path):
+            return np.empty(0, dtype=ROW_DTYPE)
+        return np.load(data_path, mmap_mode="r")
+
+    def _save(self, symbol, rows, ranges):
+        data_path, meta_path = self._paths(symbol)
+        # Write to temporary files and swap in, so a crash never leaves a torn file.
+        with open(data_path + ".tmp", "wb") as f:
+            np.save(f, rows)
+        os.replace(data_path + ".tmp", data_path)
+        with open(meta_path + ".tmp", "w") as f:
+            json.dump({"ranges": merge_ranges(ranges)}, f)
+        os.replace(meta_path + ".tmp", meta_path)
+
+    def _store(self, symbol, frame_column, covered):
+        values = frame_column.dropna()
+        new = np.empty(len(values), dtype=ROW_DTYPE)
+        new["day"] = [to_day(d) for d in values.index]
+        new["close"] = values.to_numpy(dtype="float64")
+
+        old = np.array(self._load_rows(symbol))  # copy, releases the memory map
+        rows = np.concatenate([new, old])  # new rows first so they win on duplicates
+        _, first = np.unique(rows["day"], return_index=True)
+        rows = rows[np.sort(first)]
+        rows = rows[np.argsort(rows["day"], kind="stable")]
+        self._save(symbol, rows, self._load_ranges(symbol) + covered)
+
+    def get(self, symbols, start, end):
+        """Close prices for `symbols` in [start, end), one column per symbol."""
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        start_day, end_day = to_day(start), to_day(end)
+        # Today's bar is still moving: never mark it (or the future) as covered.
+        today = to_day(datetime.date.today())
+
+        # Group symbols with identical gaps so the source sees one request per gap.
+        gaps = {}
+        for symbol in symbols:
+            for gap in missing_ranges(self._load_ranges(symbol), start_day, end_day):
+                gaps.setdefault(gap, []).append(symbol)
+
+        for (gap_start, gap_end), gap_symbols in gaps.items():
+            covered_end = min(gap_end, today)
+            covered = [[gap_start, covered_end]] if covered_end > gap_start else []
+            if trading_days(gap_start, gap_end) == 0:
+                # Weekends only: nothing to fetch, the range is complete as it is.
+                for symbol in gap_symbols:
+                    self._store(symbol, pd.Series(dtype="float64"), covered)
+                continue
+            # Source errors propagate: a failed fetch must not be recorded as an empty range.
+            frame = self.source.fetch(gap_symbols, from_days([gap_start])[0], from_days([gap_end])[0])
+            self.fetches += 1
+            if frame.dropna(how="all").empty and trading_days(gap_start, covered_end) > MAX_CLOSED_WEEKDAYS:
+                raise PriceFetchError(
+                    f"No prices for {', '.join(gap_symbols)} between {from_days([gap_start])[0].date()} and "
+                    f"{from_days([gap_end])[0].date()} (network error or rate limit?); nothing was cached.")
+            for symbol in gap_symbols:
+                column = frame[symbol].dropna() if symbol in frame else pd.Series(dtype="float64")
+                if column.empty:
+                    continue  # unknown symbol or partial failure: ask again next time
+                self._store(symbol, column, covered)
+
+        columns = {}
+        for symbol in symbols:
+            rows = self._load_rows(symbol)
+            lo, hi = np.searchsorted(rows["day"], [start_day, end_day])
+            part = rows[lo:hi]
+            columns[symbol] = pd.Series(np.array(part["close"]), index=from_days(part["day"]))
+        prices = pd.DataFrame(columns)
+        prices.index.name = "Date"
+        return prices
@@ -0,0 +1,129 @@
+"""
+Vectorized analytics functions for the financial code executor.
+
+These are registered with `LocalCommandLineCodeExecutor(functions=[...])` next to
+`get_stock_prices` and `plot_stock_prices`, so the code writer can call them instead
+of writing its own pandas loops.
+
+All functions take the DataFrame returned by `get_stock_prices` (DatetimeIndex, one
+column per symbol) and operate on every column at once, so they scale to thousands
+of tickers. Like the other user defined functions, each one imports what it needs:
+the executor copies the function source into a separate process.
+"""
+
+
+def normalized_returns(stock_prices, as_percent=True):
+    """Cumulative return of each stock relative to its first available price
+    (e.g. YTD gain when the prices start on January 1st).
+
+    Args:
+        stock_prices (pandas.DataFrame): Prices indexed by date, one column
+        per stock symbol.
+        as_percent (bool): Return percentages (12.5) instead of fractions (0.125).
+
+    Returns:
+        pandas.DataFrame: Cumulative returns with the same shape as stock_prices.
+    """
+    import pandas as pd
+
+    if isinstance(stock_prices, pd.Series):
+        stock_prices = stock_prices.to_frame()
+    first = stock_prices.bfill().iloc[0]
+    returns = stock_prices / first - 1
+    return returns * 100 if as_percent else returns
+
+
+def rolling_volatility(stock_prices, window=21, annualize=True):
+    """Rolling volatility (standard deviation of daily log returns) per stock.
+
+    Args:
+        stock_prices (pandas.DataFrame): Prices indexed by date, one column
+        per stock symbol.
+        window (int): Number of trading days in the rolling window.
+        annualize (bool): Scale by sqrt(252) trading days.
+
+    Returns:
+        pandas.DataFrame: Rolling volatility, NaN until the window is full.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(stock_prices, pd.Series):
+        stock_prices = stock_prices.to_frame()
+    log_returns = np.log(stock_prices).diff()
+    volatility = log_returns.rolling(window, min_periods=window).std()
+    return volatility * np.sqrt(252) if annualize else volatility
+
+
+def drawdowns(stock_prices):
+    """Drawdown of each stock from its running peak, as a fraction (-0.25 = 25% below peak).
+    Use `drawdowns(prices).min()` to get the maximum drawdown per stock.
+
+    Args:
+        stock_prices (pandas.DataFrame): Prices indexed by date, one column
+        per stock symbol.
+
+    Returns:
+        pandas.DataFrame: Drawdowns with the same shape as stock_prices.
+    """
+    import pandas as pd
+
+    if isinstance(stock_prices, pd.Series):
+        stock_prices = stock_prices.to_frame()
+    return stock_prices / stock_prices.cummax() - 1
+
+
+def correlation_matrix(stock_prices, method="pearson"):
+    """Correlation matrix of daily returns between all stocks.
+
+    Args:
+        stock_prices (pandas.DataFrame): Prices indexed by date, one column
+        per stock symbol.
+        method (str): 'pearson', 'spearman' or 'kendall'.
+
+    Returns:
+        pandas.DataFrame: Symmetric matrix indexed and labelled by stock symbol.
+    """
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(stock_prices, pd.Series):
+        stock_prices = stock_prices.to_frame()
+    returns = stock_prices.pct_change(fill_method=None).iloc[1:]
+    if method == "pearson" and not returns.isna().values.any():
+        # Fast path: one BLAS call instead of pairwise NaN handling.
+        matrix = np.corrcoef(returns.to_numpy(dtype="float64"), rowvar=False)
+        return pd.DataFrame(matrix, index=returns.columns, columns=returns.columns)
+    return returns.corr(method=method)
+
+
+def top_movers(stock_prices, n=5, losers=False):
+    """Stocks with the largest total return over the whole period.
+
+    Args:
+        stock_prices (pandas.DataFrame): Prices indexed by date, one column
+        per stock symbol.
+        n (int): Number of stocks to return.
+        losers (bool): Return the n worst performers instead of the best.
+
+    Returns:
+        pandas.Series: Total return in percent, indexed by stock symbol,
+        sorted from the biggest move.
+    """
+    import pandas as pd
+
+    if isinstance(stock_prices, pd.Series):
+        stock_prices = stock_prices.to_frame()
+    first = stock_prices.bfill().iloc[0]
+    last = stock_prices.ffill().iloc[-1]
+    total = ((last / first - 1) * 100).dropna().rename("return_pct")
+    return total.nsmallest(n) if losers else total.nlargest(n)
+
+
+ANALYTICS_FUNCTIONS = [
+    normalized_returns,
+    rolling_volatility,
+    drawdowns,
+    correlation_matrix,
+    top_movers,
+]
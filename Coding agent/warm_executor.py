@@ -0,0 +1,213 @@
+"""
+Stateful "warm kernel" code executor.
+
+`LocalCommandLineCodeExecutor` writes every code block to a file and starts a fresh
+Python process for it, so each iteration of the writer/executor loop pays the full
+import cost of pandas, yfinance and matplotlib and loses the data loaded by the
+previous block.
+
+`WarmKernelCodeExecutor` is a drop-in subclass that sends Python blocks to one
+long-lived worker process (warm_kernel_worker.py) instead:
+
+* the heavy modules are imported once, when the executor is created,
+* variables and loaded data persist across blocks,
+* each block still has a timeout; the worker is interrupted (SIGINT) and, if it does
+  not respond, killed and restarted,
+* a crashed worker is restarted automatically on the next block,
+* output written straight to fds 1/2 (subprocesses, C extensions) is captured and
+  returned with the block's output, like a fresh process would.
+
+Shell blocks and the functions module setup keep the parent class behaviour.
+Code files are still written to the work_dir, so `code_file` and `# filename:`
+comments work as before.
+"""
+
+import atexit
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from hashlib import md5
+
+from autogen.code_utils import PYTHON_VARIANTS, TIMEOUT_MSG, WIN32
+from autogen.coding import LocalCommandLineCodeExecutor
+from autogen.coding.base import CommandLineCodeResult
+from autogen.coding.utils import _get_file_name_from_content, silence_pip
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "warm_kernel_worker.py")
+
+DEFAULT_PRELOAD = ("numpy", "pandas", "matplotlib.pyplot", "yfinance")
+
+
+class _Kernel:
+    """Handle on one worker process and the thread that reads its replies."""
+
+    def __init__(self, work_dir, preload):
+        env = os.environ.copy()
+        env.setdefault("MPLBACKEND", "Agg")  # no GUI windows from a background process
+        self.process = subprocess.Popen(
+            [sys.executable, "-u", WORKER_SCRIPT, "--work-dir", str(work_dir), "--preload", ",".join(preload)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,  # the worker captures its fds 1 and 2 into the block output
+            text=True,
+            encoding="utf-8",
+            env=env,
+        )
+        self.replies = queue.Queue()
+        self.info = None
+        self._next_id = 0
+        threading.Thread(target=self._read, daemon=True).start()
+
+    def _read(self):
+        for line in self.process.stdout:
+            self.replies.put(json.loads(line))
+        self.replies.put(None)  # EOF: the worker exited
+
+    def wait_ready(self, timeout):
+        if self.info is None:
+            self.info = self.replies.get(timeout=timeout)
+        return self.info
+
+    def send(self, code, filename):
+        self._next_id += 1
+        self.process.stdin.write(json.dumps({"id": self._next_id, "code": code, "filename": filename}) + "\n")
+        self.process.stdin.flush()
+        return self._next_id
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def interrupt(self):
+        if not WIN32 and self.alive():
+            self.process.send_signal(signal.SIGINT)
+
+    def kill(self):
+        if self.alive():
+            self.process.kill()
+        self.process.wait()
+
+
+class WarmKernelCodeExecutor(LocalCommandLineCodeExecutor):
+    """LocalCommandLineCodeExecutor that runs Python blocks in a persistent worker.
+
+    Args:
+        preload (tuple[str]): Modules imported by the worker at startup.
+        startup_timeout (float): Seconds to wait for the worker's preload imports.
+        interrupt_grace (float): Seconds to wait after an interrupt before the
+            worker is killed and restarted.
+        **kwargs: Passed to LocalCommandLineCodeExecutor (timeout, work_dir, functions...).
+    """
+
+    # Blocks share one interpreter, so a block's result depends on the earlier ones
+    # (checked by CachedCodeExecutor).
+    stateful = True
+
+    def __init__(self, preload=DEFAULT_PRELOAD, startup_timeout=120, interrupt_grace=5, **kwargs):
+        super().__init__(**kwargs)
+        if self._virtual_env_context:
+            raise ValueError("WarmKernelCodeExecutor runs in the current interpreter; virtual_env_context is not supported.")
+        self.preload = tuple(preload)
+        self.startup_timeout = startup_timeout
+        self.interrupt_grace = interrupt_grace
+        self.restarts = 0
+        # Start now so the imports overlap with the first LLM call.
+        self._kernel = _Kernel(self.work_dir, self.preload)
+        atexit.register(self.shutdown)
+
+    # ----------------------------------------------------------------------------
+    # Kernel lifecycle
+    # ----------------------------------------------------------------------------
+    def _ensure_kernel(self):
+        if self._kernel is None or not self._kernel.alive():
+            if self._kernel is not None:
+                self._kernel.kill()
+                self.restarts += 1
+            self._kernel = _Kernel(self.work_dir, self.preload)
+        self._kernel.wait_ready(self.startup_timeout)
+        return self._kernel
+
+    def restart(self):
+        """Restart the worker, dropping all state kept between blocks."""
+        self.shutdown()
+        self._kernel = _Kernel(self.work_dir, self.preload)
+
+    def shutdown(self):
+        if self._kernel is not None:
+            self._kernel.kill()
+            self._kernel = None
+
+    # ----------------------------------------------------------------------------
+    # Execution
+    # ----------------------------------------------------------------------------
+    def _run_in_kernel(self, code, filename):
+        kernel = self._ensure_kernel()
+        request_id = kernel.send(code, filename)
+        deadline = time.monotonic() + float(self._timeout)
+        interrupted = False
+        while True:
+            try:
+                reply = kernel.replies.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                if not interrupted:
+                    kernel.interrupt()
+                    interrupted = True
+                    deadline = time.monotonic() + self.interrupt_grace
+                    continue
+                # The block ignored the interrupt (e.g. stuck in C code).
+                self.shutdown()
+                self.restarts += 1
+                return 124, TIMEOUT_MSG + "\nThe kernel was restarted; state from earlier blocks was lost."
+            if reply is None:
+                exit_code = kernel.process.wait()
+                self.shutdown()
+                self.restarts += 1
+                return exit_code or 1, (
+                    f"The kernel crashed (exit code {exit_code}) and will be restarted; "
+                    "state from earlier blocks was lost."
+                )
+            if reply.get("id") != request_id:
+                continue  # late reply from an interrupted block
+            if interrupted or reply["exit_code"] == 124:
+                return 124, reply["output"] + "\n" + TIMEOUT_MSG
+            return reply["exit_code"], reply["output"]
+
+    def _execute_code_dont_check_setup(self, code_blocks):
+        logs_all = ""
+        file_names = []
+        exitcode = 0
+        for code_block in code_blocks:
+            lang, code = code_block.language.lower(), code_block.code
+            if lang not in PYTHON_VARIANTS or not self.execution_policies.get("python", False):
+                # Shell blocks (and saved-only code) keep the per-process behaviour.
+                result = super()._execute_code_dont_check_setup([code_block])
+                logs_all += result.output
+                exitcode = result.exit_code
+                if result.code_file:
+                    file_names.append(result.code_file)
+                if exitcode != 0:
+                    break
+                continue
+
+            code = silence_pip(code, "python")
+            try:
+                filename = _get_file_name_from_content(code, self._work_dir)
+            except ValueError:
+                return CommandLineCodeResult(exit_code=1, output="Filename is not in the workspace")
+            if filename is None:
+                filename = f"tmp_code_{md5(code.encode()).hexdigest()}.py"
+            written_file = (self._work_dir / filename).resolve()
+            written_file.write_text(code, encoding="utf-8")
+            file_names.append(str(written_file))
+
+            exitcode, output = self._run_in_kernel(code, str(written_file))
+            logs_all += output
+            if exitcode != 0:
+                break
+
+        code_file = str(file_names[0]) if file_names else None
+        return CommandLineCodeResult(exit_code=exitcode, output=logs_all, code_file=code_file)
@@ -0,0 +1,143 @@
+"""
+Long-lived Python worker used by `WarmKernelCodeExecutor` (warm_executor.py).
+
+Protocol: one JSON object per line.
+    -> {"id": 1, "code": "...", "filename": "/abs/path/tmp_code_x.py"}
+    <- {"id": 1, "exit_code": 0, "output": "..."}
+On startup the worker imports the preload modules and sends {"ready": true, ...}.
+
+All code blocks run in one shared namespace, so variables, imports and loaded data
+survive between blocks. SIGINT interrupts the running block (per-block timeout);
+between blocks it is ignored.
+
+File descriptors 1 and 2 point at a capture file while the worker runs, so output of
+subprocesses and C extensions is returned with the block's output, in order, as
+LocalCommandLineCodeExecutor did. The protocol uses a private copy of the original
+stdout.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import sys
+import tempfile
+import time
+import traceback
+
+TIMEOUT_EXIT_CODE = 124
+
+# SIGINT only interrupts while a block runs; one that arrives while the worker reads
+# a request or writes a reply is dropped instead of killing the worker.
+_executing = False
+
+
+def _on_sigint(signum, frame):
+    if _executing:
+        raise KeyboardInterrupt
+
+
+class OutputCapture:
+    """Unlinked temp file that fds 1 and 2 write to (O_APPEND, so truncating it between
+    blocks never leaves holes for writers that kept their offset)."""
+
+    def __init__(self):
+        handle, path = tempfile.mkstemp(prefix="warm_kernel_", suffix=".out")
+        os.close(handle)
+        self.fd = os.open(path, os.O_RDWR | os.O_APPEND)
+        os.unlink(path)
+        os.dup2(self.fd, 1)
+        os.dup2(self.fd, 2)
+
+    def reset(self):
+        os.ftruncate(self.fd, 0)
+
+    def read(self):
+        size = os.fstat(self.fd).st_size
+        return os.pread(self.fd, size, 0).decode("utf-8", errors="replace")
+
+
+def run_block(code, filename, namespace, capture):
+    """Execute one block in `namespace`, returning (exit_code, output)."""
+    global _executing
+    exit_code = 0
+    namespace["__file__"] = filename
+    # Blocks may import files written since the last block (e.g. the functions module).
+    importlib.invalidate_caches()
+    sys.argv = [filename]
+    capture.reset()
+    try:
+        try:
+            _executing = True
+            exec(compile(code, filename, "exec"), namespace)
+            _executing = False
+        except KeyboardInterrupt:
+            exit_code = TIMEOUT_EXIT_CODE
+        except SystemExit as exc:
+            _executing = False
+            if exc.code is None or isinstance(exc.code, int):
+                exit_code = exc.code or 0
+            else:
+                print(exc.code, file=sys.stderr)
+                exit_code = 1
+        except BaseException as exc:
+            _executing = False
+            # Drop this module's exec frame so the traceback starts in the user's code.
+            traceback.print_exception(type(exc), exc, exc.__traceback__.tb_next)
+            exit_code = 1
+    except KeyboardInterrupt:
+        exit_code = TIMEOUT_EXIT_CODE  # interrupted while handling the block's own exception
+    finally:
+        _executing = False
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return exit_code, capture.read()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--work-dir", required=True)
+    parser.add_argument("--preload", default="")
+    args = parser.parse_args()
+
+    # Keep a private handle on the real stdout for the protocol; fds 1 and 2 go to the
+    # capture file, so nothing a block (or its child processes) prints can corrupt it.
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "w", encoding="utf-8", buffering=1)
+    capture = OutputCapture()
+
+    work_dir = os.path.abspath(args.work_dir)
+    os.chdir(work_dir)
+    sys.path.insert(0, work_dir)
+
+    start = time.perf_counter()
+    loaded, failed = [], []
+    for name in filter(None, args.preload.split(",")):
+        try:
+            importlib.import_module(name)
+            loaded.append(name)
+        except Exception:
+            failed.append(name)
+    channel.write(json.dumps({
+        "ready": True,
+        "pid": os.getpid(),
+        "preloaded": loaded,
+        "failed": failed,
+        "startup_s": time.perf_counter() - start,
+    }) + "\n")
+
+    namespace = {"__name__": "__main__", "__builtins__": __builtins__}
+    while True:
+        line = sys.stdin.readline()
+        if not line:
+            break
+        request = json.loads(line)
+        exit_code, output = run_block(request["code"], request["filename"], namespace, capture)
+        channel.write(json.dumps({"id": request["id"], "exit_code": exit_code, "output": output}) + "\n")
+
+
+if __name__ == "__main__":
+    # Interrupts are handled per block; install the handler even if the parent
+    # started us with SIGINT ignored.
+    signal.signal(signal.SIGINT, _on_sigint)
+    main()
@@ -2,54 +2,64 @@
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-import autogen
-from autogen import ConversableAgent
-from utils import get_gemini_api_key
-
-# Retrieve API Key
-GOOGLE_API_KEY = get_gemini_api_key()
-
-if not GOOGLE_API_KEY:
-    print("Error: GOOGLE_API_KEY not found in environment variables.")
-    exit(1)
-
-
-llm_config = {
-    "config_list": [
-        {
-            "model": "gemini-2.0-flash",
-            "api_key": GOOGLE_API_KEY,
-            "api_type": "google"
-        }
-    ]
-}
-
-# Agent 1: Cathy
-cathy = ConversableAgent(
-    name="cathy",
-    system_message="Your name is Cathy and you are a stand-up comedian. Tell brief, punchy jokes.",
-    llm_config=llm_config,
-    human_input_mode="NEVER",
-)
-
-# Agent 2: Joe
-joe = ConversableAgent(
-    name="joe",
-    system_message=(
-        "Your name is Joe and you are a stand-up comedian. "
-        "Start the next joke from the punchline of the previous joke."
-    ),
-    llm_config=llm_config,
-    human_input_mode="NEVER",
-)
-
-print("--- Starting the Comedy Show (AG2) ---")
-
-# Start the conversation
-chat_result = joe.initiate_chat(
-    recipient=cathy,
-    message="I'm Joe. Cathy, let's keep the jokes rolling.",
-    max_turns=2,
-)
-
-print("--- Show Over ---")
+from utils import configure_agents, get_gemini_api_key, get_llm_config
+from streaming import enable_streaming, streaming_enabled
+
+
+def main():
+    # Retrieve API Key
+    GOOGLE_API_KEY = get_gemini_api_key()
+
+    if not GOOGLE_API_KEY:
+        print("Error: GOOGLE_API_KEY not found in environment variables.")
+        sys.exit(1)
+
+    # Imported after the key check: loading AG2 takes seconds (see startup_benchmark.py).
+    from autogen import ConversableAgent
+
+    # Shared factory: cached .env loading, rate limiting and 429 retries (utils.py)
+    # With LLM_STREAM=1 jokes are streamed token by token.
+    STREAM = streaming_enabled()
+    llm_config = get_llm_config(stream=True) if STREAM else get_llm_config()
+
+    # Agent 1: Cathy
+    cathy = ConversableAgent(
+        name="cathy",
+        system_message="Your name is Cathy and you are a stand-up comedian. Tell brief, punchy jokes.",
+        llm_config=llm_config,
+        human_input_mode="NEVER",
+    )
+
+    # Agent 2: Joe
+    joe = ConversableAgent(
+        name="joe",
+        system_message=(
+            "Your name is Joe and you are a stand-up comedian. "
+            "Start the next joke from the punchline of the previous joke."
+        ),
+        llm_config=llm_config,
+        human_input_mode="NEVER",
+    )
+
+    configure_agents(cathy, joe)
+    stream = enable_streaming(cathy, joe) if STREAM else None
+
+    print("--- Starting the Comedy Show (AG2) ---")
+
+    # Start the conversation
+    chat_result = joe.initiate_chat(
+        recipient=cathy,
+        message="I'm Joe. Cathy, let's keep the jokes rolling.",
+        max_turns=2,
+    )
+
+    print("--- Show Over ---")
+
+    if stream is not None:
+        print(stream.report())
+        stream.close()
+    return chat_result
+
+
+if __name__ == "__main__":
+    main()
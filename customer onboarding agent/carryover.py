@@ -0,0 +1,229 @@
+"""
+Bounded carryover for sequential chats.
+
+`initiate_chats` passes the summaries of *all* earlier chats to every later chat, and
+with `clear_history: False` the sender also keeps its earlier transcript. The prompt
+therefore grows with the length of the pipeline.
+
+`run_sequential_chats` is a drop-in replacement for `initiate_chats` that builds the
+carryover of each stage through a `CarryoverManager`:
+
+* Structured carryover: JSON summaries (e.g. {"name": ..., "location": ...}) are merged
+  into a single object, later stages overriding earlier ones.
+* Deduplication: repeated free-text summaries are passed only once.
+* Per-stage budgets: an optional `"carryover_budget"` key (in tokens) on a chat dict.
+  Over budget, the stage's retained history is cleared first (the facts survive in the
+  structured carryover), then the oldest free-text summaries are dropped, then whole
+  fields of the structured object (oldest first), so the carryover stays valid JSON.
+
+`CarryoverReport` records the estimated prompt tokens per stage (system messages,
+message, history and carryover) with the default `initiate_chats` behaviour ("before")
+and with the managed carryover ("after"). `python carryover.py` shows both for a long
+pipeline, where the budget keeps the managed prompt flat.
+"""
+
+import json
+import re
+
+from fast_summary import scan_objects
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), good enough for budgeting."""
+    if not text:
+        return 0
+    return max(1, len(text) // 4)
+
+
+def _system_tokens(*agents):
+    """System messages re-sent with every call of the agents that use an LLM."""
+    return sum(estimate_tokens(agent.system_message) for agent in agents if getattr(agent, "llm_config", False))
+
+
+def _history_tokens(sender, recipient):
+    messages = sender.chat_messages.get(recipient, [])
+    return sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+# --------------------------------------------------------------------------------
+# Carryover Manager
+# --------------------------------------------------------------------------------
+class CarryoverManager:
+    """Builds a compact carryover string from the summaries of earlier chats.
+
+    Args:
+        structured (bool): Merge JSON summaries into one object.
+        dedupe (bool): Drop repeated free-text summaries.
+        default_budget (int): Token budget for stages without "carryover_budget".
+    """
+
+    def __init__(self, structured=True, dedupe=True, default_budget=None):
+        self.structured = structured
+        self.dedupe = dedupe
+        self.default_budget = default_budget
+
+    def split(self, summaries):
+        """Split summaries into (merged fields dict, list of free-text items)."""
+        fields = {}
+        texts = []
+        seen = set()
+        for summary in summaries:
+            if not summary:
+                continue
+            summary = str(summary)
+            objects = list(scan_objects(summary)) if self.structured else []
+            if objects:
+                for obj in objects:
+                    fields.update({k: v for k, v in obj.items() if v not in ("", None, [], {})})
+                continue
+            key = _normalize(summary)
+            if self.dedupe and key in seen:
+                continue
+            seen.add(key)
+            texts.append(summary.strip())
+        return fields, texts
+
+    def build(self, summaries, budget=None):
+        """Return the carryover string for the next stage, within `budget` tokens."""
+        fields, texts = self.split(summaries)
+
+        def render():
+            return "\n".join(([json.dumps(fields)] if fields else []) + texts)
+
+        if budget is not None:
+            # Drop the oldest free-text summaries first, then whole fields (oldest
+            # first): the carryover is never cut mid-object.
+            while texts and estimate_tokens(render()) > budget:
+                texts.pop(0)
+            while fields and estimate_tokens(render()) > budget:
+                fields.pop(next(iter(fields)))
+        return render()
+
+
+# --------------------------------------------------------------------------------
+# Token Report
+# --------------------------------------------------------------------------------
+class CarryoverReport:
+    """Estimated prompt tokens per stage, before and after carryover management."""
+
+    def __init__(self):
+        self.rows = []
+
+    def add(self, stage, message_tokens, history_before, carryover_before,
+            history_after, carryover_after, measured_prompt_tokens=None, system_tokens=0):
+        fixed = system_tokens + message_tokens
+        self.rows.append({
+            "stage": stage,
+            "before": fixed + history_before + carryover_before,
+            "after": fixed + history_after + carryover_after,
+            "carryover_before": carryover_before,
+            "carryover_after": carryover_after,
+            "history_cleared": history_before > 0 and history_after == 0,
+            "measured_prompt_tokens": measured_prompt_tokens,
+        })
+
+    def format(self):
+        lines = [
+            f"{'Stage':<6}{'Before':>10}{'After':>10}{'Carryover':>18}{'Measured':>10}",
+        ]
+        for row in self.rows:
+            carry = f"{row['carryover_before']} -> {row['carryover_after']}"
+            measured = row["measured_prompt_tokens"]
+            lines.append(
+                f"{row['stage']:<6}{row['before']:>10}{row['after']:>10}{carry:>18}"
+                f"{measured if measured is not None else '-':>10}"
+            )
+        before = sum(r["before"] for r in self.rows)
+        after = sum(r["after"] for r in self.rows)
+        lines.append(f"{'Total':<6}{before:>10}{after:>10}")
+        return "\n".join(lines)
+
+
+def _measured_prompt_tokens(chat_result):
+    """Prompt tokens reported by AutoGen for this chat, if available."""
+    usage = (getattr(chat_result, "cost", None) or {}).get("usage_including_cached_inference", {})
+    tokens = [v.get("prompt_tokens", 0) for v in usage.values() if isinstance(v, dict)]
+    return sum(tokens) if tokens else None
+
+
+# --------------------------------------------------------------------------------
+# Runner
+# --------------------------------------------------------------------------------
+def run_sequential_chats(chats, manager=None, report=None):
+    """Run `chats` like `autogen.initiate_chats`, with managed carryover.
+
+    Args:
+        chats (list[dict]): Same format as `initiate_chats`, plus the optional
+            "carryover_budget" key (tokens).
+        manager (CarryoverManager): Defaults to CarryoverManager().
+        report (CarryoverReport): Filled with per-stage token estimates if given.
+
+    Returns:
+        list[ChatResult]: One result per chat.
+    """
+    manager = manager if manager is not None else CarryoverManager()
+    finished = []
+
+    for stage, chat_info in enumerate(chats, start=1):
+        chat_info = dict(chat_info)
+        sender = chat_info.pop("sender")
+        recipient = chat_info["recipient"]
+        budget = chat_info.pop("carryover_budget", manager.default_budget)
+
+        own = chat_info.pop("carryover", [])
+        own = [own] if isinstance(own, str) else list(own)
+        summaries = own + [r.summary for r in finished]
+
+        message = chat_info.get("message")
+        message_tokens = estimate_tokens(message if isinstance(message, str) else "")
+        system_tokens = _system_tokens(sender, recipient)
+        naive_carryover = estimate_tokens("\n".join(str(s) for s in summaries if s))
+        history_before = 0 if chat_info.get("clear_history", True) else _history_tokens(sender, recipient)
+
+        carryover = manager.build(summaries, budget)
+        history_after = history_before
+        over_budget = budget is not None and history_before + estimate_tokens(carryover) > budget
+        if manager.structured and over_budget:
+            chat_info["clear_history"] = True
+            history_after = 0
+
+        if carryover:
+            chat_info["carryover"] = carryover
+        result = sender.initiate_chat(**chat_info)
+        finished.append(result)
+
+        if report is not None:
+            report.add(
+                stage, message_tokens, history_before, naive_carryover,
+                history_after, estimate_tokens(carryover), _measured_prompt_tokens(result), system_tokens,
+            )
+    return finished
+
+
+if __name__ == "__main__":
+    # Offline illustration (no LLM): a 6-stage pipeline where every stage adds a
+    # free-text note and a few profile fields. With initiate_chats the carryover
+    # keeps growing; with a 60-token budget the managed prompt stays flat.
+    notes = [
+        "Customer prefers short answers and replies in the evening.",
+        "Asked twice about pricing tiers; interested in the annual plan.",
+        "Mentioned a team of five who would also use the product.",
+        "Wants a weekly digest instead of daily notifications.",
+        "Reported that the mobile app crashed during sign-up.",
+        "Agreed to a follow-up call next Tuesday.",
+    ]
+    facts = [{"name": "Kiki"}, {"location": "Edmonton"}, {"topics": "food, tech"},
+             {"plan": "annual"}, {"team_size": 5}, {"digest": "weekly"}]
+    manager = CarryoverManager()
+    report = CarryoverReport()
+    summaries = []
+    for stage, (note, fact) in enumerate(zip(notes, facts), start=1):
+        naive = estimate_tokens("\n".join(summaries))
+        report.add(stage, 12, 0, naive, 0, estimate_tokens(manager.build(summaries, budget=60)), system_tokens=40)
+        summaries += [json.dumps(fact), note]
+    print(report.format())
+    print("\nStage 6 carryover:", manager.build(summaries, budget=60))
@@ -1,8 +1,14 @@
 
 import os
 import sys
-from dotenv import load_dotenv, find_dotenv
-from autogen import ConversableAgent, initiate_chats
+from fast_summary import HybridSummarizer, SummaryMetrics
+from carryover import CarryoverManager, CarryoverReport, run_sequential_chats
+
+# Add parent directory to sys.path to import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from utils import configure_agents, get_gemini_api_key, get_llm_config
+from metrics import get_metrics
+from model_router import ModelRouter
 
 # --------------------------------------------------------------------------------
 # Logger Class: Streams output to both Console and File
@@ -23,147 +29,195 @@ class Logger(object):
         self.terminal.flush()
         self.log.flush()
 
-# Redirect stdout to the Logger
-sys.stdout = Logger()
 
-# Load environment variables
-load_dotenv(find_dotenv())
+def main():
+    # Redirect stdout to the Logger (restored when the run ends)
+    stdout = sys.stdout
+    sys.stdout = Logger()
+    try:
+        return _run()
+    finally:
+        sys.stdout.log.close()
+        sys.stdout = stdout
 
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if not GOOGLE_API_KEY:
-    GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY")
 
-if not GOOGLE_API_KEY:
-    print("Error: GOOGLE_API_KEY or GEMINI_API_KEY not found in environment variables.")
-    exit(1)
+def _run():
+    # Load environment variables (cached, see utils.py)
+    GOOGLE_API_KEY = get_gemini_api_key()
 
-# Configuration for Gemini
-llm_config = {
-    "config_list": [
-        {
-            "model": "gemini-2.0-flash",
-            "api_key": GOOGLE_API_KEY,
-            "api_type": "google"
-        }
-    ]
-}
+    if not GOOGLE_API_KEY:
+        print("Error: GOOGLE_API_KEY or GEMINI_API_KEY not found in environment variables.")
+        sys.exit(1)
 
-# --------------------------------------------------------------------------------
-# Creating the needed agents
-# --------------------------------------------------------------------------------
+    # Imported after the key check: loading AG2 takes seconds (see startup_benchmark.py).
+    from autogen import ConversableAgent
 
-onboarding_personal_information_agent = ConversableAgent(
-    name="Onboarding Personal Information Agent",
-    system_message='''You are a helpful customer onboarding agent,
-    you are here to help new customers get started with our product.
-    Your job is to gather customer's name and location.
-    Do not ask for other information. Return 'TERMINATE' 
-    when you have gathered all the information.''',
-    llm_config=llm_config,
-    code_execution_config=False,
-    human_input_mode="NEVER",
-)
-
-onboarding_topic_preference_agent = ConversableAgent(
-    name="Onboarding Topic preference Agent",
-    system_message='''You are a helpful customer onboarding agent,
-    you are here to help new customers get started with our product.
-    Your job is to gather customer's preferences on news topics.
-    Do not ask for other information.
-    Return 'TERMINATE' when you have gathered all the information.''',
-    llm_config=llm_config,
-    code_execution_config=False,
-    human_input_mode="NEVER",
-)
-
-customer_engagement_agent = ConversableAgent(
-    name="Customer Engagement Agent",
-    system_message='''You are a helpful customer service agent
-    here to provide fun for the customer based on the user's
-    personal information and topic preferences.
-    This could include fun facts, jokes, or interesting stories.
-    Make sure to make it engaging and fun!
-    Return 'TERMINATE' when you are done.''',
-    llm_config=llm_config,
-    code_execution_config=False,
-    human_input_mode="NEVER",
-    is_termination_msg=lambda msg: "terminate" in msg.get("content", "").lower(),
-)
+    # Configuration for Gemini (shared factory: rate limiting and 429 retries)
+    llm_config = get_llm_config()
 
-# --------------------------------------------------------------------------------
-# Customer Proxy Agent: Represents YOU (the human user)
-# --------------------------------------------------------------------------------
-customer_proxy_agent = ConversableAgent(
-    name="customer_proxy_agent",
-    llm_config=False,
-    code_execution_config=False,
-    human_input_mode="ALWAYS",
-    is_termination_msg=lambda msg: "terminate" in msg.get("content", "").lower(),
-)
+    # --------------------------------------------------------------------------------
+    # Creating the needed agents
+    # --------------------------------------------------------------------------------
 
-# --------------------------------------------------------------------------------
-# Creating tasks
-# --------------------------------------------------------------------------------
+    onboarding_personal_information_agent = ConversableAgent(
+        name="Onboarding_Personal_Information_Agent",
+        system_message='''You are a helpful customer onboarding agent,
+        you are here to help new customers get started with our product.
+        Your job is to gather customer's name and location.
+        Do not ask for other information. Return 'TERMINATE' 
+        when you have gathered all the information.''',
+        llm_config=llm_config,
+        code_execution_config=False,
+        human_input_mode="NEVER",
+    )
+
+    onboarding_topic_preference_agent = ConversableAgent(
+        name="Onboarding_Topic_Preference_Agent",
+        system_message='''You are a helpful customer onboarding agent,
+        you are here to help new customers get started with our product.
+        Your job is to gather customer's preferences on news topics.
+        Do not ask for other information.
+        Return 'TERMINATE' when you have gathered all the information.''',
+        llm_config=llm_config,
+        code_execution_config=False,
+        human_input_mode="NEVER",
+    )
+
+    customer_engagement_agent = ConversableAgent(
+        name="Customer_Engagement_Agent",
+        system_message='''You are a helpful customer service agent
+        here to provide fun for the customer based on the user's
+        personal information and topic preferences.
+        This could include fun facts, jokes, or interesting stories.
+        Make sure to make it engaging and fun!
+        Return 'TERMINATE' when you are done.''',
+        llm_config=llm_config,
+        code_execution_config=False,
+        human_input_mode="NEVER",
+        is_termination_msg=lambda msg: "terminate" in msg.get("content", "").lower(),
+    )
+
+    # --------------------------------------------------------------------------------
+    # Customer Proxy Agent: Represents YOU (the human user)
+    # --------------------------------------------------------------------------------
+    customer_proxy_agent = ConversableAgent(
+        name="customer_proxy_agent",
+        llm_config=False,
+        code_execution_config=False,
+        human_input_mode="ALWAYS",
+        is_termination_msg=lambda msg: "terminate" in msg.get("content", "").lower(),
+    )
+
+    # Opt-in (MODEL_ROUTER=1): onboarding is simple extraction work, so these agents
+    # run on the cheapest model and only escalate on low-confidence answers.
+    router = ModelRouter.from_env()
+    configure_agents(
+        onboarding_personal_information_agent,
+        onboarding_topic_preference_agent,
+        customer_engagement_agent,
+        router=router,
+    )
+
+    # --------------------------------------------------------------------------------
+    # Hybrid summaries: extract the JSON locally, call the LLM only if fields are missing
+    # --------------------------------------------------------------------------------
+    summary_metrics = SummaryMetrics()
+    profile_summarizer = HybridSummarizer(fields=["name", "location"], metrics=summary_metrics)
+    topics_summarizer = HybridSummarizer(fields=["topics"], metrics=summary_metrics)
 
-chats = [
     # --------------------------------------------------------------------------------
-    # Chat 1: Gather Profile Information
+    # Creating tasks
     # --------------------------------------------------------------------------------
-    {
-        "sender": onboarding_personal_information_agent,
-        "recipient": customer_proxy_agent,
-        "message": 
-            "Hello, I'm here to help you get started with our product."
-            "Could you tell me your name and location?",
-        "summary_method": "reflection_with_llm",
-        "summary_args": {
-            "summary_prompt" : "Return the customer information "
-                             "into as JSON object only: "
-                             "{'name': '', 'location': ''}",
+
+    chats = [
+        # --------------------------------------------------------------------------------
+        # Chat 1: Gather Profile Information
+        # --------------------------------------------------------------------------------
+        {
+            "sender": onboarding_personal_information_agent,
+            "recipient": customer_proxy_agent,
+            "message": 
+                "Hello, I'm here to help you get started with our product."
+                "Could you tell me your name and location?",
+            "summary_method": profile_summarizer,
+            "summary_args": {
+                "summary_prompt" : "Return the customer information "
+                                 "into as JSON object only: "
+                                 "{'name': '', 'location': ''}",
+            },
+            "max_turns": 4,
+            "clear_history" : True
+        },
+        # --------------------------------------------------------------------------------
+        # Chat 2: Gather Preferences
+        # --------------------------------------------------------------------------------
+        {
+            "sender": onboarding_topic_preference_agent,
+            "recipient": customer_proxy_agent,
+            "message": 
+                    "Great! Could you tell me what topics you are "
+                    "interested in reading about?",
+            "summary_method": topics_summarizer,
+            "summary_args": {
+                "summary_prompt" : "Return the customer's topic preferences "
+                                 "into as JSON object only: "
+                                 "{'topics': ''}",
+            },
+            "max_turns": 2,
+            "clear_history" : False,
+            "carryover_budget": 200,
         },
-        "max_turns": 4,
-        "clear_history" : True
-    },
+        # --------------------------------------------------------------------------------
+        # Chat 3: Deliver Content
+        # --------------------------------------------------------------------------------
+        {
+            "sender": customer_proxy_agent,
+            "recipient": customer_engagement_agent,
+            "message": "Let's find something fun to read.",
+            "max_turns": 1,
+            "summary_method": "reflection_with_llm",
+            "carryover_budget": 200,
+        },
+    ]
+
     # --------------------------------------------------------------------------------
-    # Chat 2: Gather Preferences
+    # Start the onboarding process
     # --------------------------------------------------------------------------------
-    {
-        "sender": onboarding_topic_preference_agent,
-        "recipient": customer_proxy_agent,
-        "message": 
-                "Great! Could you tell me what topics you are "
-                "interested in reading about?",
-        "summary_method": "reflection_with_llm",
-        "max_turns": 2,
-        "clear_history" : False
-    },
+
+    # run_sequential_chats behaves like autogen.initiate_chats, but merges the JSON
+    # summaries into one structured carryover, drops duplicates and enforces the
+    # per-stage "carryover_budget" (tokens).
+    print("Starting Sequential Chats...")
+    carryover_report = CarryoverReport()
+    chat_results = run_sequential_chats(chats, CarryoverManager(), carryover_report)
+
     # --------------------------------------------------------------------------------
-    # Chat 3: Deliver Content
+    # Print out the summary and cost
     # --------------------------------------------------------------------------------
-    {
-        "sender": customer_proxy_agent,
-        "recipient": customer_engagement_agent,
-        "message": "Let's find something fun to read.",
-        "max_turns": 1,
-        "summary_method": "reflection_with_llm",
-    },
-]
 
-# --------------------------------------------------------------------------------
-# Start the onboarding process
-# --------------------------------------------------------------------------------
+    print("\n--- Final Results ---")
+    for i, chat_result in enumerate(chat_results):
+        print(f"\n--- Chat {i+1} Summary ---")
+        print(chat_result.summary)
+        print(f"--- Chat {i+1} Cost ---")
+        print(chat_result.cost)
 
-print("Starting Sequential Chats...")
-chat_results = initiate_chats(chats)
+    print("\n--- Summary Fast Path ---")
+    print(summary_metrics.report())
 
-# --------------------------------------------------------------------------------
-# Print out the summary and cost
-# --------------------------------------------------------------------------------
+    print("\n--- Prompt Tokens per Stage (estimated) ---")
+    print(carryover_report.format())
+
+    if router is not None:
+        print("\n--- Model Routing ---")
+        print(router.report())
+
+    # Tokens, cost (priced like cost_calculator.py), latency and retries per agent,
+    # with the calculator's prediction for a run of this shape.
+    print("\n--- LLM Metrics ---")
+    print(get_metrics().report())
+    return chat_results
 
-print("\n--- Final Results ---")
-for i, chat_result in enumerate(chat_results):
-    print(f"\n--- Chat {i+1} Summary ---")
-    print(chat_result.summary)
-    print(f"--- Chat {i+1} Cost ---")
-    print(chat_result.cost)
 
+if __name__ == "__main__":
+    main()
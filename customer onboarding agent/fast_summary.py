@@ -0,0 +1,213 @@
+"""
+Hybrid summary method for sequential chats.
+
+`summary_method="reflection_with_llm"` costs one extra LLM round trip per stage,
+even when the customer already typed the answer ("I'm Kiki from Edmonton").
+`HybridSummarizer` first tries a cheap, local extraction over the chat history:
+
+1. JSON / dict literals that already contain the requested fields.
+2. Regex patterns per field (e.g. "my name is X", "I live in Y").
+
+Only when a required field is still missing does it fall back to AutoGen's
+built-in `reflection_with_llm` summary, using the same `summary_args`.
+
+Usage:
+    summarizer = HybridSummarizer(fields=["name", "location"])
+    chats = [{..., "summary_method": summarizer, "summary_args": {...}}]
+    ...
+    print(summarizer.metrics.report())
+"""
+
+import ast
+import json
+import re
+import time
+
+# --------------------------------------------------------------------------------
+# Default field patterns
+# --------------------------------------------------------------------------------
+# Only the lead-in phrase is case-insensitive; the captured value must look like a
+# proper noun so that "I'm here to help" does not become a name.
+DEFAULT_PATTERNS = {
+    "name": [
+        r"(?i:\bname\s*[:=]\s*)([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)?)",
+        r"(?i:\b(?:my name is|my name's|i am|i'm|this is|call me)\s+)([A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)?)",
+    ],
+    "location": [
+        r"(?i:\blocation\s*[:=]\s*)([A-Z][\w.'-]*(?:[ ,]+[A-Z][\w.'-]*)*)",
+        r"(?i:\b(?:i live in|i'm living in|i am living in|i'm from|i am from|i come from|based in|located in)\s+)"
+        r"([A-Z][\w.'-]*(?:[ ,]+[A-Z][\w.'-]*)*)",
+        # A bare "from" only right after a self-introduction ("I'm Kiki from Edmonton"):
+        # "I heard about you from Reddit" is not a location.
+        r"(?i:\b(?:my name is|i'm|i am|this is)\s+)[A-Z][\w'-]*(?:\s+[A-Z][\w'-]*)?(?i:\s+from\s+)"
+        r"([A-Z][\w.'-]*(?:[ ,]+[A-Z][\w.'-]*)*)",
+    ],
+    "topics": [
+        r"(?i:\btopics?\s*[:=]\s*)([^\n.!?]+)",
+        r"(?i:\b(?:interested in|reading about|i like|i love|i enjoy|topics are|topic is)\s+)([^\n.!?]+)",
+    ],
+}
+
+# Matches flat {...} objects; nested objects are not needed for carryover summaries.
+_OBJECT_RE = re.compile(r"\{[^{}]*\}", re.DOTALL)
+
+
+def _parse_object(text):
+    """Parse a JSON object or a Python dict literal, returning None on failure."""
+    for parser in (json.loads, ast.literal_eval):
+        try:
+            value = parser(text)
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def scan_objects(text):
+    """Yield every dict found in `text`, including ones inside ```json fences."""
+    for match in _OBJECT_RE.finditer(text or ""):
+        obj = _parse_object(match.group(0))
+        if obj is not None:
+            yield obj
+
+
+def extract_fields(messages, fields, patterns=None):
+    """Extract `fields` from a list of chat messages without calling an LLM.
+
+    Messages are scanned newest first so that corrections ("actually I moved to
+    Calgary") win over earlier answers. Structured objects are preferred over
+    regex matches.
+
+    Args:
+        messages (list[dict]): AutoGen messages with a "content" key.
+        fields (list[str]): Field names to extract.
+        patterns (dict): Optional field -> list of regexes (first group is the value).
+            Defaults to DEFAULT_PATTERNS.
+
+    Returns:
+        dict: field -> value for every field that was found.
+    """
+    patterns = DEFAULT_PATTERNS if patterns is None else patterns
+    wanted = {field.lower(): field for field in fields}
+    found = {}
+
+    # Pass 1: JSON / dict literals.
+    for message in reversed(messages):
+        for obj in scan_objects(message.get("content")):
+            for key, value in obj.items():
+                field = wanted.get(str(key).lower())
+                if field and field not in found and value not in ("", None, [], {}):
+                    found[field] = value
+        if len(found) == len(wanted):
+            return found
+
+    # Pass 2: regex patterns.
+    for message in reversed(messages):
+        content = message.get("content") or ""
+        if not isinstance(content, str):
+            continue
+        for field in fields:
+            if field in found:
+                continue
+            for pattern in patterns.get(field, []):
+                match = re.search(pattern, content)
+                if match:
+                    found[field] = match.group(1).strip(" ,.")
+                    break
+    return found
+
+
+# --------------------------------------------------------------------------------
+# Metrics
+# --------------------------------------------------------------------------------
+class SummaryMetrics:
+    """Counts fast-path hits and estimates the LLM latency they saved."""
+
+    def __init__(self, llm_latency_estimate=1.5):
+        # Used until at least one real LLM fallback has been timed.
+        self.llm_latency_estimate = llm_latency_estimate
+        self.calls = 0
+        self.fast_path_hits = 0
+        self.fast_path_seconds = 0.0
+        self.llm_fallbacks = 0
+        self.llm_seconds = 0.0
+
+    @property
+    def hit_rate(self):
+        return self.fast_path_hits / self.calls if self.calls else 0.0
+
+    @property
+    def avg_llm_latency(self):
+        if self.llm_fallbacks:
+            return self.llm_seconds / self.llm_fallbacks
+        return self.llm_latency_estimate
+
+    @property
+    def latency_saved(self):
+        """Seconds saved: each hit avoided one LLM summary, minus local scan time."""
+        return max(0.0, self.fast_path_hits * self.avg_llm_latency - self.fast_path_seconds)
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "fast_path_hits": self.fast_path_hits,
+            "llm_fallbacks": self.llm_fallbacks,
+            "hit_rate": round(self.hit_rate, 4),
+            "avg_llm_latency_s": round(self.avg_llm_latency, 4),
+            "latency_saved_s": round(self.latency_saved, 4),
+        }
+
+    def report(self):
+        return (
+            f"Summaries: {self.calls} | fast path: {self.fast_path_hits} "
+            f"({self.hit_rate:.0%}) | LLM fallbacks: {self.llm_fallbacks} | "
+            f"latency saved: ~{self.latency_saved:.2f}s"
+        )
+
+
+# --------------------------------------------------------------------------------
+# Summary method
+# --------------------------------------------------------------------------------
+class HybridSummarizer:
+    """Callable `summary_method` for `initiate_chat` / `initiate_chats`.
+
+    Args:
+        fields (list[str]): Fields that must all be present for the fast path.
+        patterns (dict): Optional regex overrides, see DEFAULT_PATTERNS.
+        exclude_sender (bool): Skip messages written by the summarizing sender
+            (the onboarding agent), so its own questions are not mined for answers.
+        metrics (SummaryMetrics): Shared metrics object; one is created if omitted.
+    """
+
+    def __init__(self, fields, patterns=None, exclude_sender=True, metrics=None):
+        self.fields = list(fields)
+        self.patterns = patterns
+        self.exclude_sender = exclude_sender
+        self.metrics = metrics if metrics is not None else SummaryMetrics()
+
+    def __call__(self, sender, recipient, summary_args):
+        self.metrics.calls += 1
+        start = time.perf_counter()
+        messages = sender.chat_messages_for_summary(recipient)
+        if self.exclude_sender:
+            # In the sender's own history its messages carry role "assistant".
+            messages = [
+                m for m in messages
+                if m.get("name", sender.name if m.get("role") == "assistant" else None) != sender.name
+            ]
+        found = extract_fields(messages, self.fields, self.patterns)
+        self.metrics.fast_path_seconds += time.perf_counter() - start
+
+        if all(field in found for field in self.fields):
+            self.metrics.fast_path_hits += 1
+            return json.dumps({field: found[field] for field in self.fields})
+
+        # Fall back to AutoGen's own reflection summary with the same arguments.
+        from autogen import ConversableAgent
+
+        start = time.perf_counter()
+        summary = ConversableAgent._reflection_with_llm_as_summary(sender, recipient, summary_args)
+        self.metrics.llm_seconds += time.perf_counter() - start
+        self.metrics.llm_fallbacks += 1
+        return summary
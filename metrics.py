@@ -0,0 +1,315 @@
+"""
+Token, cost and latency metrics for every LLM call, per run, agent and model.
+
+utils.py records into the process-wide registry (`get_metrics()`) at the client
+layer of both paths: the ManagedClient that configure_agents() puts on AG2 agents
+(replies and reflection_with_llm summaries alike) and v0.7 clients built by
+get_model_client(). Nothing has to be wired into the scripts.
+
+Collected per (run, agent, model):
+    llm_calls_total                  upstream calls
+    llm_prompt_tokens_total          reported by the client, estimated if missing
+    llm_completion_tokens_total
+    llm_cost_usd_total               priced with AutoGenCostCalculator's table
+    llm_retries_total                429 retries
+    llm_request_latency_seconds      histogram
+    llm_completion_tokens            histogram
+and per (run, agent, kind):
+    llm_cache_hits_total             kind="semantic" (SemanticCache) or
+                                     "coalesced" (answered by an in-flight call)
+and per run:
+    llm_cost_predicted_usd           AutoGenCostCalculator.calculate_debate_cost for
+                                     the run's turns, agents and message size
+    llm_cost_drift_ratio             actual / predicted - 1 (alert on this)
+
+Export:
+    get_metrics().snapshot()         nested dict (in-process API)
+    get_metrics().to_prometheus()    Prometheus text exposition format
+    get_metrics().write("llm.prom")  atomic write, e.g. for node_exporter's textfile collector
+    LLM_METRICS_FILE=llm.prom        writes the file when the process exits
+
+The run label is LLM_RUN_ID, or the script name; `start_run(name)` starts a new one.
+"""
+
+import atexit
+import os
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "modern_autogen_v07", "01_feasibility_and_benchmarks"))
+from cost_calculator import AutoGenCostCalculator
+
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (16, 64, 256, 1024, 4096, 16384)
+
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus exposes it."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def as_dict(self):
+        return {"buckets": dict(zip(self.buckets, self.counts)), "sum": self.sum, "count": self.count}
+
+
+class _Series:
+    __slots__ = ("calls", "prompt_tokens", "completion_tokens", "cost_usd", "retries", "latency", "tokens")
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.retries = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.tokens = Histogram(TOKEN_BUCKETS)
+
+
+def _default_run():
+    return os.getenv("LLM_RUN_ID") or os.path.splitext(os.path.basename(sys.argv[0] or ""))[0] or "default"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{k}="{_label(v)}"' for k, v in labels.items()) + "}"
+
+
+class Metrics:
+    """In-process registry of LLM call metrics.
+
+    Args:
+        calculator (AutoGenCostCalculator): Price table and cost prediction.
+        run (str): Label of the current run (default: LLM_RUN_ID or the script name).
+    """
+
+    def __init__(self, calculator=None, run=None):
+        self.calculator = calculator or AutoGenCostCalculator()
+        self.prices = self.calculator.costs
+        self.run = run or _default_run()
+        self._series = {}  # (run, agent, model) -> _Series
+        self._cache_hits = {}  # (run, agent, kind) -> count
+        self._lock = threading.Lock()
+
+    def start_run(self, name):
+        """Label the following calls with run `name`."""
+        self.run = name
+        return name
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+            self._cache_hits.clear()
+
+    # ----------------------------------------------------------------------------
+    # Recording
+    # ----------------------------------------------------------------------------
+    def cost(self, model, prompt_tokens, completion_tokens):
+        """USD for one call; 0 for models missing from the price table."""
+        price = self.prices.get(model)
+        if price is None:
+            return 0.0
+        return prompt_tokens * price["input"] + completion_tokens * price["output"]
+
+    def _get(self, agent, model, run):
+        key = (run or self.run, agent or "unknown", model)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = _Series()
+        return series
+
+    def record_call(self, agent, model, prompt_tokens, completion_tokens, latency_s, run=None):
+        """One upstream call of `agent` on `model`."""
+        with self._lock:
+            series = self._get(agent, model, run)
+            series.calls += 1
+            series.prompt_tokens += prompt_tokens
+            series.completion_tokens += completion_tokens
+            series.cost_usd += self.cost(model, prompt_tokens, completion_tokens)
+            series.latency.observe(latency_s)
+            series.tokens.observe(completion_tokens)
+
+    def record_retry(self, agent, model, run=None):
+        with self._lock:
+            self._get(agent, model, run).retries += 1
+
+    def record_cache_hit(self, agent, kind="semantic", run=None):
+        key = (run or self.run, agent or "unknown", kind)
+        with self._lock:
+            self._cache_hits[key] = self._cache_hits.get(key, 0) + 1
+
+    # ----------------------------------------------------------------------------
+    # Prediction
+    # ----------------------------------------------------------------------------
+    def prediction(self, run=None):
+        """The calculator's estimate for a run with the observed shape.
+
+        turns = upstream calls, agents = distinct agents, avg_tokens = mean
+        completion size, model = the model with the most calls.
+
+        Returns:
+            dict: {"model", "turns", "agents", "avg_tokens", "predicted_cost_usd"},
+            or None when the run made no calls or the calculator has no estimate.
+        """
+        run = run or self.run
+        with self._lock:
+            series = {k: v for k, v in self._series.items() if k[0] == run and v.calls}
+        if not series:
+            return None
+        calls = sum(s.calls for s in series.values())
+        by_model = {}
+        for (_, _, model), s in series.items():
+            by_model[model] = by_model.get(model, 0) + s.calls
+        model = max(by_model, key=by_model.get)
+        agents = len({agent for _, agent, _ in series})
+        avg_tokens = max(1, round(sum(s.completion_tokens for s in series.values()) / calls))
+        result = self.calculator.calculate_debate_cost(turns=calls, agents=agents, avg_tokens=avg_tokens, model=model)
+        if "error" in result:
+            return None
+        # cost_usd is rounded to 5 decimals for display; recompute it from the token counts.
+        breakdown = result["breakdown"]
+        price = self.prices[model]
+        predicted = breakdown["input_tokens_read"] * price["input"] + breakdown["output_tokens_written"] * price["output"]
+        return {"model": model, "turns": calls, "agents": agents, "avg_tokens": avg_tokens,
+                "predicted_cost_usd": predicted}
+
+    # ----------------------------------------------------------------------------
+    # Export
+    # ----------------------------------------------------------------------------
+    def snapshot(self):
+        """{run: {"agents": {agent: {model: {...}}}, "cache_hits": {...}, "cost_usd",
+        "predicted_cost_usd", "cost_drift_ratio"}}"""
+        with self._lock:
+            series = list(self._series.items())
+            hits = list(self._cache_hits.items())
+        runs = {}
+        for (run, agent, model), s in series:
+            entry = runs.setdefault(run, {"agents": {}, "cache_hits": {}, "cost_usd": 0.0})
+            entry["agents"].setdefault(agent, {})[model] = {
+                "calls": s.calls,
+                "prompt_tokens": s.prompt_tokens,
+                "completion_tokens": s.completion_tokens,
+                "cost_usd": s.cost_usd,
+                "retries": s.retries,
+                "latency_s": s.latency.as_dict(),
+                "completion_tokens_hist": s.tokens.as_dict(),
+            }
+            entry["cost_usd"] += s.cost_usd
+        for (run, agent, kind), count in hits:
+            entry = runs.setdefault(run, {"agents": {}, "cache_hits": {}, "cost_usd": 0.0})
+            entry["cache_hits"].setdefault(agent, {})[kind] = count
+        for run, entry in runs.items():
+            predicted = self.prediction(run)
+            entry["predicted_cost_usd"] = predicted["predicted_cost_usd"] if predicted else None
+            entry["cost_drift_ratio"] = (
+                entry["cost_usd"] / predicted["predicted_cost_usd"] - 1
+                if predicted and predicted["predicted_cost_usd"] else None
+            )
+        return runs
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            series = sorted(self._series.items())
+            hits = sorted(self._cache_hits.items())
+        lines = []
+
+        def counter(name, help_text, attr):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} counter"])
+            for (run, agent, model), s in series:
+                lines.append(f"{name}{_labels(run=run, agent=agent, model=model)} {getattr(s, attr)}")
+
+        def histogram(name, help_text, attr):
+            lines.extend([f"# HELP {name} {help_text}", f"# TYPE {name} histogram"])
+            for (run, agent, model), s in series:
+                h = getattr(s, attr)
+                for bound, count in zip(h.buckets, h.counts):
+                    lines.append(f"{name}_bucket{_labels(run=run, agent=agent, model=model, le=bound)} {count}")
+                lines.append(f"{name}_bucket{_labels(run=run, agent=agent, model=model, le='+Inf')} {h.count}")
+                lines.append(f"{name}_sum{_labels(run=run, agent=agent, model=model)} {h.sum}")
+                lines.append(f"{name}_count{_labels(run=run, agent=agent, model=model)} {h.count}")
+
+        counter("llm_calls_total", "Upstream LLM calls.", "calls")
+        counter("llm_prompt_tokens_total", "Prompt tokens sent.", "prompt_tokens")
+        counter("llm_completion_tokens_total", "Completion tokens received.", "completion_tokens")
+        counter("llm_cost_usd_total", "Cost in USD priced with AutoGenCostCalculator.", "cost_usd")
+        counter("llm_retries_total", "Rate-limit retries.", "retries")
+        histogram("llm_request_latency_seconds", "Latency of upstream LLM calls.", "latency")
+        histogram("llm_completion_tokens", "Completion tokens per call.", "tokens")
+
+        lines.extend(["# HELP llm_cache_hits_total Calls answered without an upstream request.",
+                      "# TYPE llm_cache_hits_total counter"])
+        for (run, agent, kind), count in hits:
+            lines.append(f"llm_cache_hits_total{_labels(run=run, agent=agent, kind=kind)} {count}")
+
+        runs = self.snapshot()
+        lines.extend(["# HELP llm_cost_predicted_usd AutoGenCostCalculator's prediction for the run.",
+                      "# TYPE llm_cost_predicted_usd gauge"])
+        for run, entry in sorted(runs.items()):
+            if entry["predicted_cost_usd"] is not None:
+                lines.append(f"llm_cost_predicted_usd{_labels(run=run)} {entry['predicted_cost_usd']}")
+        lines.extend(["# HELP llm_cost_drift_ratio Actual cost / predicted cost - 1.",
+                      "# TYPE llm_cost_drift_ratio gauge"])
+        for run, entry in sorted(runs.items()):
+            if entry["cost_drift_ratio"] is not None:
+                lines.append(f"llm_cost_drift_ratio{_labels(run=run)} {entry['cost_drift_ratio']}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Write the Prometheus text to `path` atomically (temp file + rename)."""
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp, path)
+        return path
+
+    def report(self, run=None):
+        run = run or self.run
+        entry = self.snapshot().get(run)
+        if not entry:
+            return f"Metrics ({run}): no LLM calls."
+        width = max([20, *(len(agent) + 2 for agent in entry["agents"])])
+        lines = [f"Metrics ({run})", f"{'Agent':<{width}}{'Model':<24}{'calls':>6}{'tokens in/out':>16}{'cost':>11}{'retries':>8}"]
+        for agent, models in sorted(entry["agents"].items()):
+            for model, m in sorted(models.items()):
+                tokens = f"{m['prompt_tokens']}/{m['completion_tokens']}"
+                cost = f"${m['cost_usd']:.5f}"
+                lines.append(f"{agent:<{width}}{model:<24}{m['calls']:>6}{tokens:>16}{cost:>11}{m['retries']:>8}")
+        hits = sum(sum(kinds.values()) for kinds in entry["cache_hits"].values())
+        predicted = entry["predicted_cost_usd"]
+        drift = entry["cost_drift_ratio"]
+        lines.append(
+            f"Cost ${entry['cost_usd']:.5f}, predicted ${predicted:.5f} (drift {drift:+.0%}), {hits} cache hits"
+            if predicted else f"Cost ${entry['cost_usd']:.5f} (no prediction), {hits} cache hits"
+        )
+        return "\n".join(lines)
+
+
+_metrics = None
+_metrics_lock = threading.Lock()
+
+
+def get_metrics():
+    """The process-wide registry; writes LLM_METRICS_FILE at exit if it is set."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+            if os.getenv("LLM_METRICS_FILE"):
+                atexit.register(_metrics.write, os.environ["LLM_METRICS_FILE"])
+        return _metrics
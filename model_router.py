@@ -0,0 +1,241 @@
+"""
+Cost- and latency-aware model routing for multi-agent teams.
+
+Every pattern pins all agents to one model, although the reviewers and onboarding
+agents do simple, well-scoped work while meta-review and orchestration need the
+strongest model. `ModelRouter` picks a model per call from a ladder of tiers:
+
+* each agent role starts at a tier (cheap for SEO/Legal/Ethics reviewers and
+  onboarding, the escalation tier for meta-review and orchestration),
+* per turn, the tier is lowered when the estimated latency of the prompt exceeds
+  the latency target or the remaining budget cannot pay for it,
+* cascading: a low-confidence answer (empty, hedging, refusing) is re-asked one
+  tier up, as long as the budget allows,
+* cost is priced with AutoGenCostCalculator's table; the report compares cost and
+  latency with the single-model setup (every call on `baseline_model`).
+
+Usage with the shared factory (utils.py):
+    router = ModelRouter(budget_usd=0.05, latency_target_s=10)  # or ModelRouter.from_env()
+    configure_agents(SEO_reviewer, meta_reviewer, router=router)            # AG2
+    client = get_model_client(role="orchestrator", router=router)           # v0.7
+    ...
+    print(router.report())
+"""
+
+import os
+import re
+import sys
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "modern_autogen_v07", "01_feasibility_and_benchmarks"))
+from cost_calculator import AutoGenCostCalculator
+
+# Cheapest first. Latency figures are starting estimates; they are corrected by
+# the latencies the router observes.
+DEFAULT_TIERS = ("gemini-2.0-flash-lite", "gemini-2.0-flash", "gemini-2.5-pro")
+
+MODEL_LATENCY = {
+    "gemini-2.0-flash-lite": {"ttft_s": 0.35, "tokens_per_s": 250.0},
+    "gemini-2.0-flash": {"ttft_s": 0.45, "tokens_per_s": 200.0},
+    "gemini-2.0-flash-exp": {"ttft_s": 0.45, "tokens_per_s": 200.0},
+    "gemini-2.5-pro": {"ttft_s": 2.50, "tokens_per_s": 90.0},
+}
+
+# role (matched as a substring of the agent name, longest key first) -> tier index
+DEFAULT_ROLE_TIERS = {
+    "seo reviewer": 0,
+    "legal reviewer": 0,
+    "ethics reviewer": 0,
+    "onboarding": 0,
+    "customer engagement": 0,
+    "meta reviewer": 2,
+    "orchestrator": 2,
+}
+
+_HEDGES = re.compile(
+    r"i'?m not sure|i am not sure|i don'?t know|cannot determine|can'?t determine|unable to|"
+    r"not enough information|unclear|it depends|i cannot|i can'?t help|as an ai",
+    re.IGNORECASE,
+)
+
+
+def estimate_tokens(text):
+    return max(1, len(text or "") // 4)
+
+
+def estimate_confidence(text):
+    """Heuristic 0..1 confidence of an answer: empty, very short or hedging answers score low."""
+    if not text or not text.strip():
+        return 0.0
+    score = 1.0 - 0.3 * len(_HEDGES.findall(text))
+    if estimate_tokens(text) < 5:
+        score = min(score, 0.4)
+    return max(0.0, score)
+
+
+class ModelRouter:
+    """Chooses a model per agent role and per turn under a budget and latency target.
+
+    Args:
+        tiers (tuple[str]): Models from cheapest to strongest.
+        role_tiers (dict): role -> starting tier index (substring match on the role).
+        default_tier (int): Tier of roles not listed in `role_tiers`.
+        budget_usd (float): Total spend allowed for routed calls (None: unlimited).
+        latency_target_s (float): Target latency per call (None: no target).
+        min_confidence (float): Answers below this are escalated one tier.
+        max_escalations (int): Escalations allowed per request.
+        expected_output_tokens (int): Output size assumed when estimating a call.
+        baseline_model (str): The single model the patterns use without routing.
+        calculator (AutoGenCostCalculator): Source of the price table.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS, role_tiers=None, default_tier=1, budget_usd=None,
+                 latency_target_s=None, min_confidence=0.6, max_escalations=1,
+                 expected_output_tokens=400, baseline_model="gemini-2.0-flash", calculator=None):
+        self.prices = (calculator or AutoGenCostCalculator()).costs
+        for model in (*tiers, baseline_model):
+            if model not in self.prices:
+                raise ValueError(f"Model {model} not found in cost table.")
+        self.tiers = tuple(tiers)
+        self.role_tiers = {k.lower(): v for k, v in (DEFAULT_ROLE_TIERS if role_tiers is None else role_tiers).items()}
+        self.default_tier = min(default_tier, len(self.tiers) - 1)
+        self.budget_usd = budget_usd
+        self.latency_target_s = latency_target_s
+        self.min_confidence = min_confidence
+        self.max_escalations = max_escalations
+        self.expected_output_tokens = expected_output_tokens
+        self.baseline_model = baseline_model
+        self.spent_usd = 0.0
+        self.baseline_usd = 0.0
+        self.latency_s = 0.0
+        self.baseline_latency_s = 0.0
+        self.escalations = 0
+        self.downgrades = 0
+        self.calls = {}  # model -> number of calls
+        self._latency_scale = {}  # model -> observed / estimated latency (EWMA)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """A router if MODEL_ROUTER=1 is set, else None.
+
+        LLM_BUDGET_USD and LLM_LATENCY_TARGET_S set the budget and latency target.
+        """
+        if os.getenv("MODEL_ROUTER", "").lower() not in ("1", "true", "yes"):
+            return None
+        if os.getenv("LLM_BUDGET_USD"):
+            kwargs.setdefault("budget_usd", float(os.environ["LLM_BUDGET_USD"]))
+        if os.getenv("LLM_LATENCY_TARGET_S"):
+            kwargs.setdefault("latency_target_s", float(os.environ["LLM_LATENCY_TARGET_S"]))
+        return cls(**kwargs)
+
+    # ----------------------------------------------------------------------------
+    # Estimates
+    # ----------------------------------------------------------------------------
+    def tier_for(self, role):
+        role = re.sub(r"[_\-]+", " ", (role or "").lower())
+        for key in sorted(self.role_tiers, key=len, reverse=True):
+            if key in role:
+                return min(self.role_tiers[key], len(self.tiers) - 1)
+        return self.default_tier
+
+    def cost(self, model, prompt_tokens, completion_tokens):
+        price = self.prices[model]
+        return prompt_tokens * price["input"] + completion_tokens * price["output"]
+
+    def latency(self, model, prompt_tokens, completion_tokens):
+        profile = MODEL_LATENCY.get(model, MODEL_LATENCY["gemini-2.0-flash"])
+        estimate = profile["ttft_s"] + completion_tokens / profile["tokens_per_s"]
+        return estimate * self._latency_scale.get(model, 1.0)
+
+    def _affordable(self, model, prompt_tokens):
+        if self.budget_usd is None:
+            return True
+        return self.spent_usd + self.cost(model, prompt_tokens, self.expected_output_tokens) <= self.budget_usd
+
+    # ----------------------------------------------------------------------------
+    # Routing
+    # ----------------------------------------------------------------------------
+    def route(self, role, prompt_tokens):
+        """Model for the next call of `role` with a prompt of `prompt_tokens`."""
+        tier = self.tier_for(role)
+        start = tier
+        with self._lock:
+            while tier > 0:
+                model = self.tiers[tier]
+                too_slow = (self.latency_target_s is not None
+                            and self.latency(model, prompt_tokens, self.expected_output_tokens) > self.latency_target_s)
+                if not too_slow and self._affordable(model, prompt_tokens):
+                    break
+                tier -= 1
+            if tier < start:
+                self.downgrades += 1
+        return self.tiers[tier]
+
+    def observe(self, role, model, prompt_tokens, answer, latency_s, attempt=0, completion_tokens=None):
+        """Record a finished call and decide whether to escalate it.
+
+        Args:
+            answer (str | None): Text of the answer; None for tool calls, which
+                are never escalated.
+            attempt (int): 0 for the first call of a request, 1 for its first
+                escalation, ...
+            completion_tokens (int): Reported usage, if the client returns it.
+
+        Returns:
+            str | None: The model to re-ask, or None to accept the answer.
+        """
+        completion_tokens = completion_tokens or estimate_tokens(answer)
+        with self._lock:
+            self.calls[model] = self.calls.get(model, 0) + 1
+            self.spent_usd += self.cost(model, prompt_tokens, completion_tokens)
+            self.latency_s += latency_s
+            estimated = self.latency(model, prompt_tokens, completion_tokens) / self._latency_scale.get(model, 1.0)
+            if estimated > 0:
+                scale = self._latency_scale.get(model, 1.0)
+                self._latency_scale[model] = 0.8 * scale + 0.2 * (latency_s / estimated)
+            if attempt == 0:
+                # The single-model setup makes exactly one call per request.
+                self.baseline_usd += self.cost(self.baseline_model, prompt_tokens, completion_tokens)
+                self.baseline_latency_s += self.latency(self.baseline_model, prompt_tokens, completion_tokens)
+
+            if answer is None or attempt >= self.max_escalations:
+                return None
+            if estimate_confidence(answer) >= self.min_confidence:
+                return None
+            tier = self.tiers.index(model) if model in self.tiers else self.tier_for(role)
+            if tier + 1 >= len(self.tiers) or not self._affordable(self.tiers[tier + 1], prompt_tokens):
+                return None
+            self.escalations += 1
+            return self.tiers[tier + 1]
+
+    # ----------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------
+    def stats(self):
+        return {
+            "calls": dict(self.calls),
+            "escalations": self.escalations,
+            "downgrades": self.downgrades,
+            "cost_usd": round(self.spent_usd, 6),
+            "baseline_cost_usd": round(self.baseline_usd, 6),
+            "cost_saved_usd": round(self.baseline_usd - self.spent_usd, 6),
+            "latency_s": round(self.latency_s, 3),
+            "baseline_latency_s": round(self.baseline_latency_s, 3),
+            "latency_saved_s": round(self.baseline_latency_s - self.latency_s, 3),
+        }
+
+    def report(self):
+        s = self.stats()
+        calls = ", ".join(f"{model}: {n}" for model, n in s["calls"].items()) or "none"
+
+        def pct(saved, base):
+            return f"{saved / base:+.0%}" if base else "n/a"
+
+        return "\n".join([
+            f"Model router ({calls}; {s['escalations']} escalations, {s['downgrades']} downgrades)",
+            f"   Cost:    ${s['cost_usd']:.5f} vs ${s['baseline_cost_usd']:.5f} on {self.baseline_model} "
+            f"(saved {pct(s['cost_saved_usd'], s['baseline_cost_usd'])})",
+            f"   Latency: {s['latency_s']:.2f}s vs ~{s['baseline_latency_s']:.2f}s estimated on {self.baseline_model} "
+            f"(saved {pct(s['latency_saved_s'], s['baseline_latency_s'])})",
+        ])
@@ -15,6 +15,27 @@ class AutoGenCostCalculator:
                 "input": 3.50 / 1000000,
                 "output": 10.50 / 1000000,
                 "context_limit": 2000000
+            },
+            "gemini-2.0-flash-lite": {
+                "input": 0.075 / 1000000,
+                "output": 0.30 / 1000000,
+                "context_limit": 1048576
+            },
+            "gemini-2.0-flash": {
+                "input": 0.10 / 1000000,
+                "output": 0.40 / 1000000,
+                "context_limit": 1048576
+            },
+            # Experimental endpoint: priced like gemini-2.0-flash for estimates.
+            "gemini-2.0-flash-exp": {
+                "input": 0.10 / 1000000,
+                "output": 0.40 / 1000000,
+                "context_limit": 1048576
+            },
+            "gemini-2.5-pro": {
+                "input": 1.25 / 1000000,
+                "output": 10.00 / 1000000,
+                "context_limit": 1048576
             }
         }
         
@@ -1,26 +1,32 @@
 import time
 import asyncio
 import json
-from autogen_agentchat.agents import AssistantAgent
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_agentchat.teams import RoundRobinGroupChat
 import os
-from dotenv import load_dotenv
+import sys
 
-load_dotenv()
+# Add the repository root to sys.path to import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from utils import get_gemini_api_key, get_model_client
+from metrics import get_metrics
 
 async def benchmark_quality():
     # Configuration
-    gemini_key = os.environ.get("GEMINI_API_KEY")
+    gemini_key = get_gemini_api_key()
     if not gemini_key:
         print("Error: GEMINI_API_KEY not found.")
         return
 
+    # Imported after the key check: loading the framework takes most of the
+    # start-up time (see startup_benchmark.py in the repository root).
+    from autogen_agentchat.agents import AssistantAgent
+    from autogen_agentchat.teams import RoundRobinGroupChat
+
     # 1. Setup Client
-    model_client = OpenAIChatCompletionClient(
+    # Shared factory (utils.py): pooled HTTP connections, a rate limiter shared by
+    # all agents of the team, and jittered retries on 429s.
+    model_client = get_model_client(
         model="gemini-2.0-flash-exp",
         api_key=gemini_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
         model_info={"vision": True, "function_calling": True, "json_output": True, "family": "gemini-2.0-flash-exp"}
     )
 
@@ -134,5 +140,12 @@ async def benchmark_quality():
     except json.JSONDecodeError:
         print("Error decoding Judge's JSON response. Raw output:\n" + json_str)
 
+    # Usage of all three phases (single agent, team, judge) recorded by the client
+    print("\n" + get_metrics().report())
+
+def main():
+    asyncio.run(benchmark_quality())
+
+
 if __name__ == "__main__":
-    asyncio.run(benchmark_quality())
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,668 @@
+"""
+Discrete-event simulation of multi-agent wall-clock time.
+
+AutoGenCostCalculator predicts tokens and dollars; this predicts *time* without
+spending either. A team topology is replayed as a sequence (or tree) of LLM calls
+against simulated resources:
+
+* per-agent latency: time to first token + prompt prefill + output / throughput
+  (defaults from model_router.MODEL_LATENCY, optional lognormal jitter),
+* the shared rate limiter from utils.py: a requests-per-minute and a
+  tokens-per-minute token bucket per model (same debt semantics as TokenBucket),
+* the HTTP connection pool: at most `concurrency` calls in flight, FIFO.
+
+Several jobs (team runs) can be started at once or at an arrival interval, which
+is where queueing shows up. For every simulation you get the wall time, the
+critical path of the slowest job and the time spent queueing for the limiter and
+for a connection.
+
+Topologies: SingleAgent, RoundRobin, NestedReviewers (the blog post pattern),
+SequentialChats (initiate_chats, the onboarding pattern) and MagenticOneLoop.
+monte_carlo() adds latency jitter and reports the wall time spread.
+
+Usage:
+    writer = AgentSpec("writer", output_tokens=200)
+    sim = Simulation(rpm=15, concurrency=20)
+    result = sim.simulate(RoundRobin([writer, critic, legal], max_turns=6), jobs=10)
+    print(result.report())
+"""
+
+import heapq
+import math
+import os
+import random
+import statistics
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from cost_calculator import AutoGenCostCalculator
+from model_router import MODEL_LATENCY
+from utils import DEFAULT_RPM, DEFAULT_TPM
+
+DEFAULT_PROFILE = MODEL_LATENCY["gemini-2.0-flash"]
+
+
+# --------------------------------------------------------------------------------
+# Agents
+# --------------------------------------------------------------------------------
+class AgentSpec:
+    """Latency and size model of one agent.
+
+    Args:
+        name (str): Agent name (shown on the critical path).
+        model (str): Model used; selects the latency profile, rate limiter and price.
+        output_tokens (int): Tokens generated per reply.
+        system_tokens (int): Size of the system message, re-sent on every call.
+        ttft_s (float): Time to first token (default: the model's profile).
+        tokens_per_s (float): Generation throughput (default: the model's profile).
+        prefill_tokens_per_s (float): Prompt processing throughput.
+        tool_s (float): Time spent executing tools/code after each reply.
+    """
+
+    def __init__(self, name, model="gemini-2.0-flash", output_tokens=300, system_tokens=100, ttft_s=None,
+                 tokens_per_s=None, prefill_tokens_per_s=5000.0, tool_s=0.0):
+        profile = MODEL_LATENCY.get(model, DEFAULT_PROFILE)
+        self.name = name
+        self.model = model
+        self.output_tokens = output_tokens
+        self.system_tokens = system_tokens
+        self.ttft_s = profile["ttft_s"] if ttft_s is None else ttft_s
+        self.tokens_per_s = profile["tokens_per_s"] if tokens_per_s is None else tokens_per_s
+        self.prefill_tokens_per_s = prefill_tokens_per_s
+        self.tool_s = tool_s
+
+    def latency(self, prompt_tokens, output_tokens=None):
+        output_tokens = self.output_tokens if output_tokens is None else output_tokens
+        return self.ttft_s + prompt_tokens / self.prefill_tokens_per_s + output_tokens / self.tokens_per_s
+
+
+# --------------------------------------------------------------------------------
+# Simulated resources
+# --------------------------------------------------------------------------------
+class _Bucket:
+    """utils.TokenBucket on simulated time: reserve() may go into debt and returns the wait."""
+
+    def __init__(self, rate_per_minute):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = rate_per_minute
+        self.tokens = float(rate_per_minute)
+        self.updated = 0.0
+
+    def reserve(self, now, amount):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= min(amount, self.capacity)
+        return max(0.0, -self.tokens / self.rate)
+
+
+class _Limiter:
+    """utils.RateLimiter: a limit of None is not enforced."""
+
+    def __init__(self, rpm, tpm):
+        self.requests = _Bucket(rpm) if rpm else None
+        self.tokens = _Bucket(tpm) if tpm else None
+
+    def reserve(self, now, tokens):
+        return max(self.requests.reserve(now, 1) if self.requests else 0.0,
+                   self.tokens.reserve(now, tokens) if self.tokens else 0.0)
+
+
+class CallRecord:
+    """One simulated LLM call (times in seconds since the start of the simulation)."""
+
+    __slots__ = ("job", "agent", "model", "prompt_tokens", "output_tokens", "requested", "admitted", "started",
+                 "ended")
+
+    def __init__(self, job, agent, prompt_tokens, output_tokens, requested):
+        self.job = job
+        self.agent = agent.name
+        self.model = agent.model
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = output_tokens
+        self.requested = requested
+        self.admitted = None  # rate limiter passed
+        self.started = None  # connection acquired
+        self.ended = None
+
+    @property
+    def limiter_wait_s(self):
+        return self.admitted - self.requested
+
+    @property
+    def pool_wait_s(self):
+        return self.started - self.admitted
+
+    @property
+    def service_s(self):
+        return self.ended - self.started
+
+
+class Segment:
+    """A step on a job's path: an LLM call or a wait (human reply, tool execution)."""
+
+    __slots__ = ("label", "kind", "start", "end", "queued_s")
+
+    def __init__(self, label, kind, start, end, queued_s=0.0):
+        self.label = label
+        self.kind = kind
+        self.start = start
+        self.end = end
+        self.queued_s = queued_s
+
+    @property
+    def duration_s(self):
+        return self.end - self.start
+
+
+# --------------------------------------------------------------------------------
+# Events and processes
+# --------------------------------------------------------------------------------
+# Topologies are generators that yield these requests; the simulation resumes
+# them with the result (a CallRecord, None, or a list of child results).
+class _Call:
+    def __init__(self, agent, prompt_tokens, output_tokens=None):
+        self.agent = agent
+        self.prompt_tokens = prompt_tokens
+        self.output_tokens = agent.output_tokens if output_tokens is None else output_tokens
+
+
+class _Wait:
+    def __init__(self, seconds, label):
+        self.seconds = seconds
+        self.label = label
+
+
+class _AllOf:
+    def __init__(self, generators):
+        self.generators = generators
+
+
+class _Process:
+    def __init__(self, sim, generator, job, on_done):
+        self.sim = sim
+        self.generator = generator
+        self.job = job
+        self.on_done = on_done
+        self.path = []
+        self.ended = None
+
+    def resume(self, value=None):
+        try:
+            request = self.generator.send(value)
+        except StopIteration as stop:
+            self.ended = self.sim.now
+            self.on_done(self, stop.value)
+            return
+        self.sim._dispatch(self, request)
+
+
+class Simulation:
+    """Discrete-event engine with shared rate limiters and a connection pool.
+
+    Args:
+        rpm (int): Requests per minute per model (None: unlimited, like utils.DEFAULT_RPM).
+        tpm (int): Tokens per minute per model (None: unlimited).
+        limits (dict): model -> (rpm, tpm), overrides for single models.
+        concurrency (int): Calls in flight at once (utils.get_http_client uses 20).
+        jitter (float): Sigma of a lognormal factor applied to each latency (0: deterministic).
+        seed (int): Seed for the jitter.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM, limits=None, concurrency=20, jitter=0.0, seed=0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.limits = limits or {}
+        self.concurrency = concurrency
+        self.jitter = jitter
+        self.seed = seed
+
+    # ----------------------------------------------------------------------------
+    # Requests (yielded by topologies)
+    # ----------------------------------------------------------------------------
+    @staticmethod
+    def call(agent, prompt_tokens, output_tokens=None):
+        return _Call(agent, prompt_tokens, output_tokens)
+
+    @staticmethod
+    def wait(seconds, label="wait"):
+        return _Wait(seconds, label)
+
+    @staticmethod
+    def all_of(*generators):
+        return _AllOf(list(generators))
+
+    # ----------------------------------------------------------------------------
+    # Engine
+    # ----------------------------------------------------------------------------
+    def _reset(self):
+        self.now = 0.0
+        self._events = []
+        self._seq = 0
+        self._limiters = {}
+        self._free = self.concurrency
+        self._pool_queue = []
+        self._rng = random.Random(self.seed)
+        self.calls = []
+
+    def _at(self, time, fn, *args):
+        self._seq += 1
+        heapq.heappush(self._events, (time, self._seq, fn, args))
+
+    def _limiter(self, model):
+        if model not in self._limiters:
+            rpm, tpm = self.limits.get(model, (self.rpm, self.tpm))
+            self._limiters[model] = _Limiter(rpm, tpm)
+        return self._limiters[model]
+
+    def _dispatch(self, process, request):
+        if isinstance(request, _Call):
+            record = CallRecord(process.job, request.agent, request.prompt_tokens, request.output_tokens, self.now)
+            self.calls.append(record)
+            wait = self._limiter(request.agent.model).reserve(self.now, request.prompt_tokens + request.output_tokens)
+            self._at(self.now + wait, self._admit, process, request, record)
+        elif isinstance(request, _Wait):
+            start = self.now
+            process.path.append(Segment(request.label, "wait", start, start + request.seconds))
+            self._at(start + request.seconds, process.resume, None)
+        elif isinstance(request, _AllOf):
+            self._spawn_children(process, request.generators)
+        else:
+            raise TypeError(f"Topologies must yield sim.call/wait/all_of, got {request!r}")
+
+    def _admit(self, process, request, record):
+        record.admitted = self.now
+        if self._free:
+            self._free -= 1
+            self._start(process, request, record)
+        else:
+            self._pool_queue.append((process, request, record))
+
+    def _start(self, process, request, record):
+        record.started = self.now
+        service = request.agent.latency(request.prompt_tokens, request.output_tokens)
+        if self.jitter:
+            service *= self._rng.lognormvariate(-self.jitter ** 2 / 2, self.jitter)  # mean 1
+        self._at(self.now + service, self._finish, process, request, record)
+
+    def _finish(self, process, request, record):
+        record.ended = self.now
+        queued = record.limiter_wait_s + record.pool_wait_s
+        process.path.append(Segment(request.agent.name, "call", record.requested, record.ended, queued))
+        if self._pool_queue:
+            self._start(*self._pool_queue.pop(0))
+        else:
+            self._free += 1
+        if request.agent.tool_s:
+            start = self.now
+            process.path.append(Segment(f"{request.agent.name} tools", "wait", start, start + request.agent.tool_s))
+            self._at(start + request.agent.tool_s, process.resume, record)
+        else:
+            process.resume(record)
+
+    def _spawn_children(self, parent, generators):
+        results = [None] * len(generators)
+        children = []
+        pending = [len(generators)]
+
+        def done(child, value):
+            results[children.index(child)] = value
+            pending[0] -= 1
+            if pending[0] == 0:
+                # The critical path runs through the branch that finished last.
+                last = max(children, key=lambda c: c.ended)
+                parent.path.extend(last.path)
+                parent.resume(results)
+
+        for generator in generators:
+            children.append(_Process(self, generator, parent.job, done))
+        if not children:
+            parent.resume([])
+        for child in children:
+            child.resume()
+
+    def simulate(self, topology, jobs=1, arrival_s=0.0):
+        """Run `jobs` instances of `topology`, the i-th one starting at i * arrival_s.
+
+        Returns:
+            SimulationResult
+        """
+        if jobs < 1:
+            raise ValueError(f"jobs must be at least 1, got {jobs}")
+        self._reset()
+        finished = []
+
+        def done(process, value):
+            finished.append(process)
+
+        processes = [_Process(self, topology.run(self), job, done) for job in range(jobs)]
+        for job, process in enumerate(processes):
+            process.started = job * arrival_s
+            self._at(process.started, process.resume)
+        while self._events:
+            self.now, _, fn, args = heapq.heappop(self._events)
+            fn(*args)
+        return SimulationResult(topology, self, processes)
+
+
+# --------------------------------------------------------------------------------
+# Results
+# --------------------------------------------------------------------------------
+def _percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+
+
+class SimulationResult:
+    def __init__(self, topology, sim, processes):
+        self.topology = topology
+        self.calls = list(sim.calls)
+        self.jobs = processes
+        self.concurrency = sim.concurrency
+        self.prices = AutoGenCostCalculator().costs
+
+    @property
+    def wall_s(self):
+        """Time until the last job finished."""
+        return max(p.ended for p in self.jobs)
+
+    def job_times(self):
+        return [p.ended - p.started for p in self.jobs]
+
+    def slowest_job(self):
+        return max(self.jobs, key=lambda p: p.ended - p.started)
+
+    def critical_path(self, job=None):
+        """Segments on the path that determined the end time of `job` (default: the slowest)."""
+        process = self.slowest_job() if job is None else self.jobs[job]
+        return list(process.path)
+
+    def queueing(self):
+        """Seconds spent waiting for the rate limiter and for a connection, per model."""
+        by_model = {}
+        for c in self.calls:
+            entry = by_model.setdefault(c.model, {"calls": 0, "limiter_wait_s": 0.0, "pool_wait_s": 0.0,
+                                                  "max_wait_s": 0.0})
+            entry["calls"] += 1
+            entry["limiter_wait_s"] += c.limiter_wait_s
+            entry["pool_wait_s"] += c.pool_wait_s
+            entry["max_wait_s"] = max(entry["max_wait_s"], c.limiter_wait_s + c.pool_wait_s)
+        return by_model
+
+    def cost_usd(self):
+        total = 0.0
+        for c in self.calls:
+            price = self.prices.get(c.model)
+            if price:
+                total += c.prompt_tokens * price["input"] + c.output_tokens * price["output"]
+        return total
+
+    def as_dict(self):
+        times = self.job_times()
+        return {
+            "topology": self.topology.name,
+            "jobs": len(self.jobs),
+            "calls": len(self.calls),
+            "wall_s": round(self.wall_s, 3),
+            "job_s_mean": round(statistics.mean(times), 3),
+            "job_s_p95": round(_percentile(times, 0.95), 3),
+            "queued_s": round(sum(c.limiter_wait_s + c.pool_wait_s for c in self.calls), 3),
+            "cost_usd": round(self.cost_usd(), 6),
+            "queueing": self.queueing(),
+            "critical_path": [
+                {"step": s.label, "kind": s.kind, "start_s": round(s.start, 3), "duration_s": round(s.duration_s, 3),
+                 "queued_s": round(s.queued_s, 3)}
+                for s in self.critical_path()
+            ],
+        }
+
+    def report(self, path_steps=12):
+        d = self.as_dict()
+        lines = [
+            f"   Topology:  {d['topology']} x {d['jobs']} job(s), {d['calls']} LLM calls, concurrency {self.concurrency}",
+            f"   Wall time: {d['wall_s']:.1f}s (per job: mean {d['job_s_mean']:.1f}s, p95 {d['job_s_p95']:.1f}s)",
+            f"   Cost:      ${d['cost_usd']:.5f}",
+        ]
+        for model, q in d["queueing"].items():
+            lines.append(f"   Queueing:  {model}: {q['limiter_wait_s']:.1f}s rate limiter, "
+                         f"{q['pool_wait_s']:.1f}s connection pool (max {q['max_wait_s']:.1f}s per call)")
+        path = d["critical_path"]
+        lines.append(f"   Critical path ({len(path)} steps):")
+        shown = path if len(path) <= path_steps else path[:path_steps // 2] + [None] + path[-path_steps // 2:]
+        for step in shown:
+            if step is None:
+                lines.append("      ...")
+                continue
+            queued = f" (queued {step['queued_s']:.1f}s)" if step["queued_s"] >= 0.05 else ""
+            lines.append(f"      {step['start_s']:>7.1f}s  {step['step']:<24}{step['duration_s']:>6.1f}s{queued}")
+        return "\n".join(lines)
+
+
+# --------------------------------------------------------------------------------
+# Topologies
+# --------------------------------------------------------------------------------
+class SingleAgent:
+    """One agent answers the task in one call (the performance_benchmark.py baseline)."""
+
+    def __init__(self, agent, task_tokens=50):
+        self.agent = agent
+        self.task_tokens = task_tokens
+        self.name = f"single agent ({agent.name})"
+
+    def run(self, sim):
+        yield sim.call(self.agent, self.agent.system_tokens + self.task_tokens)
+
+
+class RoundRobin:
+    """RoundRobinGroupChat: agents speak in turn, each re-reading the whole history."""
+
+    def __init__(self, agents, max_turns=6, task_tokens=50):
+        self.agents = agents
+        self.max_turns = max_turns
+        self.task_tokens = task_tokens
+        self.name = f"round-robin ({len(agents)} agents, {max_turns} turns)"
+
+    def run(self, sim):
+        history = self.task_tokens
+        for turn in range(self.max_turns):
+            agent = self.agents[turn % len(self.agents)]
+            yield sim.call(agent, agent.system_tokens + history)
+            history += agent.output_tokens
+
+
+class NestedReviewers:
+    """The reflection pattern: writer drafts, the critic's nested chats review, writer revises.
+
+    Each reviewer chat is one review call plus, with `summaries`, one
+    reflection_with_llm summary call; the meta reviewer reads all summaries.
+    AG2 runs nested chats one after the other; `parallel=True` models running the
+    reviewers concurrently.
+
+    Args:
+        writer (AgentSpec): Writes and revises.
+        reviewers (list[AgentSpec]): SEO, legal, ethics...
+        meta (AgentSpec): Aggregates the reviews (None: no meta review).
+        turns (int): max_turns of the writer/critic chat (2: draft, review, revision).
+        summary_tokens (int): Size of each reviewer summary.
+    """
+
+    def __init__(self, writer, reviewers, meta=None, turns=2, summaries=True, parallel=False, task_tokens=50,
+                 summary_tokens=60):
+        self.writer = writer
+        self.reviewers = reviewers
+        self.meta = meta
+        self.turns = turns
+        self.summaries = summaries
+        self.parallel = parallel
+        self.task_tokens = task_tokens
+        self.summary_tokens = summary_tokens
+        mode = "parallel" if parallel else "sequential"
+        self.name = f"nested reviewers ({len(reviewers)} {mode}{' + meta' if meta else ''})"
+
+    def _review(self, sim, reviewer, draft_tokens):
+        yield sim.call(reviewer, reviewer.system_tokens + draft_tokens)
+        if self.summaries:
+            yield sim.call(reviewer, reviewer.system_tokens + draft_tokens + reviewer.output_tokens,
+                           output_tokens=self.summary_tokens)
+
+    def run(self, sim):
+        history = self.task_tokens
+        for turn in range(self.turns):
+            yield sim.call(self.writer, self.writer.system_tokens + history)
+            history += self.writer.output_tokens
+            if turn == self.turns - 1:
+                break
+            draft = self.writer.output_tokens
+            if self.parallel:
+                yield sim.all_of(*(self._review(sim, r, draft) for r in self.reviewers))
+            else:
+                for reviewer in self.reviewers:
+                    yield from self._review(sim, reviewer, draft)
+            feedback = len(self.reviewers) * self.summary_tokens
+            if self.meta is not None:
+                yield sim.call(self.meta, self.meta.system_tokens + draft + feedback)
+                feedback = self.meta.output_tokens
+            history += feedback
+
+
+class SequentialChats:
+    """initiate_chats: stages run one after another, each carrying summaries forward.
+
+    Args:
+        stages (list[dict]): {"agent": AgentSpec, "turns": agent replies,
+            "human_s": think time per human reply (0 for none),
+            "summary": True for reflection_with_llm (one extra call), False
+            to carry the last reply forward}.
+        human_tokens (int): Size of each human reply.
+        summary_tokens (int): Size of each carried-over summary.
+    """
+
+    def __init__(self, stages, human_tokens=20, summary_tokens=60):
+        self.stages = stages
+        self.human_tokens = human_tokens
+        self.summary_tokens = summary_tokens
+        self.name = f"sequential chats ({len(stages)} stages)"
+
+    def run(self, sim):
+        carryover = 0
+        for stage in self.stages:
+            agent = stage["agent"]
+            history = carryover
+            for turn in range(stage.get("turns", 1)):
+                yield sim.call(agent, agent.system_tokens + history)
+                history += agent.output_tokens
+                if stage.get("human_s") and turn < stage.get("turns", 1) - 1:
+                    yield sim.wait(stage["human_s"], "human reply")
+                    history += self.human_tokens
+            if stage.get("summary", True):
+                yield sim.call(agent, agent.system_tokens + history, output_tokens=self.summary_tokens)
+                carryover += self.summary_tokens
+            else:
+                carryover += agent.output_tokens  # "last_msg": the stage's last reply
+
+
+class MagenticOneLoop:
+    """MagenticOne: the orchestrator's ledgers drive the workers step by step.
+
+    Task ledger (facts + plan, 2 calls), then per step a progress-ledger call
+    and one worker turn (plus its tool time), and a final answer call. Every
+    `replan_every` steps the task ledger is rebuilt (2 more calls).
+
+    Args:
+        orchestrator (AgentSpec): Plans and selects the next speaker.
+        workers (list[AgentSpec]): Coder, FileSurfer...; chosen round-robin here.
+        steps (int): Worker turns until the request is satisfied.
+        ledger_tokens (int): Output size of a progress ledger (JSON).
+    """
+
+    def __init__(self, orchestrator, workers, steps=6, replan_every=None, task_tokens=150, ledger_tokens=150):
+        self.orchestrator = orchestrator
+        self.workers = workers
+        self.steps = steps
+        self.replan_every = replan_every
+        self.task_tokens = task_tokens
+        self.ledger_tokens = ledger_tokens
+        self.name = f"MagenticOne ({len(workers)} workers, {steps} steps)"
+
+    def _task_ledger(self, sim, context):
+        o = self.orchestrator
+        yield sim.call(o, o.system_tokens + context)  # facts
+        yield sim.call(o, o.system_tokens + context + o.output_tokens)  # plan
+
+    def run(self, sim):
+        o = self.orchestrator
+        history = self.task_tokens
+        yield from self._task_ledger(sim, history)
+        history += 2 * o.output_tokens
+        for step in range(self.steps):
+            if self.replan_every and step and step % self.replan_every == 0:
+                yield from self._task_ledger(sim, history)
+                history += 2 * o.output_tokens
+            yield sim.call(o, o.system_tokens + history, output_tokens=self.ledger_tokens)
+            worker = self.workers[step % len(self.workers)]
+            yield sim.call(worker, worker.system_tokens + history)
+            history += worker.output_tokens
+        yield sim.call(o, o.system_tokens + history)  # final answer
+
+
+def compare(topologies, jobs=1, arrival_s=0.0, **sim_kwargs):
+    """Simulate several topologies under the same limits. Returns {name: SimulationResult}."""
+    sim = Simulation(**sim_kwargs)
+    return {t.name: sim.simulate(t, jobs=jobs, arrival_s=arrival_s) for t in topologies}
+
+
+def monte_carlo(topology, trials=200, jobs=1, arrival_s=0.0, jitter=0.3, **sim_kwargs):
+    """Wall time distribution over `trials` seeds with lognormal latency jitter.
+
+    Returns:
+        dict: {"trials", "wall_s_p50", "wall_s_p95", "wall_s_max"}.
+    """
+    walls = [Simulation(jitter=jitter, seed=seed, **sim_kwargs).simulate(topology, jobs, arrival_s).wall_s
+             for seed in range(trials)]
+    return {"trials": trials, "wall_s_p50": round(_percentile(walls, 0.5), 3),
+            "wall_s_p95": round(_percentile(walls, 0.95), 3), "wall_s_max": round(max(walls), 3)}
+
+
+if __name__ == "__main__":
+    marketer = AgentSpec("marketer", output_tokens=150)
+    critic = AgentSpec("critic", output_tokens=200)
+    legal = AgentSpec("legal", output_tokens=150)
+
+    writer = AgentSpec("Writer", output_tokens=180)
+    reviewers = [AgentSpec(n, output_tokens=120) for n in ("SEO_Reviewer", "Legal_Reviewer", "Ethics_Reviewer")]
+    meta = AgentSpec("Meta_Reviewer", output_tokens=150)
+
+    print("\n------------------------------------------------")
+    print("      MULTI-AGENT WALL-CLOCK SIMULATOR")
+    print("------------------------------------------------")
+
+    print("\n1. Single Agent vs Team Debate (performance_benchmark.py, 1 job)")
+    results = compare([SingleAgent(marketer), RoundRobin([marketer, critic, legal], max_turns=6)])
+    single, team = results.values()
+    for result in results.values():
+        print(result.report(path_steps=6))
+    print(f"   => Team is {team.wall_s / single.wall_s:.1f}x slower (predicted, no API calls made)")
+    spread = monte_carlo(RoundRobin([marketer, critic, legal], max_turns=6))
+    print(f"   => With 30% latency jitter: p50 {spread['wall_s_p50']:.1f}s, p95 {spread['wall_s_p95']:.1f}s "
+          f"({spread['trials']} trials)")
+
+    print("\n2. Nested reviewers: AG2 (sequential) vs parallel reviews")
+    for result in compare([NestedReviewers(writer, reviewers, meta),
+                           NestedReviewers(writer, reviewers, meta, parallel=True)]).values():
+        print(result.report())
+
+    print("\n3. Customer onboarding (initiate_chats with a human answering in ~8s)")
+    onboarding = SequentialChats([
+        {"agent": AgentSpec("Personal_Information", output_tokens=60), "turns": 2, "human_s": 8},
+        {"agent": AgentSpec("Topic_Preference", output_tokens=60), "turns": 2, "human_s": 8},
+        {"agent": AgentSpec("Customer_Engagement", output_tokens=250), "turns": 1, "summary": False},
+    ])
+    print(Simulation().simulate(onboarding).report())
+
+    print("\n4. Capacity: MagenticOne incident response at 15 RPM (free tier) vs 1000 RPM")
+    magentic = MagenticOneLoop(AgentSpec("Orchestrator", output_tokens=250),
+                               [AgentSpec("Coder", output_tokens=300, tool_s=2.0),
+                                AgentSpec("FileSurfer", output_tokens=200)], steps=6)
+    for rpm in (15, 1000):
+        for jobs in (1, 10):
+            print(f"\n   -- {jobs} concurrent run(s), {rpm} RPM --")
+            print(Simulation(rpm=rpm).simulate(magentic, jobs=jobs).report(path_steps=6))
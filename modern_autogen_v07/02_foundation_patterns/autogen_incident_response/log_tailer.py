@@ -0,0 +1,453 @@
+"""
+Continuous incident trigger: tail log files and start a MagenticOne investigation
+only when a NEW error signature shows up.
+
+magentic_one_orchestrator.py investigates one static log by hand. In production
+the logs keep growing, rotate, and repeat the same error hundreds of times a
+minute; one team run per error line would cost a fortune and bury the on-call in
+duplicate reports. This watcher:
+
+1. Tails files by polling: reads only the bytes appended since the last poll,
+   follows rename rotation (drains the old file, then opens the new one) and
+   copytruncate (file shrank -> start again at 0). Byte offsets are persisted,
+   so a restart resumes where it stopped instead of re-reading the file.
+2. Parses incrementally into records: a timestamped header line plus its
+   continuation lines (stack frames, "Caused by: ...").
+3. Reduces each ERROR/FATAL record to a signature: service + root cause (the
+   last "Caused by:" line if there is one) with numbers, ids, paths and quoted
+   values normalized away, so "Pool 7 exhausted" and "Pool 9 exhausted" match.
+4. Deduplicates: a signature triggers once, then again only after `cooldown`
+   seconds; repeats are counted. New signatures that arrive within a few
+   seconds of each other (the 503 and the database error behind it) are
+   investigated together. Investigations are rate-limited with a token bucket
+   (utils.TokenBucket) and run one at a time in the background, so tailing
+   never stops while the team works.
+
+Usage:
+    python log_tailer.py production_logs.txt --dry-run          # print incidents only
+    python log_tailer.py /var/log/app/*.log --cooldown 900 --max-runs-per-hour 4
+    python log_tailer.py production_logs.txt --once              # one pass, then exit
+
+State (offsets and known signatures) is kept in .log_tailer_state.json.
+"""
+
+import argparse
+import asyncio
+import collections
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+
+# Add the repository root to sys.path to import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from utils import TokenBucket
+
+HEADER = re.compile(r"^(?P<ts>\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?)\s+(?P<level>[A-Z]+)\s+"
+                    r"(?:\[(?P<service>[^\]]+)\]\s*)?(?P<message>.*)$")
+CAUSE = re.compile(r"^\s*Caused by:\s*(?P<cause>.*)$")
+SEVERE = {"ERROR", "FATAL", "CRITICAL", "PANIC"}
+
+# Applied in order; each variable part becomes a placeholder.
+NORMALIZE = [
+    (re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}", re.I), "<uuid>"),
+    (re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}(?::\d+)?\b"), "<ip>"),
+    (re.compile(r"(?:/[\w.-]+)+\.\w+(?::\d+)?"), "<path>"),
+    (re.compile(r"\b0x[0-9a-f]+\b|\b[0-9a-f]{12,}\b", re.I), "<hex>"),
+    (re.compile(r"'[^']*'|\"[^\"]*\""), "<str>"),
+    (re.compile(r"\d+(?:\.\d+)?"), "<n>"),
+]
+
+
+# --------------------------------------------------------------------------------
+# Records and signatures
+# --------------------------------------------------------------------------------
+class LogRecord:
+    """One log entry: the header line and its continuation lines."""
+
+    __slots__ = ("source", "offset", "timestamp", "level", "service", "message", "lines")
+
+    def __init__(self, source, offset, timestamp, level, service, message, line):
+        self.source = source
+        self.offset = offset
+        self.timestamp = timestamp
+        self.level = level
+        self.service = service or ""
+        self.message = message
+        self.lines = [line]
+
+    @property
+    def cause(self):
+        """The innermost "Caused by:" of the record, or its message."""
+        for line in reversed(self.lines):
+            match = CAUSE.match(line)
+            if match:
+                return match.group("cause")
+        return self.message
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+
+def normalize(text):
+    for pattern, placeholder in NORMALIZE:
+        text = pattern.sub(placeholder, text)
+    return " ".join(text.split())
+
+
+def describe(record):
+    """The record as the investigators should see it: service, message and root cause
+    with their real values (the signature's placeholders are only for deduplication)."""
+    text = f"[{record.service}] {record.message}" if record.service else record.message
+    if record.cause != record.message:
+        text += f" (caused by: {record.cause})"
+    return text
+
+
+def signature(record):
+    """(id, readable key) of a record; records with the same root cause share the id."""
+    key = f"{record.service}: {normalize(record.cause)}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:12], key
+
+
+class RecordParser:
+    """Turns lines into LogRecords. A record is complete when the next header arrives
+    (or on flush(), after the file has been idle)."""
+
+    def __init__(self, source):
+        self.source = source
+        self.pending = None
+
+    def feed(self, line, offset):
+        """Add one line that starts at byte `offset`. Returns the record it completed, if any."""
+        match = HEADER.match(line)
+        if match is None:
+            if self.pending is not None:
+                self.pending.lines.append(line)
+            return None  # a continuation without a header (start of a file mid-record) is dropped
+        done, self.pending = self.pending, LogRecord(
+            self.source, offset, match.group("ts"), match.group("level"), match.group("service"),
+            match.group("message"), line)
+        return done
+
+    def flush(self):
+        done, self.pending = self.pending, None
+        return done
+
+
+# --------------------------------------------------------------------------------
+# Tailing
+# --------------------------------------------------------------------------------
+class FileTailer:
+    """Follows one log file across appends, rename rotation and truncation.
+
+    Args:
+        path (str): File to follow (it may not exist yet).
+        state (dict): Persisted {"inode", "offset"} for this path, updated in place.
+        from_end (bool): Without saved state, skip what is already in the file.
+    """
+
+    def __init__(self, path, state, from_end=False):
+        self.path = path
+        self.state = state
+        self.from_end = from_end
+        self.file = None
+        self.inode = None
+        self.position = 0
+        self.buffer = b""
+        self.parser = RecordParser(path)
+        self.rotations = 0
+
+    def _open(self, resume):
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        st = os.fstat(f.fileno())
+        offset = 0
+        if resume and self.state.get("inode") == st.st_ino and self.state.get("offset", 0) <= st.st_size:
+            offset = self.state["offset"]
+        elif resume and self.from_end:
+            offset = st.st_size
+        f.seek(offset)
+        self.file, self.inode, self.position, self.buffer = f, st.st_ino, offset, b""
+        return True
+
+    def _read(self):
+        """Complete lines appended since the last read, as (line, offset)."""
+        data = self.file.read()
+        if not data:
+            return []
+        self.buffer += data
+        lines = []
+        start = self.position - len(self.buffer) + len(data)  # offset of the buffered bytes
+        *complete, self.buffer = self.buffer.split(b"\n")
+        for raw in complete:
+            lines.append((raw.decode("utf-8", errors="replace").rstrip("\r"), start))
+            start += len(raw) + 1
+        self.position += len(data)
+        return lines
+
+    def poll(self):
+        """Read new data. Returns the completed records."""
+        if self.file is None and not self._open(resume=True):
+            return []
+        lines = self._read()
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            st = None  # rotated away and not recreated yet: keep the old handle
+        rotated = st is not None and st.st_ino != self.inode
+        truncated = not rotated and st is not None and st.st_size < self.position
+        records = []
+        if rotated or truncated:
+            # The old content ends here: complete its last record, so that no offset
+            # into the old content is saved for the new one.
+            records = self._parse(lines) + [r for r in [self.parser.flush()] if r is not None]
+            self.rotations += 1
+        if rotated:
+            # Rename rotation: the old handle was drained above, continue with the new file.
+            self.file.close()
+            self._open(resume=False)
+            lines = self._read()
+        elif truncated:
+            # copytruncate: the file was emptied in place.
+            self.file.seek(0)
+            self.position, self.buffer = 0, b""
+            lines = self._read()
+
+        records += self._parse(lines)
+        if not lines and self.parser.pending is not None:
+            records.append(self.parser.flush())  # idle for one poll: the last record is complete
+        self._save()
+        return records
+
+    def _parse(self, lines):
+        return [r for r in (self.parser.feed(line, offset) for line, offset in lines) if r is not None]
+
+    def _save(self):
+        # Resume at the first line that is not in a completed record, so a restart
+        # re-parses a record that was still being written instead of losing it.
+        pending = self.parser.pending
+        offset = pending.offset if pending is not None else self.position - len(self.buffer)
+        self.state.update(inode=self.inode, offset=offset)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+
+
+# --------------------------------------------------------------------------------
+# Deduplication
+# --------------------------------------------------------------------------------
+class Incident:
+    __slots__ = ("signature", "key", "record", "context", "count")
+
+    def __init__(self, signature, key, record, context, count):
+        self.signature = signature
+        self.key = key
+        self.record = record
+        self.context = context
+        self.count = count
+
+
+
+class IncidentTrigger:
+    """Decides which records start an investigation.
+
+    Args:
+        signatures (dict): Persisted {signature: {"key", "count", "first_seen",
+            "last_seen", "last_triggered"}}, updated in place.
+        cooldown (float): Seconds before a known signature may trigger again.
+        context_lines (int): Preceding records attached to an incident.
+    """
+
+    def __init__(self, signatures, cooldown=600.0, context_lines=20):
+        self.signatures = signatures
+        self.cooldown = cooldown
+        self.recent = collections.deque(maxlen=context_lines)
+        self.suppressed = 0
+
+    def check(self, record, now=None):
+        """Returns an Incident if `record` should be investigated, else None."""
+        self.recent.append(record)
+        if record.level not in SEVERE:
+            return None
+        now = time.time() if now is None else now
+        sig, key = signature(record)
+        seen = self.signatures.setdefault(sig, {"key": key, "count": 0, "first_seen": now, "last_triggered": None})
+        seen["count"] += 1
+        seen["last_seen"] = now
+        if seen["last_triggered"] is not None and now - seen["last_triggered"] < self.cooldown:
+            self.suppressed += 1
+            return None
+        seen["last_triggered"] = now
+        return Incident(sig, key, record, list(self.recent), seen["count"])
+
+
+# --------------------------------------------------------------------------------
+# Watcher
+# --------------------------------------------------------------------------------
+def excerpt(incidents):
+    """The records of `incidents` and the records before them, each once, in file order."""
+    records = {}
+    for incident in incidents:
+        for record in incident.context:
+            records[(record.source, record.offset)] = record
+    return "\n".join(records[k].text for k in sorted(records)) + "\n"
+
+
+async def investigate(incidents):
+    """Write the excerpt next to this script (the Docker workspace) and run MagenticOne.
+
+    The task quotes the records themselves (see describe()); the excerpt, post-mortem
+    and report are named after the first signature, so investigations do not
+    overwrite each other.
+    """
+    from magentic_one_orchestrator import run_magentic_one_orchestrator
+
+    name = incidents[0].signature
+    folder = os.path.dirname(os.path.abspath(__file__))
+    log_file = os.path.join(folder, f"incident_{name}.log")
+    with open(log_file, "w", encoding="utf-8") as f:
+        f.write(excerpt(incidents))
+    found = "; ".join(f"'{describe(i.record)}' ({i.record.source} at {i.record.timestamp})" for i in incidents)
+    context = f"The log watcher detected new errors: {found}. '{log_file}' holds them and the lines before."
+    focus = "the errors " + " and ".join(f"'{describe(i.record)}'" for i in incidents)
+    await run_magentic_one_orchestrator(log_file=log_file, context=context, focus=focus,
+                                        post_mortem=f"post_mortem_{name}.txt",
+                                        report_path=os.path.join(folder, f"final_report_{name}.md"))
+
+
+async def print_incidents(incidents):
+    for incident in incidents:
+        print(f"\n[INCIDENT {incident.signature}] {incident.key} (seen {incident.count}x)")
+        print(incident.record.text)
+
+
+class LogWatcher:
+    """Polls the tailers, feeds the trigger and runs investigations in the background.
+
+    Args:
+        paths (list[str]): Log files to follow.
+        state_path (str): JSON file for offsets and known signatures.
+        handler: async callable(list[Incident]) - `investigate` by default.
+        interval (float): Seconds between polls.
+        max_runs_per_hour (float): Investigation rate limit (burst of 1).
+        settle (float): Seconds to wait for related signatures before investigating.
+    """
+
+    def __init__(self, paths, state_path=".log_tailer_state.json", handler=investigate, interval=1.0, cooldown=600.0,
+                 max_runs_per_hour=6, settle=2.0, from_end=False):
+        self.state_path = state_path
+        self.state = self._load()
+        offsets = self.state.setdefault("offsets", {})
+        self.tailers = [FileTailer(p, offsets.setdefault(os.path.abspath(p), {}), from_end) for p in paths]
+        self.trigger = IncidentTrigger(self.state.setdefault("signatures", {}), cooldown=cooldown)
+        self.handler = handler
+        self.interval = interval
+        self.settle = settle
+        self.budget = TokenBucket(max_runs_per_hour / 60.0, capacity=1)
+        self.queue = asyncio.Queue()
+        self.records = 0
+        self.incidents = 0
+
+    def _load(self):
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def save(self):
+        """Write the state atomically (temp file + rename)."""
+        tmp = f"{self.state_path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp, self.state_path)
+
+    def poll(self):
+        """One pass over all files. Returns the incidents it queued."""
+        incidents = []
+        before = [dict(tailer.state) for tailer in self.tailers]
+        for tailer in self.tailers:
+            for record in tailer.poll():
+                self.records += 1
+                incident = self.trigger.check(record)
+                if incident is not None:
+                    incidents.append(incident)
+                    self.queue.put_nowait(incident)
+        self.incidents += len(incidents)
+        # Signatures only change when records arrive, which also moves an offset.
+        if incidents or before != [tailer.state for tailer in self.tailers]:
+            self.save()
+        return incidents
+
+    async def _worker(self):
+        while True:
+            first = await self.queue.get()
+            wait = max(self.settle, self.budget.reserve())
+            if wait - self.settle >= 1:
+                print(f"[log_tailer] rate limit: investigation of {first.signature} starts in {wait:.0f}s")
+            await asyncio.sleep(wait)
+            incidents = [first]
+            while not self.queue.empty():
+                incidents.append(self.queue.get_nowait())
+            try:
+                await self.handler(incidents)
+            except Exception as e:  # one failed investigation must not stop the watcher
+                print(f"[log_tailer] investigation of {first.signature} failed: {e}")
+            finally:
+                for _ in incidents:
+                    self.queue.task_done()
+
+    async def run(self, once=False):
+        worker = asyncio.create_task(self._worker())
+        try:
+            while True:
+                self.poll()
+                if once:
+                    self.poll()  # second pass flushes the last multiline record
+                    await self.queue.join()
+                    return
+                await asyncio.sleep(self.interval)
+        finally:
+            worker.cancel()
+            for tailer in self.tailers:
+                tailer.close()
+            self.save()
+
+    def report(self):
+        return (f"Log watcher: {self.records} records, {self.incidents} incident(s) triggered, "
+                f"{self.trigger.suppressed} duplicate(s) suppressed, "
+                f"{len(self.trigger.signatures)} known signature(s)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tail logs and investigate new error signatures with MagenticOne.")
+    parser.add_argument("paths", nargs="+", help="Log files to follow.")
+    parser.add_argument("--state", default=".log_tailer_state.json", help="Offsets and known signatures.")
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between polls (default 1).")
+    parser.add_argument("--cooldown", type=float, default=600.0,
+                        help="Seconds before a known signature triggers again (default 600).")
+    parser.add_argument("--max-runs-per-hour", type=float, default=6, help="Investigation rate limit (default 6).")
+    parser.add_argument("--from-end", action="store_true", help="Without saved offsets, skip existing content.")
+    parser.add_argument("--once", action="store_true", help="Read what is there, handle it, and exit.")
+    parser.add_argument("--dry-run", action="store_true", help="Print incidents instead of running MagenticOne.")
+    args = parser.parse_args(argv)
+
+    watcher = LogWatcher(args.paths, state_path=args.state, handler=print_incidents if args.dry_run else investigate,
+                         interval=args.interval, cooldown=args.cooldown, max_runs_per_hour=args.max_runs_per_hour,
+                         from_end=args.from_end)
+    try:
+        asyncio.run(watcher.run(once=args.once))
+    except KeyboardInterrupt:
+        pass
+    print(watcher.report())
+
+
+if __name__ == "__main__":
+    main()
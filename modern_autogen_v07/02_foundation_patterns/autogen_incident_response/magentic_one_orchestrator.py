@@ -23,18 +23,28 @@ import asyncio
 import os
 import logging
 import platform
-from dotenv import load_dotenv
-
-# AutoGen Core & Extensions
-from autogen_ext.models.openai import OpenAIChatCompletionClient
-from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
-from autogen_ext.agents.magentic_one import MagenticOneCoderAgent
-from autogen_ext.agents.file_surfer import FileSurfer
-from autogen_ext.teams.magentic_one import MagenticOneGroupChat
-
-load_dotenv()
-
-async def run_magentic_one_orchestrator():
+import sys
+import time
+
+# Add the repository root to sys.path to import utils
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..')))
+from utils import get_gemini_api_key, get_model_client
+from metrics import get_metrics
+from model_router import ModelRouter
+from transcript_store import TranscriptStore
+
+async def run_magentic_one_orchestrator(log_file=None, context="", report_path="final_report.md",
+                                        focus="the 503 errors", post_mortem="post_mortem.txt"):
+    """Investigate an incident with the MagenticOne team.
+
+    Args:
+        log_file (str): Log excerpt to investigate, in this folder (the Docker
+            workspace). None writes and uses the mock 'production_logs.txt'.
+        context (str): Extra facts for the task, e.g. the error signature from log_tailer.py.
+        report_path (str): Where the Markdown report is written.
+        focus (str): What the team determines the root cause of (task step 3).
+        post_mortem (str): File the team writes its post-mortem to (task step 4).
+    """
     # 0. Setup Logging
     logging.basicConfig(
         filename='magentic_one.log',
@@ -44,16 +54,26 @@ async def run_magentic_one_orchestrator():
     )
     print("Logging configured to write to 'magentic_one.log'")
 
-    gemini_key = os.environ.get("GEMINI_API_KEY")
+    gemini_key = get_gemini_api_key()
     if not gemini_key:
         print("Error: GEMINI_API_KEY not found.")
         return
 
+    # AutoGen Core & Extensions
+    # Imported after the key check: loading the framework (and the Docker client)
+    # takes most of the start-up time (see startup_benchmark.py in the repository root).
+    from autogen_ext.code_executors.docker import DockerCommandLineCodeExecutor
+    from autogen_ext.agents.magentic_one import MagenticOneCoderAgent
+    from autogen_ext.agents.file_surfer import FileSurfer
+    from autogen_ext.teams.magentic_one import MagenticOneGroupChat
+    from autogen_agentchat.base import TaskResult
+
     # 1. Define the Brain (Gemini 2.0 Flash)
-    model_client = OpenAIChatCompletionClient(
+    # Shared factory (utils.py): pooled HTTP connections, one rate limiter for the
+    # orchestrator and all agents, and jittered retries on 429s.
+    model_client = get_model_client(
         model="gemini-2.0-flash-exp",
         api_key=gemini_key,
-        base_url="https://generativelanguage.googleapis.com/v1beta/openai/",
         model_info={
             "vision": True,
             "function_calling": True,
@@ -62,9 +82,15 @@ async def run_magentic_one_orchestrator():
             "family": "gemini-2.0-flash-exp"
         }
     )
-
-    # 2. Setup Incident Environment (Mock Data)
-    print("Setting up mock incident environment...")
+    # Opt-in (MODEL_ROUTER=1): the Orchestrator plans and judges progress, so it gets
+    # its own client routed to the escalation model; the workers keep the default.
+    router = ModelRouter.from_env(baseline_model="gemini-2.0-flash-exp")
+    orchestrator_client = model_client
+    if router is not None:
+        orchestrator_client = get_model_client(model="gemini-2.0-flash-exp", router=router, role="orchestrator")
+        model_client = get_model_client(model="gemini-2.0-flash-exp", router=router, role="worker")
+
+    # 2. Setup Incident Environment (Mock Data, unless log_tailer.py passed a real excerpt)
     log_content = """
 2023-10-27 10:00:01 INFO [AuthService] User login successful: user_id=1001
 2023-10-27 10:05:23 WARN [DbConnection] Pool usage at 85%
@@ -78,18 +104,23 @@ Caused by: FATAL: remaining connection slots are reserved for non-replication su
     # Create logs in the current directory (Host)
     # The Docker container will need to access this.
     # By default, DockerExecutor mounts the workspace.
-    with open("production_logs.txt", "w") as f:
-        f.write(log_content)
-    print("Created 'production_logs.txt' on Host.")
+    if log_file is None:
+        print("Setting up mock incident environment...")
+        log_file = "production_logs.txt"
+        with open(log_file, "w") as f:
+            f.write(log_content)
+        print(f"Created '{log_file}' on Host.")
 
     task = (
         "You are an Incident Response Team. "
         "1. VERIFICATION STEP: Run a Python script to print the current OS (platform.platform()) and "
         "Working Directory (os.getcwd()) to prove you are in a container. "
-        "2. Read the file 'production_logs.txt' to identify the error patterns. "
-        "3. Determine the root cause of the 503 errors. "
-        "4. Write a short 'post_mortem.txt' file summarizing the root cause and recommended fix."
+        f"2. Read the file '{log_file}' to identify the error patterns. "
+        f"3. Determine the root cause of {focus}. "
+        f"4. Write a short '{post_mortem}' file summarizing the root cause and recommended fix."
     )
+    if context:
+        task += f" Context: {context}"
 
     print(f"[START] Starting Manual MagenticOne Team with Docker...\nTask: {task}\n")
 
@@ -118,44 +149,44 @@ Caused by: FATAL: remaining connection slots are reserved for non-replication su
             # 4. Decides when the task is complete.
             team = MagenticOneGroupChat(
                 participants=[coder, file_surfer],
-                model_client=model_client
+                model_client=orchestrator_client
             )
 
             # Run the Team
-            result = await team.run(task=task)
-            
-            # --- Format & Save Result as Markdown ---
-            # The 'result' object contains a list of messages. We want to extract the final output
-            # which usually contains the post-mortem content or the final answer.
-            
-            markdown_content = "# Incident Response Report\n\n"
-            markdown_content += "## Execution Log\n\n"
-            
-            for msg in result.messages:
-                source = msg.source
-                content = msg.content
-                # Simple cleaning
-                if isinstance(content, str):
-                   markdown_content += f"### **{source}**\n\n"
-                   markdown_content += f"{content}\n\n"
-                   markdown_content += "---\n\n"
-
-            with open("final_report.md", "w") as f:
-                f.write(markdown_content)
-                
+            # Messages are written to the transcript store (transcripts/) as they
+            # arrive, and the report is generated from there. run_stream still
+            # collects them for its final TaskResult; it is dropped after the run.
+            run_id = f"{os.path.splitext(os.path.basename(report_path))[0]}-{int(time.time())}"
+            with TranscriptStore("transcripts") as store:
+                async for item in team.run_stream(task=task):
+                    if not isinstance(item, TaskResult):  # the final TaskResult repeats all messages
+                        store.append_message(run_id, item)
+
+                # --- Format & Save Result as Markdown ---
+                # Only messages with text content (the post-mortem, the final answer...) are
+                # written; the report is generated from the store one message at a time.
+                store.write_markdown(run_id, report_path, "Incident Response Report")
+
             # Print Result
             print("\n--- FINAL RESULT ---")
-            print(f"Report saved to 'final_report.md'")
+            print(f"Report saved to '{report_path}' (transcript '{run_id}' in transcripts/)")
             print("\nFull execution logs saved to 'magentic_one.log'")
+            if router is not None:
+                print(router.report())
+            print(get_metrics().report())
             
     except Exception as e:
         print(f"\n[ERROR] execution failed: {e}")
         logging.error(f"Execution failed: {e}", exc_info=True)
         print("Please ensure Docker Desktop is running.")
 
-if __name__ == "__main__":
+def main():
     asyncio.run(run_magentic_one_orchestrator())
 
+
+if __name__ == "__main__":
+    main()
+
 """
 --- KEY TAKEAWAYS (MagenticOne Pattern) ---
 
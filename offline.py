@@ -0,0 +1,206 @@
+"""
+Offline model clients: deterministic canned replies instead of Gemini calls.
+
+Used by `run_pattern.py --offline` (or LLM_OFFLINE=1) so that every pattern can be
+run, timed and profiled without an API key or network access. The replies are
+shaped like what each pattern expects - code blocks for coding agents, filled-in
+JSON for "return a JSON object" prompts, a MagenticOne progress ledger for the
+orchestrator - and everything around the model call (rate limiter, coalescing,
+routing, streaming, summaries, code execution) runs as usual.
+
+AG2:   get_llm_config() returns {"model_client_cls": "OfflineModelClient", ...} and
+       configure_agents() registers OfflineModelClient on each agent.
+v0.7:  get_model_client() answers create()/create_stream() with offline_result().
+
+LLM_OFFLINE_DELAY=<seconds> adds a fixed latency per call (0 by default, so a
+profile shows only framework overhead).
+"""
+
+import json
+import os
+import re
+import time
+
+_PLACEHOLDER = re.compile(r"""["'](\w+)["']\s*:\s*(<[^>]*>|""|''|"[^"]*"|'[^']*'|string|boolean|\d+)""")
+_RANGE = re.compile(r"<\s*(\d+)\s*-\s*(\d+)\s*>")
+_SELECT = re.compile(r"select from: ([^)\n]+)\)")
+_OWN_PREFIX = re.compile(r"\[offline [^\]]*\] Thanks! Here is my take on:\s*")
+
+FINANCIAL_CODE = '''```python
+# filename: offline_stock_plot.py
+import datetime
+from functions import get_stock_prices, plot_stock_prices_fast
+
+end = datetime.date.today()
+start = end - datetime.timedelta(days=180)
+prices = get_stock_prices(["NVDA", "TSLA"], str(start), str(end))
+print(prices.tail())
+plot_stock_prices_fast(prices, "stock_prices_YTD_plot.png")
+```'''
+
+GENERIC_CODE = '''```python
+def fibonacci(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return a
+
+
+print([fibonacci(i) for i in range(10)])
+```'''
+
+
+def delay():
+    return float(os.getenv("LLM_OFFLINE_DELAY", "0") or 0)
+
+
+def estimate_tokens(text):
+    return max(1, len(text or "") // 4)
+
+
+def _fill_json(text):
+    """Fill the keys of a JSON template found in the prompt with plausible values."""
+    filled = {}
+    for key, placeholder in _PLACEHOLDER.findall(text):
+        if key in filled:
+            continue
+        bounds = _RANGE.match(placeholder)
+        if bounds:
+            low, high = map(int, bounds.groups())
+            filled[key] = (low + high) // 2 + 1
+        elif placeholder == "boolean":
+            filled[key] = True
+        elif placeholder.isdigit():
+            filled[key] = int(placeholder)
+        else:
+            filled[key] = f"offline {key}"
+    return filled
+
+
+def _ledger(text):
+    names = _SELECT.search(text)
+    speaker = names.group(1).split(",")[0].strip() if names else "assistant"
+    entry = {"reason": "Offline run: accept the current state.", "answer": True}
+    return json.dumps({
+        "is_request_satisfied": entry,
+        "is_in_loop": {**entry, "answer": False},
+        "is_progress_being_made": entry,
+        "next_speaker": {"reason": "Offline run.", "answer": speaker},
+        "instruction_or_question": {"reason": "Offline run.", "answer": "Summarize your findings."},
+    })
+
+
+def offline_reply(messages, model="offline"):
+    """Canned reply for a list of {"role", "content"} messages."""
+    system = next((str(m.get("content") or "") for m in messages if m.get("role") == "system"), "")
+    last = str(messages[-1].get("content") or "") if messages else ""
+
+    if "is_request_satisfied" in last:
+        return _ledger(last)
+    if "json" in last.lower():
+        filled = _fill_json(last)
+        if filled:
+            return json.dumps(filled)
+    lowered = system.lower()
+    if "python" in lowered and "review" not in lowered:
+        if "exitcode:" in last:
+            return "The code ran. TERMINATE"
+        return FINANCIAL_CODE if "get_stock_prices" in system else GENERIC_CODE
+    words = " ".join(_OWN_PREFIX.sub("", last).split()[:12])
+    return f"[offline {model}] Thanks! Here is my take on: {words}"
+
+
+# --------------------------------------------------------------------------------
+# AG2 custom model client
+# --------------------------------------------------------------------------------
+class _Message:
+    def __init__(self, content):
+        self.content = content
+        self.role = "assistant"
+        self.tool_calls = None
+        self.function_call = None
+
+
+class _Choice:
+    def __init__(self, content):
+        self.message = _Message(content)
+        self.finish_reason = "stop"
+
+
+class _Response:
+    def __init__(self, content, model, prompt_tokens):
+        self.choices = [_Choice(content)]
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = estimate_tokens(content)
+        self.cost = 0.0
+
+
+class OfflineModelClient:
+    """AG2 ModelClient that answers with `offline_reply` (registered via model_client_cls)."""
+
+    def __init__(self, config, **kwargs):
+        self.model = config.get("model", "offline")
+
+    def create(self, params):
+        messages = params.get("messages", [])
+        content = offline_reply(messages, params.get("model", self.model))
+        if delay():
+            time.sleep(delay())
+        if params.get("stream"):
+            from autogen.events.client_events import StreamEvent
+            from autogen.io import IOStream
+
+            iostream = IOStream.get_default()
+            for word in re.findall(r"\S+\s*", content):
+                iostream.send(StreamEvent(content=word))
+        prompt_tokens = sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+        return _Response(content, params.get("model", self.model), prompt_tokens)
+
+    def message_retrieval(self, response):
+        return [choice.message.content for choice in response.choices]
+
+    def cost(self, response):
+        return 0.0
+
+    @staticmethod
+    def get_usage(response):
+        return {
+            "prompt_tokens": response.prompt_tokens,
+            "completion_tokens": response.completion_tokens,
+            "total_tokens": response.prompt_tokens + response.completion_tokens,
+            "cost": 0.0,
+            "model": response.model,
+        }
+
+
+# --------------------------------------------------------------------------------
+# autogen_ext (v0.7) results
+# --------------------------------------------------------------------------------
+def _as_dicts(messages):
+    return [{"role": getattr(m, "type", "user").replace("Message", "").lower(), "content": str(m.content)}
+            for m in messages]
+
+
+async def offline_result(messages, model="offline"):
+    """CreateResult for autogen_core LLMMessages."""
+    import asyncio
+
+    from autogen_core.models import CreateResult, RequestUsage
+
+    dicts = _as_dicts(messages)
+    content = offline_reply(dicts, model)
+    if delay():
+        await asyncio.sleep(delay())
+    usage = RequestUsage(
+        prompt_tokens=sum(estimate_tokens(m["content"]) for m in dicts),
+        completion_tokens=estimate_tokens(content),
+    )
+    return CreateResult(finish_reason="stop", content=content, usage=usage, cached=False)
+
+
+async def offline_stream(messages, model="offline"):
+    result = await offline_result(messages, model)
+    for word in re.findall(r"\S+\s*", result.content):
+        yield word
+    yield result
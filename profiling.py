@@ -0,0 +1,247 @@
+"""
+Profilers for `run_pattern.py --profile`.
+
+cprofile  deterministic: every Python call is timed (exact call counts, but the
+          overhead inflates short functions). Writes a .prof file for pstats /
+          snakeviz and a folded-stack file built from the caller graph.
+sample    statistical: a background thread snapshots every thread's stack
+          every `interval` seconds via sys._current_frames(). Low overhead and
+          it shows where wall time goes, including time spent waiting on
+          locks, sleeps and sockets.
+
+Both write folded stacks ("frame;frame;frame count" per line, the format of
+Brendan Gregg's flamegraph.pl / speedscope / inferno) and a self-contained SVG
+flame graph rendered by `write_flamegraph`.
+
+Usage:
+    with SamplingProfiler(interval=0.005) as profiler:
+        main()
+    profiler.write("out/comedy")     # out/comedy.folded + out/comedy.svg
+"""
+
+import cProfile
+import html
+import os
+import pstats
+import sys
+import threading
+import zlib
+from collections import Counter
+
+
+def frame_label(code):
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+# --------------------------------------------------------------------------------
+# Sampling profiler
+# --------------------------------------------------------------------------------
+class SamplingProfiler:
+    """Samples the stacks of all threads from a daemon thread.
+
+    Args:
+        interval (float): Seconds between samples.
+        max_depth (int): Frames kept per stack (innermost ones are kept).
+    """
+
+    def __init__(self, interval=0.005, max_depth=128):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def _run(self):
+        me = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            for ident, frame in frames.items():
+                if ident == me:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                if ident not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                stack.append(f"thread {names.get(ident, ident)}")
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self):
+        return dict(self.stacks)
+
+    def write(self, prefix, title="Sampled wall time"):
+        """Write `<prefix>.folded` and `<prefix>.svg`. Returns the paths."""
+        return write_profile(self.folded(), prefix, f"{title} ({self.samples} samples, {self.interval * 1000:g} ms)")
+
+
+# --------------------------------------------------------------------------------
+# cProfile
+# --------------------------------------------------------------------------------
+class CProfileProfiler:
+    """cProfile with the same interface as SamplingProfiler."""
+
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+    def folded(self, max_depth=64, min_share=0.01):
+        """Approximate folded stacks from the caller graph.
+
+        cProfile keeps caller -> callee edges only, so each function's own time
+        is split over its callers in proportion to the call counts. Weights are
+        microseconds.
+        """
+        stats = pstats.Stats(self.profile).stats  # func -> (cc, nc, tt, ct, callers)
+        labels = {func: f"{func[2]} ({os.path.basename(func[0])}:{func[1]})" for func in stats}
+        folded = Counter()
+
+        def paths(func, depth, seen, weight):
+            # Paths carrying less than min_share of the time are cut off at
+            # `func`, which keeps the walk bounded on large call graphs.
+            callers = stats[func][4]
+            if not callers or depth >= max_depth:
+                return [([labels[func]], weight)]
+            total = sum(edge[0] for edge in callers.values()) or 1
+            result, dropped = [], 0.0
+            for caller, edge in callers.items():
+                share = weight * edge[0] / total
+                if caller in seen or caller not in stats or share < min_share:
+                    dropped += share
+                    continue
+                for path, w in paths(caller, depth + 1, seen | {caller}, share):
+                    result.append((path + [labels[func]], w))
+            if dropped:
+                result.append(([labels[func]], dropped))
+            return result
+
+        for func, (cc, nc, tt, ct, callers) in stats.items():
+            if tt <= 0:
+                continue
+            for path, weight in paths(func, 0, {func}, 1.0):
+                micros = int(tt * weight * 1e6)
+                if micros:
+                    folded[";".join(path)] += micros
+        return dict(folded)
+
+    def write(self, prefix, title="cProfile own time (us)"):
+        """Write `<prefix>.prof`, `<prefix>.txt` (top 40 cumulative), `.folded` and `.svg`."""
+        self.profile.dump_stats(f"{prefix}.prof")
+        with open(f"{prefix}.txt", "w") as f:
+            pstats.Stats(self.profile, stream=f).sort_stats("cumulative").print_stats(40)
+        return [f"{prefix}.prof", f"{prefix}.txt", *write_profile(self.folded(), prefix, title)]
+
+
+def make_profiler(kind, interval=0.005):
+    if kind == "cprofile":
+        return CProfileProfiler()
+    if kind == "sample":
+        return SamplingProfiler(interval=interval)
+    raise ValueError(f"Unknown profiler {kind!r} (use 'cprofile' or 'sample').")
+
+
+# --------------------------------------------------------------------------------
+# Output
+# --------------------------------------------------------------------------------
+def write_profile(folded, prefix, title):
+    os.makedirs(os.path.dirname(os.path.abspath(prefix)), exist_ok=True)
+    with open(f"{prefix}.folded", "w") as f:
+        for stack, count in sorted(folded.items()):
+            f.write(f"{stack} {count}\n")
+    write_flamegraph(folded, f"{prefix}.svg", title)
+    return [f"{prefix}.folded", f"{prefix}.svg"]
+
+
+def _tree(folded):
+    root = {"name": "all", "value": 0, "children": {}}
+    for stack, count in folded.items():
+        root["value"] += count
+        node = root
+        for frame in stack.split(";"):
+            node = node["children"].setdefault(frame, {"name": frame, "value": 0, "children": {}})
+            node["value"] += count
+    return root
+
+
+def write_flamegraph(folded, path, title="Flame graph", width=1200, row=16, min_width=0.5):
+    """Render folded stacks as an SVG flame graph (root at the bottom).
+
+    Frames narrower than `min_width` pixels are dropped; hover a frame to see
+    its full name and share.
+    """
+    root = _tree(folded)
+    total = root["value"] or 1
+    scale = width / total
+    rects = []
+    depth_max = 0
+
+    def layout(node, x, depth):
+        nonlocal depth_max
+        w = node["value"] * scale
+        if w < min_width:
+            return
+        depth_max = max(depth_max, depth)
+        rects.append((x, depth, w, node))
+        child_x = x
+        for child in sorted(node["children"].values(), key=lambda n: n["name"]):
+            layout(child, child_x, depth + 1)
+            child_x += child["value"] * scale
+
+    layout(root, 0.0, 0)
+    height = (depth_max + 1) * row + 40
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'font-family="monospace" font-size="11">',
+        f'<text x="{width / 2}" y="16" text-anchor="middle" font-size="14">{html.escape(title)}</text>',
+    ]
+    for x, depth, w, node in rects:
+        y = height - (depth + 1) * row
+        name = node["name"]
+        hue = 10 + zlib.crc32(name.encode()) % 40
+        label = html.escape(name)
+        share = node["value"] / total
+        chars = int(w / 7)
+        text = label if len(name) <= chars else (html.escape(name[:chars - 2]) + ".." if chars > 3 else "")
+        out.append(
+            f'<g><title>{label} ({node["value"]}, {share:.1%})</title>'
+            f'<rect x="{x:.2f}" y="{y}" width="{w:.2f}" height="{row - 1}" fill="hsl({hue},90%,60%)"/>'
+            f'<text x="{x + 3:.2f}" y="{y + row - 4}">{text}</text></g>'
+        )
+    out.append("</svg>")
+    with open(path, "w") as f:
+        f.write("\n".join(out))
@@ -0,0 +1,272 @@
+"""
+Run, time and profile any pattern in this repo from one entry point.
+
+Every pattern script exposes `main()`; this runner loads the script from its
+folder (so its sibling modules and relative paths resolve), calls `main()` one
+or more times and reports wall and CPU time per run.
+
+Usage:
+    python run_pattern.py --list
+    python run_pattern.py comedy
+    python run_pattern.py reflection --offline --repeat 5 --json timings.json
+    python run_pattern.py onboarding --offline --profile sample
+    python run_pattern.py financial --offline --profile cprofile --profile-dir profiles
+
+--offline   answers every LLM call from offline.py (no key, no network, see
+            utils.offline_mode), uses synthetic stock prices and answers human
+            input prompts with the pattern's scripted inputs.
+
+Wall and CPU time of a run cover main() and, for the first run, importing the
+framework (AG2 / autogen_agentchat), as in a fresh `python script.py`. "import"
+is loading the script module itself.
+--profile   cprofile (deterministic, .prof + top-40 text) or sample (wall-clock
+            stack sampling); both write folded stacks and an SVG flame graph.
+--json      timing results (and LLM calls / cost per run, see metrics.py) as
+            JSON ("-" for stdout).
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import sys
+import time
+import traceback
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+
+class Pattern:
+    """A runnable pattern script.
+
+    Args:
+        name (str): Name on the command line.
+        script (str): Path relative to the repo root.
+        description (str): One line for --list.
+        inputs (list[str] | dict): Scripted answers for human input prompts (offline
+            runs), in order, or per agent: {agent name: [answers]} for prompts that
+            ask for feedback to that agent. Once the answers run out: "exit".
+        needs (str): What the pattern needs besides the LLM, for --list.
+    """
+
+    def __init__(self, name, script, description, inputs=(), needs=""):
+        self.name = name
+        self.script = script
+        self.description = description
+        self.inputs = {k: list(v) for k, v in inputs.items()} if isinstance(inputs, dict) else list(inputs)
+        self.needs = needs
+
+    @property
+    def path(self):
+        return os.path.join(ROOT, self.script)
+
+
+PATTERNS = {p.name: p for p in [
+    Pattern("comedy", "conversation agent/comedy_agent.py", "Two-agent comedy conversation"),
+    Pattern("coder_reviewer", "conversation agent/coder_reviewer_agent.py", "Coder and reviewer conversation"),
+    Pattern("reflection", "blog post/reflection_and_blogpost_writing.py",
+            "Blog post with nested reviewer reflection"),
+    Pattern("onboarding", "customer onboarding agent/customer onboarding-sequential orchestration pattern.py",
+            "Sequential customer onboarding chats",
+            # AG2 prompts "Provide feedback to <agent>"; "exit" only ends the current
+            # turn, so each stage keeps asking until its max_turns are used up.
+            inputs={"Onboarding_Personal_Information_Agent": ["I'm Kiki from Edmonton."],
+                    "Onboarding_Topic_Preference_Agent": ["I like food and tech."]}),
+    Pattern("financial", "Coding agent/financial_analysis.py", "Code-writing agent plotting stock prices",
+            inputs=["", "exit"]),
+    Pattern("benchmark", "modern_autogen_v07/01_feasibility_and_benchmarks/performance_benchmark.py",
+            "v0.7 judge benchmark"),
+    Pattern("magentic", "modern_autogen_v07/02_foundation_patterns/autogen_incident_response/magentic_one_orchestrator.py",
+            "MagenticOne incident response", needs="Docker"),
+]}
+
+
+# --------------------------------------------------------------------------------
+# Scripted human input
+# --------------------------------------------------------------------------------
+class ScriptedInput:
+    """IOStream that answers input() from scripted answers (then "exit") and echoes them.
+
+    Args:
+        answers (list[str] | dict): Answers in order, or {agent name: [answers]}
+            matched against AG2's "Provide feedback to <agent>" prompt.
+        base: IOStream used for printing.
+    """
+
+    def __init__(self, answers, base):
+        self.answers = {k: list(v) for k, v in answers.items()} if isinstance(answers, dict) else list(answers)
+        self.base = base
+
+    def _next(self, prompt):
+        if isinstance(self.answers, list):
+            return self.answers.pop(0) if self.answers else "exit"
+        for agent, answers in self.answers.items():
+            if f"feedback to {agent}." in prompt:
+                return answers.pop(0) if answers else "exit"
+        return "exit"
+
+    def print(self, *objects, sep=" ", end="\n", flush=False):
+        self.base.print(*objects, sep=sep, end=end, flush=flush)
+
+    def send(self, message):
+        self.base.send(message)
+
+    def input(self, prompt="", *, password=False):
+        answer = self._next(prompt)
+        self.base.print(f"{prompt}{answer}", flush=True)
+        return answer
+
+
+def _install_io(stream):
+    from autogen.io import IOStream
+
+    previous = IOStream.get_global_default()
+    IOStream.set_global_default(stream)
+    return previous
+
+
+# --------------------------------------------------------------------------------
+# Running
+# --------------------------------------------------------------------------------
+def load_main(pattern):
+    """Import the pattern script as a module and return its main()."""
+    folder = os.path.dirname(pattern.path)
+    if folder not in sys.path:
+        sys.path.insert(0, folder)
+    module_name = "pattern_" + pattern.name
+    spec = importlib.util.spec_from_file_location(module_name, pattern.path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module.main
+
+
+def run_once(main, pattern, offline, run_id):
+    """Call main() once. Returns a timing record; failures are recorded, not raised."""
+    from metrics import get_metrics
+
+    metrics = get_metrics()
+    metrics.start_run(run_id)
+    # Started before the IOStream import below, so the first run includes loading
+    # the framework either way.
+    wall, cpu = time.perf_counter(), time.process_time()
+    previous = None
+    if offline:
+        from autogen.io import IOConsole, IOStream
+
+        base = IOStream.get_default() or IOConsole()
+        previous = _install_io(ScriptedInput(pattern.inputs, base))
+
+    record = {"run": run_id, "ok": True, "error": None}
+    try:
+        main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            record.update(ok=False, error=f"SystemExit({e.code})")
+    except Exception as e:
+        traceback.print_exc()
+        record.update(ok=False, error=f"{type(e).__name__}: {e}")
+    finally:
+        record["wall_s"] = round(time.perf_counter() - wall, 4)
+        record["cpu_s"] = round(time.process_time() - cpu, 4)
+        if previous is not None:
+            _install_io(previous)
+    usage = metrics.snapshot().get(run_id)
+    if usage:
+        calls = sum(m["calls"] for models in usage["agents"].values() for m in models.values())
+        record.update(llm_calls=calls, cost_usd=usage["cost_usd"], predicted_cost_usd=usage["predicted_cost_usd"])
+    return record
+
+
+def summarize(runs):
+    ok = [r for r in runs if r["ok"]] or runs
+    walls = sorted(r["wall_s"] for r in ok)
+    return {
+        "runs": len(runs),
+        "failed": sum(not r["ok"] for r in runs),
+        "wall_s_min": walls[0],
+        "wall_s_median": walls[len(walls) // 2],
+        "wall_s_mean": round(sum(walls) / len(walls), 4),
+        "cpu_s_mean": round(sum(r["cpu_s"] for r in ok) / len(ok), 4),
+    }
+
+
+def run_pattern(name, offline=False, repeat=1, profile=None, profile_dir="profiles", interval=0.005):
+    """Run a pattern `repeat` times.
+
+    Returns:
+        dict: {"pattern", "offline", "import_s", "runs": [...], "summary": {...},
+        "profile": [paths]}.
+    """
+    pattern = PATTERNS[name]
+    if offline:
+        os.environ["LLM_OFFLINE"] = "1"
+        os.environ.setdefault("PRICE_SOURCE", "synthetic")
+        os.environ.setdefault("LLM_RPM", "100000")  # no real quota to protect
+
+    cwd = os.getcwd()
+    os.chdir(os.path.dirname(pattern.path))  # scripts use paths relative to their folder
+    try:
+        start = time.perf_counter()
+        main = load_main(pattern)
+        import_s = round(time.perf_counter() - start, 4)
+
+        profiler = None
+        if profile:
+            from profiling import make_profiler
+
+            profiler = make_profiler(profile, interval=interval).start()
+        runs = []
+        try:
+            for i in range(repeat):
+                print(f"\n===== {name} run {i + 1}/{repeat} =====", flush=True)
+                runs.append(run_once(main, pattern, offline, f"{name}-{i + 1}"))
+        finally:
+            if profiler is not None:
+                profiler.stop()
+    finally:
+        os.chdir(cwd)
+
+    result = {"pattern": name, "offline": offline, "import_s": import_s, "runs": runs, "summary": summarize(runs)}
+    if profiler is not None:
+        prefix = os.path.join(profile_dir, f"{name}-{profile}")
+        result["profile"] = profiler.write(prefix)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run, time and profile a pattern.")
+    parser.add_argument("pattern", nargs="?", choices=sorted(PATTERNS))
+    parser.add_argument("--list", action="store_true", help="List the patterns and exit.")
+    parser.add_argument("--offline", action="store_true", help="Use the offline model client and scripted input.")
+    parser.add_argument("--repeat", type=int, default=1, help="Number of runs (default 1).")
+    parser.add_argument("--profile", choices=["cprofile", "sample"], help="Profile all runs.")
+    parser.add_argument("--profile-dir", default="profiles", help="Where profiles are written (default profiles/).")
+    parser.add_argument("--interval", type=float, default=0.005, help="Sampling interval in seconds (default 0.005).")
+    parser.add_argument("--json", metavar="PATH", help='Write the timings as JSON ("-" for stdout).')
+    args = parser.parse_args(argv)
+
+    if args.list or not args.pattern:
+        for p in PATTERNS.values():
+            needs = f"  [needs {p.needs}]" if p.needs else ""
+            print(f"{p.name:<16}{p.description}{needs}")
+        return 0
+
+    result = run_pattern(args.pattern, offline=args.offline, repeat=max(1, args.repeat), profile=args.profile,
+                         profile_dir=os.path.abspath(args.profile_dir), interval=args.interval)
+
+    s = result["summary"]
+    print(f"\n{args.pattern}: {s['runs']} run(s), {s['failed']} failed | import {result['import_s']:.2f}s | "
+          f"wall min {s['wall_s_min']:.2f}s median {s['wall_s_median']:.2f}s | cpu mean {s['cpu_s_mean']:.2f}s")
+    for path in result.get("profile", []):
+        print(f"   profile: {path}")
+    if args.json == "-":
+        print(json.dumps(result, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(result, f, indent=2)
+    return 1 if s["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,383 @@
+"""
+Semantic near-duplicate response cache (opt-in).
+
+An exact-match cache misses prompts that differ only in whitespace, dates
+("Today is {today}") or small wording changes. `SemanticCache` embeds prompts
+locally and serves a stored response when a new prompt is similar enough.
+
+* Embedding: signed feature hashing of word unigrams/bigrams and character
+  trigrams, after normalization (case, whitespace, dates -> "<date>"). CPU-only,
+  NumPy, no model download.
+* Index: random-hyperplane LSH (cosine) with several tables; candidates are
+  re-ranked by exact cosine similarity.
+* Thresholds per agent role. Only roles with a threshold are cached, so the cache
+  is meant for idempotent roles such as judges and reviewers, not for writers.
+* Eviction: LRU (`max_entries`) and age (`ttl` seconds).
+* Quality checks: a sample of hits (`verify_rate`) is still sent upstream and the
+  fresh answer is compared with the cached one. A role whose answers keep
+  disagreeing is switched off.
+
+Usage with the shared factory (utils.py):
+    cache = SemanticCache(thresholds={"reviewer": 0.93})  # or SemanticCache.from_env()
+    configure_agents(SEO_reviewer, legal_reviewer, semantic_cache=cache)
+    ...
+    print(cache.report())
+"""
+
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_THRESHOLDS = {
+    "judge": 0.95,
+    "reviewer": 0.93,
+    "critic": 0.93,
+}
+
+_DATE_PATTERNS = [
+    re.compile(r"\b\d{4}-\d{2}-\d{2}(?:[ t]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?)?\b"),
+    re.compile(r"\b\d{1,2}/\d{1,2}/\d{2,4}\b"),
+    re.compile(
+        r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.? \d{1,2}(?:st|nd|rd|th)?,? \d{4}\b"
+    ),
+    re.compile(
+        r"\b\d{1,2}(?:st|nd|rd|th)? (?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?,? \d{4}\b"
+    ),
+]
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WORD = re.compile(r"<\w+>|\w+")
+
+
+def normalize(text, mask_numbers=False):
+    """Lower-case, collapse whitespace and replace dates with "<date>".
+
+    Numbers are kept by default ("top 5" and "top 10" are different prompts).
+    """
+    text = " ".join(str(text).lower().split())
+    for pattern in _DATE_PATTERNS:
+        text = pattern.sub("<date>", text)
+    if mask_numbers:
+        text = _NUMBER.sub("<num>", text)
+    return text
+
+
+# --------------------------------------------------------------------------------
+# Embedding
+# --------------------------------------------------------------------------------
+class HashingVectorizer:
+    """Signed feature hashing of word n-grams and character trigrams (L2-normalized).
+
+    Args:
+        n_features (int): Dimension of the vectors.
+        char_weight (float): Weight of the character trigram features, which make
+            small spelling/wording changes land close together.
+    """
+
+    def __init__(self, n_features=4096, char_weight=0.5):
+        self.n_features = n_features
+        self.char_weight = char_weight
+
+    def _features(self, text):
+        words = _WORD.findall(text)
+        for word in words:
+            yield word, 1.0
+        for a, b in zip(words, words[1:]):
+            yield a + " " + b, 1.0
+        if self.char_weight:
+            for word in words:
+                padded = f" {word} "
+                for i in range(len(padded) - 2):
+                    yield "#" + padded[i:i + 3], self.char_weight
+
+    def transform(self, text):
+        vector = np.zeros(self.n_features, dtype=np.float32)
+        for feature, weight in self._features(text):
+            h = zlib.crc32(feature.encode())
+            vector[h % self.n_features] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+# --------------------------------------------------------------------------------
+# Approximate nearest-neighbour index
+# --------------------------------------------------------------------------------
+class LSHIndex:
+    """Random-hyperplane LSH for cosine similarity.
+
+    Args:
+        dim (int): Vector dimension.
+        n_planes (int): Bits per signature; more bits -> smaller buckets.
+        n_tables (int): Independent tables; more tables -> better recall.
+        seed (int): Seed for the hyperplanes.
+    """
+
+    def __init__(self, dim, n_planes=12, n_tables=6, seed=0):
+        rng = np.random.default_rng(seed)
+        self.planes = rng.standard_normal((n_tables, n_planes, dim)).astype(np.float32)
+        self._weights = 1 << np.arange(n_planes)
+        self.tables = [{} for _ in range(n_tables)]
+
+    def _signatures(self, vector):
+        bits = (self.planes @ vector) > 0
+        return (bits * self._weights).sum(axis=1).tolist()
+
+    def add(self, key, vector):
+        signatures = self._signatures(vector)
+        for table, signature in zip(self.tables, signatures):
+            table.setdefault(signature, set()).add(key)
+        return signatures
+
+    def remove(self, key, signatures):
+        for table, signature in zip(self.tables, signatures):
+            bucket = table.get(signature)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del table[signature]
+
+    def candidates(self, vector):
+        found = set()
+        for table, signature in zip(self.tables, self._signatures(vector)):
+            found.update(table.get(signature, ()))
+        return found
+
+
+# --------------------------------------------------------------------------------
+# Cache
+# --------------------------------------------------------------------------------
+class _Entry:
+    __slots__ = ("role", "text", "vector", "signatures", "response", "created", "hits")
+
+    def __init__(self, role, text, vector, signatures, response):
+        self.role = role
+        self.text = text
+        self.vector = vector
+        self.signatures = signatures
+        self.response = response
+        self.created = time.monotonic()
+        self.hits = 0
+
+
+class _RoleStats:
+    __slots__ = ("lookups", "hits", "exact_hits", "stores", "checks", "agreements", "disabled")
+
+    def __init__(self):
+        self.lookups = 0
+        self.hits = 0
+        self.exact_hits = 0
+        self.stores = 0
+        self.checks = 0
+        self.agreements = 0
+        self.disabled = False
+
+
+class SemanticCache:
+    """Near-duplicate prompt -> response cache with per-role similarity thresholds.
+
+    Args:
+        thresholds (dict): role -> minimum cosine similarity for a hit. A key also
+            matches roles that contain it ("reviewer" matches "SEO Reviewer").
+            Roles without a threshold are never cached.
+        max_entries (int): LRU capacity.
+        ttl (float): Maximum age of an entry in seconds (None: no age limit).
+        verify_rate (float): Fraction of hits that are re-checked upstream.
+        agreement_threshold (float): Similarity between cached and fresh answers
+            that counts as agreement.
+        min_agreement (float): Roles whose agreement rate drops below this after
+            `min_checks` checks stop being served from the cache.
+        min_checks (int): See `min_agreement`.
+        mask_numbers (bool): Treat all numbers as equal when comparing prompts.
+        vectorizer: Object with `transform(text) -> unit vector`.
+        seed (int): Seed for the LSH planes and the verification sampling.
+    """
+
+    def __init__(self, thresholds=None, max_entries=1024, ttl=3600.0, verify_rate=0.1,
+                 agreement_threshold=0.8, min_agreement=0.7, min_checks=5,
+                 mask_numbers=False, vectorizer=None, seed=0):
+        self.thresholds = {k.lower(): v for k, v in (thresholds or DEFAULT_THRESHOLDS).items()}
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+        self.agreement_threshold = agreement_threshold
+        self.min_agreement = min_agreement
+        self.min_checks = min_checks
+        self.mask_numbers = mask_numbers
+        self.vectorizer = vectorizer or HashingVectorizer()
+        self.index = LSHIndex(self.vectorizer.n_features, seed=seed)
+        self.evictions = {"lru": 0, "ttl": 0}
+        self._entries = OrderedDict()  # id -> _Entry, least recently used first
+        self._exact = {}  # (role, normalized text) -> id
+        self._roles = {}
+        self._next_id = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """A cache if SEMANTIC_CACHE=1 is set (SEMANTIC_CACHE_TTL optional), else None."""
+        if os.getenv("SEMANTIC_CACHE", "").lower() not in ("1", "true", "yes"):
+            return None
+        if os.getenv("SEMANTIC_CACHE_TTL"):
+            kwargs.setdefault("ttl", float(os.environ["SEMANTIC_CACHE_TTL"]))
+        return cls(**kwargs)
+
+    # ----------------------------------------------------------------------------
+    # Roles
+    # ----------------------------------------------------------------------------
+    def threshold_for(self, role):
+        role = re.sub(r"[_\-]+", " ", (role or "").lower())
+        if role in self.thresholds:
+            return self.thresholds[role]
+        matches = [v for k, v in self.thresholds.items() if k in role]
+        return max(matches) if matches else None
+
+    def enabled_for(self, role):
+        stats = self._roles.get(role)
+        return self.threshold_for(role) is not None and not (stats and stats.disabled)
+
+    def _stats(self, role):
+        return self._roles.setdefault(role, _RoleStats())
+
+    # ----------------------------------------------------------------------------
+    # Lookup / store
+    # ----------------------------------------------------------------------------
+    def lookup(self, role, prompt):
+        """Return (response, similarity) for the closest cached prompt, or None.
+
+        Callers should check `should_verify()` on a hit and, if it returns True,
+        call upstream anyway and report both answers with `record_check`.
+        """
+        if not self.enabled_for(role):
+            return None
+        threshold = self.threshold_for(role)
+        text = normalize(prompt, self.mask_numbers)
+        with self._lock:
+            stats = self._stats(role)
+            stats.lookups += 1
+            self._expire()
+            entry_id = self._exact.get((role, text))
+            if entry_id is not None:
+                stats.exact_hits += 1
+                return self._hit(stats, entry_id, 1.0)
+            vector = self.vectorizer.transform(text)
+            best_id, best = None, threshold
+            for entry_id in self.index.candidates(vector):
+                entry = self._entries[entry_id]
+                if entry.role != role:
+                    continue
+                similarity = float(entry.vector @ vector)
+                if similarity >= best:
+                    best_id, best = entry_id, similarity
+            if best_id is None:
+                return None
+            return self._hit(stats, best_id, best)
+
+    def _hit(self, stats, entry_id, similarity):
+        entry = self._entries[entry_id]
+        self._entries.move_to_end(entry_id)
+        entry.hits += 1
+        stats.hits += 1
+        return entry.response, similarity
+
+    def store(self, role, prompt, response):
+        if not self.enabled_for(role):
+            return
+        text = normalize(prompt, self.mask_numbers)
+        vector = self.vectorizer.transform(text)
+        with self._lock:
+            old = self._exact.pop((role, text), None)
+            if old is not None:
+                self._remove(old)
+            entry_id = self._next_id
+            self._next_id += 1
+            signatures = self.index.add(entry_id, vector)
+            self._entries[entry_id] = _Entry(role, text, vector, signatures, response)
+            self._exact[(role, text)] = entry_id
+            self._stats(role).stores += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions["lru"] += 1
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id)
+        self.index.remove(entry_id, entry.signatures)
+        if self._exact.get((entry.role, entry.text)) == entry_id:
+            del self._exact[(entry.role, entry.text)]
+
+    def _expire(self):
+        if self.ttl is None:
+            return
+        cutoff = time.monotonic() - self.ttl
+        expired = [entry_id for entry_id, entry in self._entries.items() if entry.created < cutoff]
+        for entry_id in expired:
+            self._remove(entry_id)
+        self.evictions["ttl"] += len(expired)
+
+    def __len__(self):
+        return len(self._entries)
+
+    # ----------------------------------------------------------------------------
+    # Quality checks
+    # ----------------------------------------------------------------------------
+    def should_verify(self):
+        return self._random.random() < self.verify_rate
+
+    def record_check(self, role, cached, fresh):
+        """Compare a cached answer with a fresh one for the same prompt.
+
+        Returns:
+            float: Cosine similarity of the two answers.
+        """
+        similarity = float(self.vectorizer.transform(normalize(cached)) @ self.vectorizer.transform(normalize(fresh)))
+        with self._lock:
+            stats = self._stats(role)
+            stats.checks += 1
+            stats.agreements += similarity >= self.agreement_threshold
+            if stats.checks >= self.min_checks and stats.agreements / stats.checks < self.min_agreement:
+                stats.disabled = True
+        return similarity
+
+    # ----------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------
+    def stats(self):
+        lookups = sum(s.lookups for s in self._roles.values())
+        hits = sum(s.hits for s in self._roles.values())
+        return {
+            "entries": len(self._entries),
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": dict(self.evictions),
+            "roles": {
+                role: {
+                    "lookups": s.lookups,
+                    "hits": s.hits,
+                    "exact_hits": s.exact_hits,
+                    "stores": s.stores,
+                    "checks": s.checks,
+                    "agreement": round(s.agreements / s.checks, 4) if s.checks else None,
+                    "disabled": s.disabled,
+                }
+                for role, s in self._roles.items()
+            },
+        }
+
+    def report(self):
+        stats = self.stats()
+        lines = [
+            f"Semantic cache: {stats['hits']}/{stats['lookups']} hits ({stats['hit_rate']:.0%}), "
+            f"{stats['entries']} entries, evicted {stats['evictions']['lru']} (LRU) / {stats['evictions']['ttl']} (age)",
+            f"{'Role':<20}{'lookups':>9}{'hits':>7}{'exact':>7}{'checks':>8}{'agree':>8}",
+        ]
+        for role, s in stats["roles"].items():
+            agreement = "-" if s["agreement"] is None else f"{s['agreement']:.0%}"
+            flag = "  (disabled)" if s["disabled"] else ""
+            lines.append(f"{role:<20}{s['lookups']:>9}{s['hits']:>7}{s['exact_hits']:>7}{s['checks']:>8}{agreement:>8}{flag}")
+        return "\n".join(lines)
@@ -0,0 +1,159 @@
+"""
+Cold-start benchmark for the pattern entry points.
+
+The job runner starts the patterns as short-lived processes, so the time until
+`main()` does useful work is paid on every job. For each pattern in
+run_pattern.PATTERNS this starts fresh interpreters and measures:
+
+    import   python starts and loads the script (module level only),
+    no_key   python starts, loads the script and runs main() without an API
+             key - the fail-fast path, which should not load the frameworks,
+    top      the slowest imports of one `python -X importtime` run (cumulative
+             time of each top-level import).
+
+Usage:
+    python startup_benchmark.py                          # all patterns, 5 runs each
+    python startup_benchmark.py comedy financial --runs 10 --top 15
+    python startup_benchmark.py --save startup_baseline.json
+    python startup_benchmark.py --compare startup_baseline.json --tolerance 0.2
+
+--compare exits with 1 when a median got slower than the baseline by more than
+`tolerance` (20% by default), so it can run in CI.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from run_pattern import PATTERNS, ROOT
+
+# Child process: load the script like run_pattern does, optionally call main().
+CHILD = """
+import os, sys
+sys.path.insert(0, {root!r})
+from run_pattern import PATTERNS, load_main
+pattern = PATTERNS[{name!r}]
+os.chdir(os.path.dirname(pattern.path))
+main = load_main(pattern)
+if {call_main!r}:
+    try:
+        main()
+    except SystemExit:
+        pass
+"""
+
+
+def _env(no_key):
+    env = dict(os.environ)
+    env.pop("LLM_OFFLINE", None)
+    if no_key:
+        # Set but empty: load_dotenv() does not override it, so a .env key is ignored too.
+        env["GOOGLE_API_KEY"] = ""
+        env["GEMINI_API_KEY"] = ""
+    return env
+
+
+def cold_start(name, call_main=False, importtime=False):
+    """Start one interpreter. Returns (wall seconds, stderr)."""
+    code = CHILD.format(root=ROOT, name=name, call_main=call_main)
+    cmd = [sys.executable, *(["-X", "importtime"] if importtime else []), "-c", code]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, env=_env(call_main), cwd=ROOT, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(f"{name}: exit code {proc.returncode}\n{proc.stderr[-2000:]}")
+    return wall, proc.stderr
+
+
+def parse_importtime(stderr):
+    """Top-level imports from `-X importtime` output as {module: cumulative seconds}."""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, _, rest = line.partition(":")
+        self_us, cumulative_us, name = rest.split("|", 2)
+        if name.startswith("  "):  # nested import (indented by depth)
+            continue
+        name = name.strip()
+        imports[name] = imports.get(name, 0) + int(cumulative_us) / 1e6
+    return imports
+
+
+def benchmark(name, runs=5, top=10):
+    # One warm-up start fills the OS file cache, so runs measure Python, not the disk.
+    cold_start(name)
+    imports = [cold_start(name)[0] for _ in range(runs)]
+    no_key = [cold_start(name, call_main=True)[0] for _ in range(runs)]
+    _, stderr = cold_start(name, importtime=True)
+    modules = parse_importtime(stderr)
+    return {
+        "import_s": {"median": round(statistics.median(imports), 4), "min": round(min(imports), 4)},
+        "no_key_s": {"median": round(statistics.median(no_key), 4), "min": round(min(no_key), 4)},
+        "import_total_s": round(sum(modules.values()), 4),
+        "modules": sum(line.startswith("import time:") for line in stderr.splitlines()) - 1,
+        "top": [[module, round(seconds, 4)] for module, seconds in
+                sorted(modules.items(), key=lambda kv: kv[1], reverse=True)[:top]],
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Lines describing each median against the baseline, and whether any regressed."""
+    lines, regressed = [], False
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for key in ("import_s", "no_key_s"):
+            old, new = baseline[name][key]["median"], result[key]["median"]
+            change = (new - old) / old if old else 0.0
+            flag = ""
+            if change > tolerance:
+                flag, regressed = "  REGRESSION", True
+            lines.append(f"{name:<16}{key:<10}{old:>8.3f}s -> {new:>7.3f}s ({change:+.0%}){flag}")
+    return lines, regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the pattern entry points.")
+    parser.add_argument("patterns", nargs="*", help=f"Default: all ({', '.join(PATTERNS)}).")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per measurement (default 5).")
+    parser.add_argument("--top", type=int, default=10, help="Slowest imports to list (default 10).")
+    parser.add_argument("--save", metavar="PATH", help="Write the results as JSON (e.g. a new baseline).")
+    parser.add_argument("--compare", metavar="PATH", help="Baseline JSON to compare against.")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (default 0.2).")
+    args = parser.parse_args(argv)
+    unknown = set(args.patterns) - set(PATTERNS)
+    if unknown:
+        parser.error(f"unknown pattern(s): {', '.join(sorted(unknown))}")
+
+    results = {}
+    for name in args.patterns or list(PATTERNS):
+        try:
+            results[name] = result = benchmark(name, runs=args.runs, top=args.top)
+        except RuntimeError as e:
+            print(f"{name}: skipped ({str(e).splitlines()[-1]})")
+            continue
+        print(f"\n{name}: import {result['import_s']['median']:.3f}s, "
+              f"no-key exit {result['no_key_s']['median']:.3f}s (median of {args.runs}), "
+              f"{result['modules']} modules")
+        for module, seconds in result["top"]:
+            print(f"   {seconds * 1000:>8.1f} ms  {module}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            lines, regressed = compare(results, json.load(f), args.tolerance)
+        print("\nAgainst " + args.compare)
+        print("\n".join(lines))
+        return 1 if regressed else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+"""
+Token streaming for AG2 (ConversableAgent) conversations.
+
+Without streaming a message is printed only after the whole completion arrived,
+so the perceived latency equals the generation time. With `stream=True` in the
+llm_config, AG2's OpenAI client emits every token as a `StreamEvent` on the
+current IOStream. `StreamingIOStream` is that IOStream: it forwards tokens to
+pluggable sinks as they arrive and measures time-to-first-token (TTFT) per turn.
+
+Sinks:
+    ConsoleSink  tokens to the terminal,
+    FileSink     a transcript file, flushed per token,
+    QueueSink    events on a queue.Queue - a stand-in for a websocket; a consumer
+                 thread (UI, the onboarding engagement stage...) can start
+                 rendering while the model is still generating.
+
+Usage:
+    llm_config = get_llm_config(stream=True)
+    ...
+    stream = enable_streaming(cathy, joe, sinks=[ConsoleSink(), FileSink("chat.log")])
+    joe.initiate_chat(cathy, ...)
+    print(stream.report())
+
+Turns are attributed to the agent that is currently generating, which is exact
+for the sequential flows in this repo (one speaker at a time).
+"""
+
+import json
+import os
+import queue
+import statistics
+import sys
+import threading
+import time
+
+
+def streaming_enabled():
+    """Streaming is opt-in (LLM_STREAM=1): stream=True moves the scripts from AG2's
+    native Gemini client to the OpenAI-compatible endpoint (see utils.get_llm_config)."""
+    return os.getenv("LLM_STREAM", "0").lower() in ("1", "true", "yes")
+
+
+def default_sinks():
+    """Console, plus a transcript file if LLM_STREAM_LOG=<path> is set."""
+    sinks = [ConsoleSink()]
+    if os.getenv("LLM_STREAM_LOG"):
+        sinks.append(FileSink(os.environ["LLM_STREAM_LOG"]))
+    return sinks
+
+
+# --------------------------------------------------------------------------------
+# Sinks
+# --------------------------------------------------------------------------------
+class TokenSink:
+    """Receives the tokens of each turn. Subclasses override what they need."""
+
+    def on_start(self, agent):
+        pass
+
+    def on_token(self, agent, text):
+        pass
+
+    def on_end(self, agent, turn):
+        pass
+
+    def close(self):
+        pass
+
+
+class ConsoleSink(TokenSink):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def on_start(self, agent):
+        self.stream.write(f"\n[{agent}] ")
+        self.stream.flush()
+
+    def on_token(self, agent, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+    def on_end(self, agent, turn):
+        self.stream.write("\n")
+        self.stream.flush()
+
+
+class FileSink(TokenSink):
+    def __init__(self, path):
+        self.file = open(path, "a", encoding="utf-8")
+
+    def on_start(self, agent):
+        self.file.write(f"\n[{agent}] ")
+
+    def on_token(self, agent, text):
+        self.file.write(text)
+        self.file.flush()
+
+    def on_end(self, agent, turn):
+        self.file.write("\n")
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+class QueueSink(TokenSink):
+    """Puts {"type": "start"|"token"|"end", "agent", ...} events on a queue.
+
+    Consume with `for event in sink.events(): ...` (ends when the sink is closed).
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, maxsize=0):
+        self.queue = queue.Queue(maxsize)
+
+    def on_start(self, agent):
+        self.queue.put({"type": "start", "agent": agent, "t": time.time()})
+
+    def on_token(self, agent, text):
+        self.queue.put({"type": "token", "agent": agent, "text": text, "t": time.time()})
+
+    def on_end(self, agent, turn):
+        self.queue.put({"type": "end", "agent": agent, "t": time.time(), **turn.as_dict()})
+
+    def close(self):
+        self.queue.put(self._CLOSED)
+
+    def events(self):
+        while True:
+            event = self.queue.get()
+            if event is self._CLOSED:
+                return
+            yield event
+
+    def serialize(self, event):
+        """JSON text frame, as it would be sent over a websocket."""
+        return json.dumps(event)
+
+
+# --------------------------------------------------------------------------------
+# IOStream
+# --------------------------------------------------------------------------------
+class Turn:
+    __slots__ = ("agent", "started", "first_token", "ended", "tokens")
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.started = time.perf_counter()
+        self.first_token = None
+        self.ended = None
+        self.tokens = 0
+
+    @property
+    def ttft_s(self):
+        return None if self.first_token is None else self.first_token - self.started
+
+    @property
+    def total_s(self):
+        return None if self.ended is None else self.ended - self.started
+
+    def as_dict(self):
+        return {"agent": self.agent, "ttft_s": self.ttft_s, "total_s": self.total_s, "tokens": self.tokens}
+
+
+class StreamingIOStream:
+    """AG2 IOStream that fans streamed tokens out to sinks and times each turn.
+
+    Args:
+        sinks (list[TokenSink]): Defaults to `default_sinks()`.
+        base: IOStream for everything that is not a token (messages, input).
+            Defaults to the current IOStream, so scripted input (run_pattern.py)
+            keeps working.
+    """
+
+    def __init__(self, sinks=None, base=None):
+        # AG2 is imported here, not at module level, so scripts can import this
+        # module before their API key check without paying for the framework.
+        from autogen.events.client_events import StreamEvent
+        from autogen.io import IOStream, IOConsole
+
+        self._stream_event = StreamEvent
+        self.sinks = list(sinks) if sinks is not None else default_sinks()
+        if base is None:
+            base = IOStream.get_default()
+            if isinstance(base, StreamingIOStream):
+                base = base.base
+        self.base = base or IOConsole()
+        self.turns = []
+        self._current = None
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------------------
+    # IOStream protocol
+    # ----------------------------------------------------------------------------
+    def print(self, *objects, sep=" ", end="\n", flush=False):
+        self.base.print(*objects, sep=sep, end=end, flush=flush)
+
+    def input(self, prompt="", *, password=False):
+        return self.base.input(prompt, password=password)
+
+    def send(self, message):
+        if isinstance(message, self._stream_event):
+            event = message.content  # wrapped event: the payload model holds the text
+            self.token(event.content if hasattr(event, "content") else event)
+        else:
+            self.base.send(message)
+
+    # ----------------------------------------------------------------------------
+    # Turns
+    # ----------------------------------------------------------------------------
+    def begin(self, agent):
+        with self._lock:
+            self._current = Turn(agent)
+
+    def token(self, text):
+        with self._lock:
+            turn = self._current
+            if turn is None:
+                turn = self._current = Turn("assistant")
+            first = turn.first_token is None
+            if first:
+                turn.first_token = time.perf_counter()
+            turn.tokens += 1
+        for sink in self.sinks:
+            if first:
+                sink.on_start(turn.agent)
+            sink.on_token(turn.agent, text)
+
+    def end(self, agent):
+        with self._lock:
+            turn, self._current = self._current, None
+            if turn is None or turn.first_token is None:
+                return  # nothing was streamed (human, tool or cached reply)
+            turn.ended = time.perf_counter()
+            self.turns.append(turn)
+        for sink in self.sinks:
+            sink.on_end(turn.agent, turn)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+    # ----------------------------------------------------------------------------
+    # Reporting
+    # ----------------------------------------------------------------------------
+    def report(self):
+        if not self.turns:
+            return "Streaming: no streamed turns."
+        ttft = [t.ttft_s for t in self.turns]
+        total = [t.total_s for t in self.turns]
+        lines = [f"{'Agent':<20}{'TTFT':>9}{'total':>9}{'chunks':>8}"]
+        for t in self.turns:
+            lines.append(f"{t.agent:<20}{t.ttft_s:>8.2f}s{t.total_s:>8.2f}s{t.tokens:>8}")
+        lines.append(
+            f"Mean time to first token {statistics.mean(ttft):.2f}s vs {statistics.mean(total):.2f}s "
+            f"for the full message ({len(self.turns)} turns)"
+        )
+        return "\n".join(lines)
+
+
+def enable_streaming(*agents, sinks=None):
+    """Install a StreamingIOStream and hook `agents` so each turn is timed.
+
+    The agents' llm_config must have stream=True (see utils.get_llm_config).
+
+    Returns:
+        StreamingIOStream
+    """
+    from autogen.io import IOStream
+
+    stream = StreamingIOStream(sinks)
+    # Global default: AG2 looks the stream up from worker threads as well.
+    IOStream.set_global_default(stream)
+
+    for agent in agents:
+        def before_reply(messages, name=agent.name):
+            stream.begin(name)
+            return messages
+
+        def before_send(sender, message, recipient, silent, name=agent.name):
+            stream.end(name)
+            return message
+
+        agent.register_hook("process_all_messages_before_reply", before_reply)
+        agent.register_hook("process_message_before_send", before_send)
+    return stream
@@ -0,0 +1,16 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The scripts import their sibling modules by name, so their folders go on sys.path.
+for folder in (
+    "",
+    "Coding agent",
+    "customer onboarding agent",
+    os.path.join("modern_autogen_v07", "01_feasibility_and_benchmarks"),
+    os.path.join("modern_autogen_v07", "02_foundation_patterns", "autogen_incident_response"),
+):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.insert(0, path)
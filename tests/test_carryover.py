@@ -0,0 +1,41 @@
+import json
+
+from carryover import CarryoverManager, CarryoverReport, estimate_tokens
+
+
+def test_json_summaries_are_merged_later_stages_win():
+    fields, texts = CarryoverManager().split(['{"name": "Kiki", "location": "Edmonton"}',
+                                              '{"location": "Calgary", "topics": "tech"}'])
+    assert fields == {"name": "Kiki", "location": "Calgary", "topics": "tech"}
+    assert texts == []
+
+
+def test_duplicate_free_text_is_passed_once():
+    _, texts = CarryoverManager().split(["Likes  tech.", "likes tech.", "Lives in Edmonton."])
+    assert texts == ["Likes  tech.", "Lives in Edmonton."]
+
+
+def test_budget_drops_oldest_text_then_whole_fields_and_keeps_valid_json():
+    summaries = [json.dumps({"a": "x" * 40, "b": "y" * 40, "c": "z" * 40}), "an old note " * 5, "a new note"]
+    manager = CarryoverManager()
+
+    within = manager.build(summaries, budget=35)
+    assert estimate_tokens(within) <= 35
+    head, *rest = within.split("\n")
+    assert json.loads(head) == {"b": "y" * 40, "c": "z" * 40}  # oldest field dropped, object intact
+    assert rest == []
+
+    tiny = manager.build(summaries, budget=3)
+    assert tiny == ""
+
+
+def test_without_budget_everything_is_kept():
+    carryover = CarryoverManager().build(['{"name": "Kiki"}', "note"])
+    assert carryover == '{"name": "Kiki"}\nnote'
+
+
+def test_report_counts_system_messages_in_both_columns():
+    report = CarryoverReport()
+    report.add(1, 10, 0, 30, 0, 5, system_tokens=100)
+    row = report.rows[0]
+    assert (row["before"], row["after"]) == (140, 115)
@@ -0,0 +1,88 @@
+import json
+import os
+import time
+
+import pytest
+from autogen.coding import CodeBlock
+from autogen.coding.base import CommandLineCodeResult
+
+from execution_cache import CachedCodeExecutor
+
+
+class FakeExecutor:
+    """Writes the block to a code file and "runs" it: `write NAME TEXT` creates a file."""
+
+    def __init__(self, work_dir):
+        self.work_dir = str(work_dir)
+        self.runs = 0
+
+    def execute_code_blocks(self, code_blocks):
+        self.runs += 1
+        code = code_blocks[0].code
+        code_file = os.path.join(self.work_dir, f"tmp_code_{abs(hash(code))}.py")
+        with open(code_file, "w") as f:
+            f.write(code)
+        _, name, text = code.split(" ", 2)
+        with open(os.path.join(self.work_dir, name), "w") as f:
+            f.write(text)
+        return CommandLineCodeResult(exit_code=0, output=f"wrote {name}", code_file=code_file)
+
+
+class StatefulExecutor(FakeExecutor):
+    stateful = True
+
+
+def block(code):
+    return [CodeBlock(code=code, language="python")]
+
+
+def test_hit_replays_output_and_restores_artifacts(tmp_path):
+    inner = FakeExecutor(tmp_path)
+    cache = CachedCodeExecutor(inner)
+    first = cache.execute_code_blocks(block("write out.txt hello"))
+    os.remove(tmp_path / "out.txt")
+
+    second = cache.execute_code_blocks(block("write out.txt hello"))
+    assert inner.runs == 1
+    assert second.output == first.output
+    assert second.code_file == first.code_file
+    assert (tmp_path / "out.txt").read_text() == "hello"
+    assert cache.stats()["hits"] == 1
+
+
+def test_code_file_is_stored_relative_to_the_workspace(tmp_path):
+    cache = CachedCodeExecutor(FakeExecutor(tmp_path))
+    cache.execute_code_blocks(block("write out.txt hello"))
+    entries = os.listdir(tmp_path / ".exec_cache" / "entries")
+    with open(tmp_path / ".exec_cache" / "entries" / entries[0]) as f:
+        code_file = json.load(f)["result"]["code_file"]
+    assert not os.path.isabs(code_file)
+    assert code_file.startswith("tmp_code_")
+
+
+def test_changed_input_file_invalidates_the_entry(tmp_path):
+    (tmp_path / "input.csv").write_text("1,2,3")
+    inner = FakeExecutor(tmp_path)
+    cache = CachedCodeExecutor(inner)
+    cache.execute_code_blocks(block("write out.txt hello"))
+    (tmp_path / "input.csv").write_text("4,5,6")
+
+    cache.execute_code_blocks(block("write out.txt hello"))
+    assert inner.runs == 2
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_entries_expire_after_ttl(tmp_path, monkeypatch):
+    inner = FakeExecutor(tmp_path)
+    cache = CachedCodeExecutor(inner, ttl=60)
+    cache.execute_code_blocks(block("write out.txt hello"))
+
+    now = time.time()
+    monkeypatch.setattr("execution_cache.time.time", lambda: now + 61)
+    cache.execute_code_blocks(block("write out.txt hello"))
+    assert inner.runs == 2
+
+
+def test_stateful_executors_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        CachedCodeExecutor(StatefulExecutor(tmp_path))
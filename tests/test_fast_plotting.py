@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+
+from fast_plotting import downsample, lttb
+
+
+def test_lttb_keeps_endpoints_and_returns_sorted_unique_indices():
+    x = np.arange(10_000, dtype="float64")
+    y = np.sin(x / 50) + np.random.default_rng(0).normal(0, 0.1, len(x))
+    keep = lttb(x, y, 500)
+    assert len(keep) == 500
+    assert keep[0] == 0 and keep[-1] == len(x) - 1
+    assert np.all(np.diff(keep) > 0)
+
+
+def test_lttb_keeps_isolated_peaks():
+    x = np.arange(5_000, dtype="float64")
+    y = np.zeros(len(x))
+    y[1234] = 100.0
+    y[3210] = -50.0
+    keep = lttb(x, y, 100)
+    assert 1234 in keep and 3210 in keep
+
+
+def test_lttb_returns_everything_when_nothing_to_drop():
+    x = np.arange(10, dtype="float64")
+    assert list(lttb(x, x, 10)) == list(range(10))
+    assert list(lttb(x, x, 50)) == list(range(10))
+    assert list(lttb(x, x, 2)) == list(range(10))
+
+
+def test_downsample_short_series_are_returned_unchanged():
+    series = pd.Series(np.arange(300.0), index=pd.date_range("2024-01-01", periods=300))
+    assert downsample(series, 200).equals(series)
+
+
+def test_downsample_long_series_keeps_datetime_index_and_shape():
+    index = pd.bdate_range("2000-01-03", periods=6_000)
+    values = np.cumsum(np.random.default_rng(1).normal(0, 1, len(index)))
+    series = pd.Series(values, index=index)
+    small = downsample(series, 1_000)
+    assert len(small) == 1_000
+    assert small.index.is_monotonic_increasing
+    assert small.index[0] == index[0] and small.index[-1] == index[-1]
+    # Peaks and troughs survive: the visible range barely shrinks.
+    spread = series.max() - series.min()
+    assert series.max() - small.max() < 0.02 * spread
+    assert small.min() - series.min() < 0.02 * spread
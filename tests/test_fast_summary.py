@@ -0,0 +1,105 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fast_summary import HybridSummarizer, SummaryMetrics, extract_fields
+
+
+def user(content, name="customer_proxy_agent"):
+    return {"role": "user", "name": name, "content": content}
+
+
+def test_json_and_dict_literals_are_preferred_over_regex():
+    messages = [
+        user("I'm Kiki from Edmonton."),
+        user('Here you go: ```json\n{"name": "Kiki Smith", "Location": "Calgary"}\n```'),
+    ]
+    assert extract_fields(messages, ["name", "location"]) == {"name": "Kiki Smith", "location": "Calgary"}
+    assert extract_fields([user("{'topics': ['food', 'tech']}")], ["topics"]) == {"topics": ["food", "tech"]}
+
+
+def test_empty_values_in_objects_are_ignored():
+    assert extract_fields([user('{"name": "", "location": "Oslo"}')], ["name", "location"]) == {"location": "Oslo"}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("I'm Kiki from Edmonton.", {"name": "Kiki", "location": "Edmonton"}),
+    ("My name is Ana Lopez and I live in Mexico City.", {"name": "Ana Lopez", "location": "Mexico City"}),
+    ("name: Bo, location: Oslo", {"name": "Bo", "location": "Oslo"}),
+    ("We are based in Berlin, Germany.", {"location": "Berlin, Germany"}),
+    ("I'm here to help.", {}),
+    ("I heard about you from Reddit.", {}),
+    ("I heard about you from a friend.", {}),
+])
+def test_regex_patterns(text, expected):
+    assert extract_fields([user(text)], ["name", "location"]) == expected
+
+
+def test_newer_messages_win():
+    messages = [user("I live in Edmonton."), user("Actually I live in Calgary now.")]
+    assert extract_fields(messages, ["location"]) == {"location": "Calgary"}
+
+
+def test_topics_are_taken_up_to_the_end_of_the_sentence():
+    assert extract_fields([user("I like food and tech. Thanks!")], ["topics"]) == {"topics": "food and tech"}
+
+
+# --------------------------------------------------------------------------------
+# HybridSummarizer
+# --------------------------------------------------------------------------------
+def agents(messages):
+    sender = SimpleNamespace(name="Onboarding_Agent", chat_messages_for_summary=lambda recipient: messages)
+    return sender, SimpleNamespace(name="customer_proxy_agent")
+
+
+def test_fast_path_returns_json_and_counts_a_hit():
+    summarizer = HybridSummarizer(fields=["name", "location"])
+    sender, recipient = agents([user("I'm Kiki from Edmonton.")])
+    assert json.loads(summarizer(sender, recipient, {})) == {"name": "Kiki", "location": "Edmonton"}
+    assert summarizer.metrics.fast_path_hits == 1 and summarizer.metrics.llm_fallbacks == 0
+
+
+def test_sender_messages_are_excluded(monkeypatch):
+    from autogen import ConversableAgent
+
+    monkeypatch.setattr(ConversableAgent, "_reflection_with_llm_as_summary",
+                        staticmethod(lambda sender, recipient, summary_args: "llm summary"))
+    # The agent's own question, as it appears in its history (role "assistant", no name).
+    question = {"role": "assistant", "content": "Hi, I'm Onboarding from Support, what is your name and location?"}
+    sender, recipient = agents([question, user("Hello!")])
+
+    assert HybridSummarizer(fields=["name", "location"])(sender, recipient, {}) == "llm summary"
+    assert json.loads(HybridSummarizer(fields=["name", "location"], exclude_sender=False)(sender, recipient, {})) == {
+        "name": "Onboarding", "location": "Support"}
+
+
+def test_missing_fields_fall_back_to_the_reflection_summary(monkeypatch):
+    from autogen import ConversableAgent
+
+    calls = []
+
+    def reflection(sender, recipient, summary_args):
+        calls.append(summary_args)
+        return '{"name": "Kiki", "location": "unknown"}'
+
+    monkeypatch.setattr(ConversableAgent, "_reflection_with_llm_as_summary", staticmethod(reflection))
+    summarizer = HybridSummarizer(fields=["name", "location"])
+    sender, recipient = agents([user("I'm Kiki.")])
+    args = {"summary_prompt": "Return the customer information as JSON."}
+
+    assert summarizer(sender, recipient, args) == '{"name": "Kiki", "location": "unknown"}'
+    assert calls == [args]
+    assert summarizer.metrics.llm_fallbacks == 1
+
+
+def test_summary_metrics():
+    metrics = SummaryMetrics(llm_latency_estimate=2.0)
+    assert metrics.hit_rate == 0.0
+    metrics.calls, metrics.fast_path_hits, metrics.fast_path_seconds = 4, 3, 0.01
+    assert metrics.hit_rate == 0.75
+    assert metrics.latency_saved == pytest.approx(5.99)
+    metrics.llm_fallbacks, metrics.llm_seconds = 1, 1.0
+    assert metrics.avg_llm_latency == 1.0
+    assert metrics.as_dict()["hit_rate"] == 0.75
+    assert "(75%)" in metrics.report()
@@ -0,0 +1,52 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+from run_pattern import PATTERNS, ROOT
+
+FRAMEWORKS = ("autogen", "autogen_agentchat", "autogen_core", "autogen_ext", "matplotlib")
+
+# Fresh interpreter: load the script as run_pattern does, then run main().
+CHILD = """
+import json, sys
+sys.path.insert(0, {root!r})
+from run_pattern import PATTERNS, load_main
+
+def loaded():
+    return sorted(name for name in {frameworks!r} if name in sys.modules)
+
+main = load_main(PATTERNS[{name!r}])
+imported = loaded()
+try:
+    main()
+except SystemExit:
+    pass
+print("\\n" + json.dumps({{"import": imported, "main": loaded()}}))
+"""
+
+
+def run_child(name, cwd, **env):
+    code = CHILD.format(root=ROOT, name=name, frameworks=FRAMEWORKS)
+    environ = {k: v for k, v in os.environ.items() if k != "LLM_OFFLINE"}
+    environ.update(env)
+    proc = subprocess.run([sys.executable, "-c", code], cwd=cwd, env=environ, capture_output=True, text=True,
+                          timeout=120)
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize("name", sorted(PATTERNS))
+def test_frameworks_are_not_imported_before_main_needs_them(name, tmp_path):
+    # Set but empty: load_dotenv() does not override it, so a .env key is ignored too.
+    modules = run_child(name, tmp_path, GOOGLE_API_KEY="", GEMINI_API_KEY="")
+    assert modules == {"import": [], "main": []}
+
+
+def test_the_entry_point_does_import_the_framework(tmp_path):
+    # Guards the test above: the child really sees the imports main() makes.
+    modules = run_child("comedy", tmp_path, LLM_OFFLINE="1")
+    assert modules["import"] == []
+    assert "autogen" in modules["main"]
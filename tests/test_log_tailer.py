@@ -0,0 +1,167 @@
+import asyncio
+import os
+
+from log_tailer import FileTailer, LogRecord, LogWatcher, describe, normalize, signature
+
+
+def record(message, service="OrderService", level="ERROR", extra=()):
+    r = LogRecord("app.log", 0, "2024-01-01 10:00:00", level, service, message,
+                  f"2024-01-01 10:00:00 {level} [{service}] {message}")
+    r.lines.extend(extra)
+    return r
+
+
+def header(i, level="INFO", message="ok"):
+    return f"2024-01-01 10:00:{i:02d} {level} [Svc] {message} {i}\n"
+
+
+# --------------------------------------------------------------------------------
+# Signatures
+# --------------------------------------------------------------------------------
+def test_normalize_replaces_variable_parts():
+    text = ("Pool 7 exhausted for 10.0.0.12:5432 at /app/db/connection.py:12 "
+            "id=3f2b8c1e-1111-2222-3333-444455556666 addr 0xdeadbeef user 'kiki'")
+    assert normalize(text) == "Pool <n> exhausted for <ip> at <path> id=<uuid> addr <hex> user <str>"
+
+
+def test_signature_ignores_numbers_and_uses_the_innermost_cause():
+    a = record("ConnectionRefusedError: [Errno 111] Connection refused",
+               extra=["    at /app/services/order.py:45 in create_order",
+                      "Caused by: FATAL: 7 connection slots are reserved"])
+    b = record("ConnectionRefusedError: [Errno 111] Connection refused",
+               extra=["Caused by: FATAL: 9 connection slots are reserved"])
+    assert signature(a) == signature(b)
+    assert signature(a)[1] == "OrderService: FATAL: <n> connection slots are reserved"
+
+
+def test_signature_depends_on_the_service():
+    assert signature(record("Timeout", service="A"))[0] != signature(record("Timeout", service="B"))[0]
+
+
+def test_investigators_see_the_real_values():
+    r = record("503 Service Unavailable - Upstream connect error", service="ApiGateway")
+    assert describe(r) == "[ApiGateway] 503 Service Unavailable - Upstream connect error"
+    r = record("ConnectionRefusedError: [Errno 111] Connection refused",
+               extra=["Caused by: FATAL: 7 connection slots are reserved"])
+    assert describe(r) == ("[OrderService] ConnectionRefusedError: [Errno 111] Connection refused "
+                           "(caused by: FATAL: 7 connection slots are reserved)")
+
+
+# --------------------------------------------------------------------------------
+# Tailing
+# --------------------------------------------------------------------------------
+def test_appends_are_read_once_and_multiline_records_stay_together(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1) + header(2, "ERROR", "boom") + "    at frame\n")
+    tailer = FileTailer(str(path), {})
+    first = tailer.poll()
+    assert [r.message for r in first] == ["ok 1"]  # "boom" may still get continuation lines
+    last = tailer.poll()  # idle poll completes it
+    assert [r.lines for r in last] == [[header(2, "ERROR", "boom").rstrip("\n"), "    at frame"]]
+    assert tailer.poll() == []
+
+
+def test_partial_lines_wait_for_their_newline(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1) + "2024-01-01 10:00:02 INFO [Svc] hal")
+    tailer = FileTailer(str(path), {})
+    tailer.poll()
+    tailer.poll()
+    with open(path, "a") as f:
+        f.write("f\n" + header(3))
+    records = tailer.poll()
+    assert [r.message for r in records] == ["half"]
+
+
+def test_rename_rotation_drains_the_old_file_then_follows_the_new_one(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1))
+    tailer = FileTailer(str(path), {})
+    tailer.poll()
+    with open(path, "a") as f:
+        f.write(header(2))
+    os.rename(path, tmp_path / "app.log.1")
+    path.write_text(header(3))
+
+    messages = [r.message for r in tailer.poll() + tailer.poll()]
+    assert messages == ["ok 1", "ok 2", "ok 3"]
+    assert tailer.rotations == 1
+
+
+def test_rotation_completes_the_old_files_last_record_before_saving(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1))
+    state = {}
+    tailer = FileTailer(str(path), state)
+    tailer.poll()
+    with open(path, "a") as f:
+        f.write(header(2))
+    os.rename(path, tmp_path / "app.log.1")
+    path.write_text("")  # recreated, nothing written yet
+
+    assert [r.message for r in tailer.poll()] == ["ok 1", "ok 2"]
+    # The saved offset belongs to the new file, not to "ok 2" in the old one.
+    assert state == {"inode": os.stat(path).st_ino, "offset": 0}
+    with open(path, "a") as f:
+        f.write(header(3) + header(4))
+    resumed = FileTailer(str(path), state)
+    assert [r.message for r in resumed.poll() + resumed.poll()] == ["ok 3", "ok 4"]
+
+
+def test_copytruncate_starts_again_at_the_beginning(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1) + header(2))
+    tailer = FileTailer(str(path), {})
+    tailer.poll()
+    tailer.poll()
+    path.write_text(header(3))  # truncated in place, then written
+
+    messages = [r.message for r in tailer.poll() + tailer.poll()]
+    assert messages == ["ok 3"]
+    assert tailer.rotations == 1
+
+
+def test_restart_resumes_from_the_saved_offset(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text(header(1) + header(2))
+    state = {}
+    tailer = FileTailer(str(path), state)
+    tailer.poll()  # "ok 2" is still pending, so the saved offset points at it
+    tailer.close()
+
+    with open(path, "a") as f:
+        f.write(header(3))
+    resumed = FileTailer(str(path), state)
+    messages = [r.message for r in resumed.poll() + resumed.poll()]
+    assert messages == ["ok 2", "ok 3"]
+
+
+# --------------------------------------------------------------------------------
+# Watcher
+# --------------------------------------------------------------------------------
+def test_repeated_signatures_trigger_once_and_idle_polls_do_not_write_state(tmp_path, monkeypatch):
+    path = tmp_path / "app.log"
+    path.write_text("".join(header(i, "ERROR", "Pool exhausted") for i in range(50)) + header(50))
+    state_path = tmp_path / "state.json"
+
+    async def ignore(incidents):
+        pass
+
+    async def run():
+        watcher = LogWatcher([str(path)], state_path=str(state_path), handler=ignore)
+        incidents = watcher.poll() + watcher.poll()
+        assert len(incidents) == 1
+        assert watcher.trigger.suppressed == 49
+
+        saves = []
+        monkeypatch.setattr(watcher, "save", lambda: saves.append(1))
+        for _ in range(5):
+            watcher.poll()
+        assert saves == []
+        with open(path, "a") as f:
+            f.write(header(51) + header(52))  # the resume offset moves past "ok 51"
+        watcher.poll()
+        assert saves == [1]
+
+    asyncio.run(run())
+    assert state_path.exists()
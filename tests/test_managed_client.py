@@ -0,0 +1,71 @@
+import pytest
+
+import offline
+import utils
+from metrics import get_metrics
+from utils import ManagedClient, configure_agents, get_llm_config
+
+
+@pytest.fixture
+def counted(monkeypatch):
+    """{"upstream": model calls, "acquired": limiter acquires} of the offline client."""
+    monkeypatch.setenv("LLM_OFFLINE", "1")
+    counts = {"upstream": 0, "acquired": 0}
+    create, acquire = offline.OfflineModelClient.create, utils.RateLimiter.acquire
+
+    def counted_create(self, params):
+        counts["upstream"] += 1
+        return create(self, params)
+
+    def counted_acquire(self, tokens=0):
+        counts["acquired"] += 1
+        return acquire(self, tokens)
+
+    monkeypatch.setattr(offline.OfflineModelClient, "create", counted_create)
+    monkeypatch.setattr(utils.RateLimiter, "acquire", counted_acquire)
+    return counts
+
+
+def agents(**kwargs):
+    from autogen import ConversableAgent
+
+    writer = ConversableAgent("Writer", system_message="You write.", llm_config=get_llm_config(),
+                              human_input_mode="NEVER")
+    critic = ConversableAgent("Critic", system_message="You critique.", llm_config=get_llm_config(),
+                              human_input_mode="NEVER")
+    return configure_agents(writer, critic, **kwargs)
+
+
+def test_reflection_summaries_go_through_the_limiter(counted):
+    writer, critic = agents(coalesce=False)
+    result = critic.initiate_chat(writer, message="Write a haiku.", max_turns=2,
+                                  summary_method="reflection_with_llm")
+
+    assert result.summary
+    # Three replies and the summary, every one of them limited.
+    assert counted["upstream"] == 4
+    assert counted["acquired"] == counted["upstream"]
+    assert result.cost["usage_including_cached_inference"]["total_cost"] == 0
+
+
+def test_configure_agents_wraps_the_client_once(counted):
+    writer, _ = agents()
+    configure_agents(writer)
+    assert isinstance(writer.client, ManagedClient)
+    assert not isinstance(writer.client._client, ManagedClient)
+
+
+def test_summary_calls_are_recorded_in_the_metrics(counted):
+    writer, critic = agents(coalesce=False)
+    metrics = get_metrics()
+    previous, run = metrics.run, metrics.start_run("reflection-metrics")
+    try:
+        critic.initiate_chat(writer, message="Write a haiku.", max_turns=1, summary_method="reflection_with_llm")
+        agents_ = metrics.snapshot()[run]["agents"]
+        prediction = metrics.prediction(run)
+    finally:
+        metrics.start_run(previous)
+    # The writer's reply and the summary (reflected with the writer's client).
+    assert agents_["Writer"]["gemini-2.0-flash"]["calls"] == counted["upstream"] == 2
+    assert agents_["Writer"]["gemini-2.0-flash"]["completion_tokens"] > 0
+    assert prediction["turns"] == 2
@@ -0,0 +1,77 @@
+import re
+
+import pytest
+
+from metrics import Histogram, Metrics
+
+# metric_name{label="value",...} number
+SAMPLE = re.compile(r'^[a-z_]+(\{[a-z_]+="(?:[^"\\]|\\.)*"(?:,[a-z_]+="(?:[^"\\]|\\.)*")*\})? -?[0-9.e+-]+$')
+
+
+def parse(text):
+    """{sample name with labels: float} of a Prometheus text export."""
+    samples = {}
+    for line in text.splitlines():
+        if line.startswith("#"):
+            continue
+        name, value = line.rsplit(" ", 1)
+        samples[name] = float(value)
+    return samples
+
+
+def test_histogram_buckets_are_cumulative():
+    h = Histogram((1, 5, 10))
+    for value in (0.5, 3, 3, 7, 50):
+        h.observe(value)
+    assert h.counts == [1, 3, 4]
+    assert h.count == 5 and h.sum == pytest.approx(63.5)
+
+
+def test_to_prometheus_exports_counters_histograms_and_cache_hits():
+    metrics = Metrics(run="r1")
+    metrics.record_call("writer", "gemini-2.0-flash", 1000, 200, 0.4)
+    metrics.record_call("writer", "gemini-2.0-flash", 500, 100, 3.0)
+    metrics.record_retry("writer", "gemini-2.0-flash")
+    metrics.record_cache_hit("critic", "semantic")
+    text = metrics.to_prometheus()
+    samples = parse(text)
+
+    labels = '{run="r1",agent="writer",model="gemini-2.0-flash"}'
+    assert samples["llm_calls_total" + labels] == 2
+    assert samples["llm_prompt_tokens_total" + labels] == 1500
+    assert samples["llm_completion_tokens_total" + labels] == 300
+    assert samples["llm_retries_total" + labels] == 1
+    assert samples["llm_cost_usd_total" + labels] == pytest.approx(
+        metrics.cost("gemini-2.0-flash", 1500, 300))
+    assert samples['llm_request_latency_seconds_bucket{run="r1",agent="writer",model="gemini-2.0-flash",le="0.5"}'] == 1
+    assert samples['llm_request_latency_seconds_bucket{run="r1",agent="writer",model="gemini-2.0-flash",le="+Inf"}'] == 2
+    assert samples["llm_request_latency_seconds_count" + labels] == 2
+    assert samples['llm_cache_hits_total{run="r1",agent="critic",kind="semantic"}'] == 1
+
+    assert "# TYPE llm_calls_total counter" in text
+    assert "# TYPE llm_request_latency_seconds histogram" in text
+    assert text.endswith("\n")
+    for line in text.splitlines():
+        assert line.startswith("#") or SAMPLE.match(line), line
+
+
+def test_label_values_are_escaped():
+    metrics = Metrics(run='run "quoted"\nnext')
+    metrics.record_call("a\\b", "m", 1, 1, 0.1)
+    text = metrics.to_prometheus()
+    assert 'run="run \\"quoted\\"\\nnext"' in text
+    assert 'agent="a\\\\b"' in text
+
+
+def test_unknown_models_cost_nothing():
+    metrics = Metrics(run="r")
+    metrics.record_call("a", "not-a-model", 1000, 1000, 0.1)
+    assert metrics.snapshot()["r"]["cost_usd"] == 0.0
+
+
+def test_write_is_atomic(tmp_path):
+    metrics = Metrics(run="r")
+    metrics.record_call("a", "gemini-2.0-flash", 10, 10, 0.1)
+    path = metrics.write(str(tmp_path / "llm.prom"))
+    assert open(path).read() == metrics.to_prometheus()
+    assert not (tmp_path / "llm.prom.tmp").exists()
@@ -0,0 +1,101 @@
+import pytest
+
+from model_router import DEFAULT_TIERS, ModelRouter, estimate_confidence
+
+CHEAP, DEFAULT, STRONG = DEFAULT_TIERS
+ANSWER = "The title is clear; add two internal links and a meta description of about 150 characters."
+
+
+def test_roles_start_at_their_tier():
+    router = ModelRouter()
+    assert router.route("SEO_Reviewer", 500) == CHEAP
+    assert router.route("Onboarding_Personal_Information_Agent", 500) == CHEAP
+    assert router.route("Meta_Reviewer", 500) == STRONG
+    assert router.route("orchestrator", 500) == STRONG
+    assert router.route("Writer", 500) == DEFAULT
+    assert router.downgrades == 0
+
+
+def test_confident_answers_are_accepted():
+    router = ModelRouter()
+    assert router.observe("SEO_Reviewer", CHEAP, 500, ANSWER, 0.5) is None
+    assert router.escalations == 0
+    assert router.calls == {CHEAP: 1}
+
+
+@pytest.mark.parametrize("answer", ["", "I'm not sure, it depends.", "ok"])
+def test_low_confidence_and_failed_answers_escalate_one_tier(answer):
+    router = ModelRouter()
+    assert estimate_confidence(answer) < router.min_confidence
+    assert router.observe("SEO_Reviewer", CHEAP, 500, answer, 0.5) == DEFAULT
+    assert router.escalations == 1
+    # max_escalations=1: the escalated answer is accepted whatever it says.
+    assert router.observe("SEO_Reviewer", DEFAULT, 500, answer, 0.5, attempt=1) is None
+
+
+def test_tool_calls_and_the_strongest_tier_are_never_escalated():
+    router = ModelRouter()
+    assert router.observe("SEO_Reviewer", CHEAP, 500, None, 0.5) is None
+    assert router.observe("Meta_Reviewer", STRONG, 500, "", 0.5) is None
+    assert router.escalations == 0
+
+
+def test_budget_cap_forces_the_cheap_tier():
+    router = ModelRouter(budget_usd=0.005)
+    assert router.route("Meta_Reviewer", 100) == STRONG
+    router.observe("Meta_Reviewer", STRONG, 100, ANSWER, 2.0, completion_tokens=1000)
+    # The budget is spent: every role gets the cheapest tier.
+    assert router.route("Meta_Reviewer", 100) == CHEAP
+    assert router.downgrades == 1
+    # Nor is there budget to escalate.
+    assert router.observe("SEO_Reviewer", CHEAP, 100, "", 0.5) is None
+
+
+def test_latency_target_lowers_the_tier():
+    # gemini-2.5-pro needs ~7s for the expected 400 tokens, gemini-2.0-flash ~2.5s.
+    router = ModelRouter(latency_target_s=3.0)
+    assert router.route("Meta_Reviewer", 500) == DEFAULT
+    assert router.downgrades == 1
+
+
+def test_savings_are_compared_with_the_baseline_model():
+    router = ModelRouter()
+    router.observe("SEO_Reviewer", CHEAP, 1000, ANSWER, 0.4, completion_tokens=200)
+    stats = router.stats()
+    assert stats["cost_usd"] < stats["baseline_cost_usd"]
+    assert stats["cost_saved_usd"] > 0
+
+
+def test_unknown_models_are_rejected():
+    with pytest.raises(ValueError):
+        ModelRouter(tiers=("not-a-model",))
+
+
+def test_from_env(monkeypatch):
+    monkeypatch.delenv("MODEL_ROUTER", raising=False)
+    assert ModelRouter.from_env() is None
+
+    monkeypatch.setenv("MODEL_ROUTER", "1")
+    monkeypatch.setenv("LLM_BUDGET_USD", "0.25")
+    monkeypatch.setenv("LLM_LATENCY_TARGET_S", "8")
+    router = ModelRouter.from_env()
+    assert router.budget_usd == 0.25 and router.latency_target_s == 8.0
+
+
+def test_configured_agents_cascade_to_the_next_tier(monkeypatch):
+    from autogen import ConversableAgent
+
+    import offline
+    from utils import configure_agents, get_llm_config
+
+    monkeypatch.setenv("LLM_OFFLINE", "1")
+    # The cheap tier answers with nothing, the next tier properly.
+    monkeypatch.setattr(offline, "offline_reply", lambda messages, model="offline": "" if model == CHEAP else ANSWER)
+    router = ModelRouter()
+    reviewer = ConversableAgent("SEO_Reviewer", llm_config=get_llm_config(), human_input_mode="NEVER")
+    configure_agents(reviewer, router=router, coalesce=False)
+
+    reply = reviewer.generate_reply([{"role": "user", "content": "Review this post."}])
+    assert reply == ANSWER
+    assert router.calls == {CHEAP: 1, DEFAULT: 1}
+    assert router.escalations == 1
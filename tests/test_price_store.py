@@ -0,0 +1,91 @@
+import datetime
+
+import pandas as pd
+import pytest
+
+from price_store import FixtureSource, PriceFetchError, PriceStore, SyntheticSource, missing_ranges, to_day
+
+
+class CountingSource:
+    """Wraps a source and records every fetch."""
+
+    def __init__(self, source):
+        self.source = source
+        self.calls = []
+
+    def fetch(self, symbols, start, end):
+        self.calls.append((tuple(symbols), to_day(start), to_day(end)))
+        return self.source.fetch(symbols, start, end)
+
+
+class EmptySource:
+    """What yfinance returns on a network error or a rate limit."""
+
+    def fetch(self, symbols, start, end):
+        return pd.DataFrame(columns=list(symbols))
+
+
+def test_missing_ranges():
+    assert missing_ranges([], 0, 10) == [(0, 10)]
+    assert missing_ranges([[0, 10]], 0, 10) == []
+    assert missing_ranges([[2, 4], [6, 8]], 0, 10) == [(0, 2), (4, 6), (8, 10)]
+    assert missing_ranges([[0, 3], [3, 5]], 0, 10) == [(5, 10)]  # touching ranges merge
+    assert missing_ranges([[20, 30]], 0, 10) == [(0, 10)]
+
+
+def test_second_query_is_served_from_disk_and_extensions_fetch_only_the_gap(tmp_path):
+    source = CountingSource(SyntheticSource())
+    store = PriceStore(str(tmp_path), source)
+    first = store.get(["NVDA", "TSLA"], "2024-01-01", "2024-03-01")
+    assert len(source.calls) == 1
+
+    again = store.get(["NVDA", "TSLA"], "2024-01-15", "2024-02-15")
+    assert len(source.calls) == 1
+    pd.testing.assert_frame_equal(again, first.loc["2024-01-15":"2024-02-14"], check_freq=False)
+
+    store.get(["NVDA"], "2024-01-01", "2024-04-01")
+    assert source.calls[-1] == (("NVDA",), to_day("2024-03-01"), to_day("2024-04-01"))
+
+
+def test_failed_fetch_raises_and_caches_nothing(tmp_path):
+    store = PriceStore(str(tmp_path), EmptySource())
+    with pytest.raises(PriceFetchError):
+        store.get("NVDA", "2024-01-01", "2024-03-01")
+
+    source = CountingSource(SyntheticSource())
+    store.source = source
+    assert len(store.get("NVDA", "2024-01-01", "2024-03-01")) > 30
+    assert len(source.calls) == 1
+
+
+def test_symbol_missing_from_the_answer_is_not_marked_covered(tmp_path):
+    frame = SyntheticSource().fetch(["NVDA"], "2024-01-01", "2024-02-01")
+    store = PriceStore(str(tmp_path), FixtureSource(frame))
+    prices = store.get(["NVDA", "TSLA"], "2024-01-01", "2024-02-01")
+    assert prices["TSLA"].dropna().empty
+
+    source = CountingSource(SyntheticSource())
+    store.source = source
+    store.get(["NVDA", "TSLA"], "2024-01-01", "2024-02-01")
+    assert source.calls == [(("TSLA",), to_day("2024-01-01"), to_day("2024-02-01"))]
+
+
+def test_weekend_only_gap_is_not_fetched(tmp_path):
+    source = CountingSource(EmptySource())
+    store = PriceStore(str(tmp_path), source)
+    assert store.get("NVDA", "2024-01-06", "2024-01-08").empty  # Saturday, Sunday
+    assert source.calls == []
+
+
+def test_today_is_never_marked_covered(tmp_path):
+    source = CountingSource(SyntheticSource())
+    store = PriceStore(str(tmp_path), source)
+    today = datetime.date.today()
+    start, end = today - datetime.timedelta(days=10), today + datetime.timedelta(days=1)
+    store.get("NVDA", start, end)
+    store.get("NVDA", start, end)
+    if today.weekday() < 5:
+        assert len(source.calls) == 2
+        assert source.calls[1][1] == to_day(today)
+    else:
+        assert len(source.calls) == 1  # a weekend "today" has nothing to fetch
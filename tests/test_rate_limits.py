@@ -0,0 +1,77 @@
+import asyncio
+import gc
+
+import pytest
+
+import utils
+from utils import RateLimiter, TokenBucket
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time.monotonic that the test advances by hand."""
+    now = [1000.0]
+    monkeypatch.setattr(utils.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_token_bucket_allows_a_burst_then_charges_debt(clock):
+    bucket = TokenBucket(60)  # one token per second, capacity 60
+    assert all(bucket.reserve() == 0 for _ in range(60))
+    assert bucket.reserve() == pytest.approx(1.0)
+    assert bucket.reserve() == pytest.approx(2.0)  # callers queue up behind each other
+
+    clock[0] += 2
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_token_bucket_caps_large_requests_at_capacity(clock):
+    bucket = TokenBucket(60)
+    assert bucket.reserve(1000) == 0  # a single oversized request is not blocked forever
+    assert bucket.reserve() == pytest.approx(1.0)
+
+
+def test_token_bucket_drain_blocks_for_the_given_time(clock):
+    bucket = TokenBucket(60)
+    bucket.drain(10)
+    assert bucket.reserve() == pytest.approx(11.0)
+
+
+def test_rate_limiter_is_unlimited_by_default(clock):
+    limiter = RateLimiter()
+    assert limiter.requests is None and limiter.tokens is None
+    assert all(limiter._reserve(10_000) == 0 for _ in range(1000))
+
+
+def test_unlimited_rate_limiter_still_backs_off_after_a_429(clock):
+    limiter = RateLimiter()
+    limiter.penalize(5)
+    assert limiter._reserve(0) == pytest.approx(5.0)
+    clock[0] += 5
+    assert limiter._reserve(0) == 0
+    assert limiter.rate_limit_errors == 1
+
+
+def test_rate_limits_come_from_the_environment(monkeypatch):
+    monkeypatch.setenv("LLM_RPM", "15")
+    monkeypatch.delenv("LLM_TPM", raising=False)
+    monkeypatch.setattr(utils, "_limiters", {})
+    limiter = utils.get_rate_limiter("test-model")
+    assert limiter.requests.capacity == 15
+    assert limiter.tokens is None
+
+
+def test_http_clients_are_per_loop_and_closed_with_it():
+    clients = []
+
+    async def main():
+        client = utils.get_http_client("http://example.invalid/")
+        assert utils.get_http_client("http://example.invalid/") is client
+        clients.append(client)
+
+    asyncio.run(main())
+    asyncio.run(main())
+    gc.collect()
+    assert clients[0] is not clients[1]
+    assert all(client.is_closed for client in clients)
+    assert len(utils._http_clients) == 0
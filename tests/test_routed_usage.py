@@ -0,0 +1,38 @@
+from types import SimpleNamespace
+
+import pytest
+
+from utils import _add_usage_since, _usage_snapshot
+
+
+def usage(model, cost, prompt, completion):
+    return {"total_cost": cost,
+            model: {"cost": cost, "prompt_tokens": prompt, "completion_tokens": completion,
+                    "total_tokens": prompt + completion}}
+
+
+def test_routed_usage_is_added_to_the_agent_client():
+    agent_client = SimpleNamespace(total_usage_summary=usage("gemini-2.0-flash", 0.01, 100, 50),
+                                   actual_usage_summary=usage("gemini-2.0-flash", 0.01, 100, 50))
+    routed = SimpleNamespace(total_usage_summary=usage("gemini-1.5-flash-8b", 0.001, 40, 10),
+                             actual_usage_summary=None)
+    snapshot = _usage_snapshot(routed)
+    # One more routed call: +60 prompt, +20 completion tokens.
+    routed.total_usage_summary = usage("gemini-1.5-flash-8b", 0.003, 100, 30)
+    routed.actual_usage_summary = usage("gemini-1.5-flash-8b", 0.002, 60, 20)
+
+    _add_usage_since(agent_client, routed, snapshot)
+
+    total = agent_client.total_usage_summary
+    assert total["total_cost"] == pytest.approx(0.012)
+    assert total["gemini-2.0-flash"]["prompt_tokens"] == 100
+    assert total["gemini-1.5-flash-8b"] == {"cost": pytest.approx(0.002), "prompt_tokens": 60, "completion_tokens": 20,
+                                            "total_tokens": 80}
+    assert agent_client.actual_usage_summary["gemini-1.5-flash-8b"]["prompt_tokens"] == 60
+
+
+def test_no_new_usage_leaves_the_agent_client_untouched():
+    agent_client = SimpleNamespace(total_usage_summary=None, actual_usage_summary=None)
+    routed = SimpleNamespace(total_usage_summary=usage("m", 0.001, 40, 10), actual_usage_summary=None)
+    _add_usage_since(agent_client, routed, _usage_snapshot(routed))
+    assert agent_client.total_usage_summary is None
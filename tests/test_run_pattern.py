@@ -0,0 +1,104 @@
+import os
+
+import pytest
+
+import run_pattern
+from run_pattern import PATTERNS, ScriptedInput
+
+
+class Recorder:
+    def __init__(self):
+        self.lines = []
+
+    def print(self, *objects, sep=" ", end="\n", flush=False):
+        self.lines.append(sep.join(map(str, objects)))
+
+    def send(self, message):
+        pass
+
+
+def prompt(agent):
+    return (f"Replying as customer_proxy_agent. Provide feedback to {agent}. Press enter to skip and use "
+            f"auto-reply, or type 'exit' to end the conversation: ")
+
+
+def test_scripted_answers_in_order_then_exit():
+    stream = ScriptedInput(["", "looks good"], Recorder())
+    assert [stream.input("> ") for _ in range(3)] == ["", "looks good", "exit"]
+    assert stream.base.lines == ["> ", "> looks good", "> exit"]
+
+
+def test_scripted_answers_per_agent():
+    answers = {"Info_Agent": ["I'm Kiki."], "Topic_Agent": ["Food.", "Tech."]}
+    stream = ScriptedInput(answers, Recorder())
+    assert stream.input(prompt("Topic_Agent")) == "Food."
+    assert stream.input(prompt("Info_Agent")) == "I'm Kiki."
+    assert stream.input(prompt("Info_Agent")) == "exit"
+    assert stream.input(prompt("Topic_Agent")) == "Tech."
+    assert stream.input("Some other prompt: ") == "exit"
+    # The pattern's own answers are not consumed.
+    assert answers["Topic_Agent"] == ["Food.", "Tech."]
+
+
+@pytest.fixture
+def offline_env():
+    # run_pattern sets these for offline runs; restore them afterwards.
+    names = ("LLM_OFFLINE", "PRICE_SOURCE", "LLM_RPM")
+    saved = {name: os.environ.get(name) for name in names}
+    log = os.path.join(os.path.dirname(PATTERNS["onboarding"].path), "log.txt")
+    existed = os.path.exists(log)
+    yield
+    for name, value in saved.items():
+        if value is None:
+            os.environ.pop(name, None)
+        else:
+            os.environ[name] = value
+    if not existed and os.path.exists(log):
+        os.remove(log)  # written by the onboarding script
+
+
+def test_offline_onboarding_run_answers_each_agent_and_is_profiled(offline_env, tmp_path, capsys):
+    result = run_pattern.run_pattern("onboarding", offline=True, profile="sample", profile_dir=str(tmp_path),
+                                     interval=0.002)
+    output = capsys.readouterr().out
+
+    assert result["summary"]["failed"] == 0, result["runs"]
+    run = result["runs"][0]
+    assert run["ok"] and run["wall_s"] > 0 and run["llm_calls"] > 0
+    answered = [line.rsplit(": ", 1)[1] for line in output.splitlines() if "Provide feedback to" in line]
+    agents = [line.split("feedback to ", 1)[1].split(".", 1)[0] for line in output.splitlines()
+              if "Provide feedback to" in line]
+    info, topics = "Onboarding_Personal_Information_Agent", "Onboarding_Topic_Preference_Agent"
+    # Each stage gets its own answer first, then "exit" for the rest of its turns.
+    assert answered[agents.index(info)] == "I'm Kiki from Edmonton."
+    assert answered[agents.index(topics)] == "I like food and tech."
+    assert agents.index(info) < agents.index(topics)
+    assert all(answer == "exit" for i, answer in enumerate(answered)
+               if i not in (agents.index(info), agents.index(topics)))
+
+    folded, svg = result["profile"]
+    assert os.path.dirname(folded) == str(tmp_path)
+    with open(folded) as f:
+        stacks = f.read()
+    assert "run_once (run_pattern.py" in stacks
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in stacks.splitlines())
+    with open(svg) as f:
+        assert "<svg" in f.read()
+
+
+def test_cprofile_writes_stats_and_a_flame_graph(tmp_path):
+    from profiling import make_profiler
+
+    def work():
+        return sum(i * i for i in range(20000))
+
+    profiler = make_profiler("cprofile").start()
+    work()
+    profiler.stop()
+    paths = profiler.write(str(tmp_path / "work"))
+    assert [os.path.splitext(p)[1] for p in paths] == [".prof", ".txt", ".folded", ".svg"]
+    assert all(os.path.getsize(p) for p in paths)
+    with open(tmp_path / "work.folded") as f:
+        assert "work (test_run_pattern.py" in f.read()
+    with pytest.raises(ValueError):
+        make_profiler("perf")
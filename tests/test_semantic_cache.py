@@ -0,0 +1,79 @@
+import pytest
+
+import semantic_cache
+from semantic_cache import SemanticCache, normalize
+
+PROMPT = ("Review the following blog post for SEO issues and give three concrete suggestions. "
+          "Post: AutoGen agents can now stream their replies, which makes long reviews feel faster.")
+
+
+def test_normalize_masks_dates_and_whitespace_but_keeps_numbers():
+    assert normalize("Today  is 2024-05-01.\nTop 5") == "today is <date>. top 5"
+    assert normalize("Top 5") != normalize("Top 10")
+    assert normalize("Top 5", mask_numbers=True) == normalize("Top 10", mask_numbers=True)
+
+
+def test_near_duplicate_prompt_hits_and_unrelated_prompt_misses():
+    cache = SemanticCache(thresholds={"reviewer": 0.9}, verify_rate=0)
+    cache.store("SEO_Reviewer", PROMPT, "Add keywords.")
+
+    hit = cache.lookup("SEO_Reviewer", PROMPT.replace("three concrete", "three specific") + "  ")
+    assert hit is not None and hit[0] == "Add keywords." and hit[1] >= 0.9
+    assert cache.lookup("SEO_Reviewer", "Write a poem about the sea.") is None
+
+
+def test_dates_do_not_break_exact_hits():
+    cache = SemanticCache(thresholds={"judge": 0.95})
+    cache.store("judge", "Today is 2024-05-01. Score this answer.", "8/10")
+    assert cache.lookup("judge", "Today is 2024-06-12. Score this answer.") == ("8/10", 1.0)
+    assert cache.stats()["roles"]["judge"]["exact_hits"] == 1
+
+
+def test_roles_without_threshold_are_never_cached():
+    cache = SemanticCache(thresholds={"reviewer": 0.9})
+    cache.store("Writer", PROMPT, "draft")
+    assert len(cache) == 0
+    assert cache.lookup("Writer", PROMPT) is None
+
+
+def test_entries_of_other_roles_are_not_served():
+    cache = SemanticCache(thresholds={"reviewer": 0.9})
+    cache.store("SEO_Reviewer", PROMPT, "seo")
+    assert cache.lookup("Legal_Reviewer", PROMPT) is None
+
+
+def test_lru_and_ttl_eviction(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(semantic_cache.time, "monotonic", lambda: now[0])
+    cache = SemanticCache(thresholds={"judge": 0.95}, max_entries=2, ttl=60)
+    cache.store("judge", "question one about pricing", "a")
+    cache.store("judge", "question two about refunds", "b")
+    cache.lookup("judge", "question one about pricing")  # one is now most recently used
+    cache.store("judge", "question three about shipping", "c")
+    assert cache.lookup("judge", "question two about refunds") is None
+    assert cache.evictions["lru"] == 1
+
+    now[0] += 61
+    assert cache.lookup("judge", "question one about pricing") is None
+    assert cache.evictions["ttl"] == 2
+    assert len(cache) == 0
+
+
+def test_role_is_disabled_when_verified_answers_disagree():
+    cache = SemanticCache(thresholds={"judge": 0.95}, min_checks=3, min_agreement=0.7)
+    cache.store("judge", PROMPT, "The post is great, no changes needed.")
+    for _ in range(3):
+        cache.record_check("judge", "The post is great, no changes needed.",
+                           "Rewrite the title and add internal links to related posts.")
+    assert not cache.enabled_for("judge")
+    assert cache.lookup("judge", PROMPT) is None
+
+
+@pytest.mark.parametrize("value, enabled", [("1", True), ("", False)])
+def test_from_env(monkeypatch, value, enabled):
+    monkeypatch.setenv("SEMANTIC_CACHE", value)
+    monkeypatch.setenv("SEMANTIC_CACHE_TTL", "5")
+    cache = SemanticCache.from_env()
+    assert (cache is not None) == enabled
+    if enabled:
+        assert cache.ttl == 5.0
@@ -0,0 +1,152 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from utils import SingleFlight, request_key
+
+
+def wait_for_calls(flight, calls, timeout=5):
+    """Wait until `calls` callers have entered flight.do (followers block inside it)."""
+    deadline = time.monotonic() + timeout
+    while flight.stats()["calls"] < calls and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    upstream = []
+
+    def call():
+        upstream.append(1)
+        started.set()
+        release.wait(5)
+        return {"content": "reply"}
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(flight.do("k", call)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(flight.do("k", call))) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    wait_for_calls(flight, 5)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert len(upstream) == 1
+    assert results == [{"content": "reply"}] * 5
+    assert flight.stats() == {"calls": 5, "upstream_calls": 1, "deduplicated": 4}
+    # Followers get copies, so mutating one reply does not change the others.
+    assert len({id(r) for r in results}) == 5
+
+
+def test_sequential_calls_are_not_cached():
+    flight = SingleFlight()
+    upstream = []
+    for _ in range(3):
+        flight.do("k", lambda: upstream.append(1))
+    assert len(upstream) == 3
+
+
+def test_errors_reach_every_waiting_caller():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def call():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("429")
+
+    errors = []
+
+    def run():
+        try:
+            flight.do("k", call)
+        except RuntimeError as exc:
+            errors.append(str(exc))
+
+    leader = threading.Thread(target=run)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=run)
+    follower.start()
+    wait_for_calls(flight, 2)
+    release.set()
+    leader.join(5)
+    follower.join(5)
+    assert errors == ["429", "429"]
+
+
+def test_async_callers_share_one_task_and_survive_a_cancelled_caller():
+    flight = SingleFlight()
+    upstream = []
+
+    async def call():
+        upstream.append(1)
+        await asyncio.sleep(0.05)
+        return "reply"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async("k", call))
+        others = [asyncio.ensure_future(flight.do_async("k", call)) for _ in range(3)]
+        await asyncio.sleep(0)
+        first.cancel()
+        results = await asyncio.gather(*others)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return results
+
+    assert asyncio.run(main()) == ["reply"] * 3
+    assert len(upstream) == 1
+
+
+def test_request_key_is_stable_and_order_insensitive_for_dicts():
+    assert request_key("m", {"a": 1, "b": 2}) == request_key("m", {"b": 2, "a": 1})
+    assert request_key("m", "x") != request_key("m", "y")
+
+
+def test_agents_that_differ_only_in_tools_do_not_share_a_call(monkeypatch):
+    from autogen import ConversableAgent
+
+    import offline
+    from utils import _agent_request_key, configure_agents, get_llm_config
+
+    monkeypatch.setenv("LLM_OFFLINE", "1")
+    tool = {"type": "function", "function": {"name": "lookup", "description": "Look up a ticker.",
+                                             "parameters": {"type": "object", "properties": {}}}}
+    plain = ConversableAgent("plain", llm_config=get_llm_config(), human_input_mode="NEVER")
+    with_tools = ConversableAgent("with_tools", llm_config={**get_llm_config(), "tools": [tool]},
+                                  human_input_mode="NEVER")
+    configure_agents(plain, with_tools)
+    prompt = [{"role": "user", "content": "Price of NVDA?"}]
+    assert _agent_request_key(plain, prompt, "gemini-2.0-flash") != _agent_request_key(
+        with_tools, prompt, "gemini-2.0-flash")
+    assert _agent_request_key(plain, prompt, "gemini-2.0-flash") == _agent_request_key(
+        ConversableAgent("other", llm_config=get_llm_config(), human_input_mode="NEVER"), prompt, "gemini-2.0-flash")
+
+    # Both calls have to reach the model at the same time: a merged call would break the barrier.
+    barrier = threading.Barrier(2, timeout=5)
+    create = offline.OfflineModelClient.create
+
+    def overlapping_create(self, params):
+        barrier.wait()
+        return create(self, params)
+
+    monkeypatch.setattr(offline.OfflineModelClient, "create", overlapping_create)
+    replies = {}
+
+    def ask(agent):
+        replies[agent.name] = agent.client.create(messages=prompt)
+
+    threads = [threading.Thread(target=ask, args=(agent,)) for agent in (plain, with_tools)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert set(replies) == {"plain", "with_tools"}
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from stock_analytics import correlation_matrix, drawdowns, normalized_returns, rolling_volatility, top_movers
+
+DAYS = pd.bdate_range("2024-01-01", periods=5)
+
+
+def prices(**columns):
+    return pd.DataFrame(columns, index=DAYS, dtype="float64")
+
+
+def test_normalized_returns_start_at_each_stocks_first_price():
+    # LATE lists on day 3; GAP misses day 2.
+    frame = prices(A=[100, 110, 99, 121, 150], LATE=[np.nan, np.nan, 20, 25, 10], GAP=[50, np.nan, 55, 60, 45])
+    result = normalized_returns(frame)
+    assert result["A"].tolist() == pytest.approx([0, 10, -1, 21, 50])
+    assert result["LATE"].iloc[:2].isna().all()
+    assert result["LATE"].iloc[2:].tolist() == pytest.approx([0, 25, -50])
+    assert np.isnan(result["GAP"].iloc[1])
+    assert result["GAP"].iloc[[0, 2, 3, 4]].tolist() == pytest.approx([0, 10, 20, -10])
+    assert normalized_returns(frame, as_percent=False)["A"].iloc[-1] == pytest.approx(0.5)
+
+
+def test_series_are_accepted():
+    result = normalized_returns(pd.Series([10.0, 12.0], index=DAYS[:2], name="A"))
+    assert list(result.columns) == ["A"]
+    assert result["A"].tolist() == pytest.approx([0, 20])
+
+
+def test_drawdowns_from_the_running_peak():
+    frame = prices(A=[100, 120, 90, 60, 130], GAP=[10, np.nan, 8, 12, 6])
+    result = drawdowns(frame)
+    assert result["A"].tolist() == pytest.approx([0, 0, -0.25, -0.5, 0])
+    assert result["A"].min() == pytest.approx(-0.5)
+    # A missing day has no drawdown, and does not reset the peak.
+    assert np.isnan(result["GAP"].iloc[1])
+    assert result["GAP"].iloc[[0, 2, 3, 4]].tolist() == pytest.approx([0, -0.2, 0, -0.5])
+
+
+def test_rolling_volatility_of_log_returns():
+    # Log returns alternate +ln 2, -ln 2: sample std over a window of 2 is ln 2 * sqrt(2).
+    frame = prices(A=[1, 2, 1, 2, 1])
+    result = rolling_volatility(frame, window=2, annualize=False)
+    assert result["A"].iloc[:2].isna().all()
+    assert result["A"].iloc[2:].tolist() == pytest.approx([np.log(2) * np.sqrt(2)] * 3)
+    annual = rolling_volatility(frame, window=2)
+    assert annual["A"].iloc[-1] == pytest.approx(np.log(2) * np.sqrt(2) * np.sqrt(252))
+
+
+def test_rolling_volatility_is_nan_while_a_window_holds_a_missing_day():
+    frame = prices(A=[1, 2, np.nan, 2, 1], B=[1, 1, 1, 1, 1])
+    result = rolling_volatility(frame, window=2, annualize=False)
+    assert result["A"].iloc[2:].isna().all()  # day 3 has no price, day 4 no return, day 5 a short window
+    assert result["B"].iloc[2:].tolist() == pytest.approx([0, 0, 0])
+
+
+def test_correlation_of_daily_returns():
+    # Returns: A +10%, -10%, +10%, -10%; B = 2 * A; C = -A.
+    a = [100, 110, 99, 108.9, 98.01]
+    frame = prices(A=a, B=[100, 120, 96, 115.2, 92.16], C=[100, 90, 99, 89.1, 98.01])
+    result = correlation_matrix(frame)
+    assert list(result.index) == list(result.columns) == ["A", "B", "C"]
+    assert result.loc["A", "B"] == pytest.approx(1)
+    assert result.loc["A", "C"] == pytest.approx(-1)
+    assert np.diag(result).tolist() == pytest.approx([1, 1, 1])
+
+
+def test_correlation_with_missing_days_uses_the_days_both_stocks_have():
+    frame = prices(A=[100, 110, 99, 108.9, 98.01], D=[100, 120, np.nan, 105.6, 84.48])
+    # D's returns are +20%, -, -, -20%: pairwise with A's +10% and -10%.
+    assert correlation_matrix(frame).loc["A", "D"] == pytest.approx(1)
+    # The fast path (no NaN) and pandas agree.
+    full = prices(A=[1, 3, 2, 5, 4], B=[2, 1, 4, 3, 6])
+    expected = full.pct_change().iloc[1:].corr()
+    pd.testing.assert_frame_equal(correlation_matrix(full), expected)
+    pd.testing.assert_frame_equal(correlation_matrix(full, method="spearman"),
+                                  full.pct_change().iloc[1:].corr(method="spearman"))
+
+
+def test_top_movers_use_first_and_last_available_prices():
+    frame = prices(A=[100, 110, 99, 121, 150], LATE=[np.nan, np.nan, 20, 25, 10], GONE=[10, 20, 30, np.nan, np.nan],
+                   EMPTY=[np.nan] * 5)
+    gainers = top_movers(frame, n=2)
+    assert gainers.index.tolist() == ["GONE", "A"]
+    assert gainers.tolist() == pytest.approx([200, 50])
+    losers = top_movers(frame, n=1, losers=True)
+    assert losers.to_dict() == pytest.approx({"LATE": -50})
+    assert "EMPTY" not in top_movers(frame, n=10).index
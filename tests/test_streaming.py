@@ -0,0 +1,23 @@
+import pytest
+from autogen.io import IOStream
+
+from streaming import QueueSink, enable_streaming, streaming_enabled
+
+
+@pytest.mark.parametrize("value, enabled", [(None, False), ("0", False), ("1", True), ("true", True)])
+def test_streaming_is_opt_in(monkeypatch, value, enabled):
+    if value is None:
+        monkeypatch.delenv("LLM_STREAM", raising=False)
+    else:
+        monkeypatch.setenv("LLM_STREAM", value)
+    assert streaming_enabled() is enabled
+
+
+def test_enable_streaming_installs_the_global_default_stream():
+    previous = IOStream.get_global_default()
+    try:
+        stream = enable_streaming(sinks=[QueueSink()])
+        assert IOStream.get_default() is stream
+        assert stream.base is previous
+    finally:
+        IOStream.set_global_default(previous)
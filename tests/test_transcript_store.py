@@ -0,0 +1,108 @@
+import json
+import os
+
+from transcript_store import LENGTH, TranscriptStore
+
+
+def fill(path, messages, segment_bytes=200):
+    """Store `messages` ({run: count}, interleaved) and return the index lines."""
+    with TranscriptStore(path, segment_bytes=segment_bytes) as store:
+        for i in range(max(messages.values())):
+            for run, count in messages.items():
+                if i < count:
+                    store.append(run, "agent", f"{run} message {i}")
+    with open(os.path.join(path, "index.jsonl")) as f:
+        return f.readlines()
+
+
+def contents(store, run):
+    return [(m.turn, m.content) for m in store.iter_run(run)]
+
+
+def expected(run, count):
+    return [(i, f"{run} message {i}") for i in range(count)]
+
+
+def test_append_read_and_segment_rollover(tmp_path):
+    fill(str(tmp_path), {"a": 6, "b": 4})
+    with TranscriptStore(str(tmp_path), segment_bytes=200) as store:
+        assert contents(store, "a") == expected("a", 6)
+        assert contents(store, "b") == expected("b", 4)
+        assert store.get("a", -1).content == "a message 5"
+        assert store.append("b", "agent", "b message 4") == 4
+    assert len([n for n in os.listdir(tmp_path) if n.startswith("segment-")]) > 2
+
+
+def test_records_missing_from_the_index_are_recovered_across_segments(tmp_path):
+    path = str(tmp_path)
+    lines = fill(path, {"a": 6, "b": 4})
+    # Crash after the segments were written but before the last five index lines were.
+    with open(os.path.join(path, "index.jsonl"), "w") as f:
+        f.writelines(lines[:5])
+    assert len({json.loads(line)[2] for line in lines[5:]}) > 1  # the lost records span segments
+
+    with TranscriptStore(path, segment_bytes=200) as store:
+        assert contents(store, "a") == expected("a", 6)
+        assert contents(store, "b") == expected("b", 4)
+    # Recovered entries are written back to the index.
+    with TranscriptStore(path, segment_bytes=200) as store:
+        assert len(store) == 10
+
+
+def test_a_gap_in_the_index_is_refilled_by_turn(tmp_path):
+    path = str(tmp_path)
+    lines = fill(path, {"a": 3, "b": 3})
+    # A lost line in the middle: later turns of "a" cannot be indexed until turn 1 is found.
+    with open(os.path.join(path, "index.jsonl"), "w") as f:
+        f.writelines(lines[:2] + lines[3:])
+
+    with TranscriptStore(path, segment_bytes=200) as store:
+        assert contents(store, "a") == expected("a", 3)
+        assert contents(store, "b") == expected("b", 3)
+        assert store.append("a", "agent", "a message 3") == 3
+
+
+def test_a_torn_trailing_record_is_cut_off(tmp_path):
+    path = str(tmp_path)
+    fill(path, {"a": 3}, segment_bytes=10_000)
+    segment = os.path.join(path, "segment-000001.log")
+    size = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        f.write(LENGTH.pack(100) + b'{"run":"a","turn":3')
+
+    with TranscriptStore(path, segment_bytes=10_000) as store:
+        assert os.path.getsize(segment) == size
+        assert store.append("a", "agent", "a message 3") == 3
+        assert contents(store, "a") == expected("a", 4)
+
+
+def test_a_torn_index_line_does_not_swallow_the_next_entry(tmp_path):
+    path = str(tmp_path)
+    lines = fill(path, {"a": 3}, segment_bytes=10_000)
+    with open(os.path.join(path, "index.jsonl"), "w") as f:
+        f.writelines(lines[:2])
+        f.write(lines[2][:10])
+
+    with TranscriptStore(path, segment_bytes=10_000, fsync=True) as store:
+        assert contents(store, "a") == expected("a", 3)
+        store.append("a", "agent", "a message 3")
+    with TranscriptStore(path, segment_bytes=10_000) as store:
+        assert contents(store, "a") == expected("a", 4)
+
+
+def test_reads_wait_for_a_remap_in_progress(tmp_path):
+    import threading
+
+    with TranscriptStore(str(tmp_path)) as store:
+        store.append("a", "agent", "a message 0")
+        assert store.get("a", 0).content == "a message 0"  # maps the segment
+        result = []
+        # Another thread remapping the segment holds the lock and closes the old map;
+        # a read must not slice that map in the meantime, even though it is big enough.
+        with store._lock:
+            reader = threading.Thread(target=lambda: result.append(store.get("a", 0).content))
+            reader.start()
+            reader.join(0.2)
+            assert reader.is_alive() and result == []
+        reader.join(5)
+        assert result == ["a message 0"]
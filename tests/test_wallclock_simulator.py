@@ -0,0 +1,92 @@
+import pytest
+
+from wallclock_simulator import (AgentSpec, NestedReviewers, RoundRobin, SequentialChats, Simulation, SingleAgent,
+                                 monte_carlo)
+
+
+def agent(name="a", latency=1.0, **kwargs):
+    """Agent whose every call takes `latency` seconds, whatever the prompt size."""
+    return AgentSpec(name, output_tokens=0, ttft_s=latency, tokens_per_s=1e12, prefill_tokens_per_s=1e12, **kwargs)
+
+
+def test_sequential_turns_add_up():
+    result = Simulation().simulate(RoundRobin([agent("a"), agent("b")], max_turns=4))
+    assert result.wall_s == pytest.approx(4.0)
+    assert [s.label for s in result.critical_path()] == ["a", "b", "a", "b"]
+
+
+def test_connection_pool_queues_calls_fifo():
+    result = Simulation(concurrency=2).simulate(SingleAgent(agent()), jobs=5)
+    # Two at a time: calls finish at 1, 1, 2, 2, 3.
+    assert result.wall_s == pytest.approx(3.0)
+    assert sorted(c.pool_wait_s for c in result.calls) == pytest.approx([0, 0, 1, 1, 2])
+    assert result.queueing()["gemini-2.0-flash"]["limiter_wait_s"] == 0
+
+
+def test_rate_limiter_allows_a_burst_then_spaces_calls():
+    # 2 RPM: a burst of two, then one call every 30s.
+    result = Simulation(rpm=2).simulate(SingleAgent(agent()), jobs=4)
+    assert sorted(c.limiter_wait_s for c in result.calls) == pytest.approx([0, 0, 30, 60])
+    assert result.wall_s == pytest.approx(61.0)
+
+
+def test_no_rate_limit_by_default():
+    result = Simulation().simulate(SingleAgent(agent()), jobs=100)
+    assert result.as_dict()["queued_s"] == pytest.approx(sum(c.pool_wait_s for c in result.calls))
+    assert all(c.limiter_wait_s == 0 for c in result.calls)
+
+
+def test_per_model_limits_override_the_default():
+    cheap = agent(model="gemini-1.5-flash-8b")
+    sim = Simulation(rpm=1000, limits={"gemini-1.5-flash-8b": (1, None)})
+    result = sim.simulate(SingleAgent(cheap), jobs=2)
+    assert sorted(c.limiter_wait_s for c in result.calls) == pytest.approx([0, 60])
+
+
+def test_arrival_interval_spreads_jobs():
+    result = Simulation(concurrency=1).simulate(SingleAgent(agent()), jobs=3, arrival_s=1.5)
+    assert result.wall_s == pytest.approx(4.0)
+    assert all(c.pool_wait_s == 0 for c in result.calls)
+
+
+def test_parallel_reviews_take_the_slowest_branch():
+    writer, meta = agent("writer"), agent("meta")
+    reviewers = [agent("r1", latency=1.0), agent("r2", latency=3.0), agent("r3", latency=2.0)]
+    sequential = Simulation().simulate(NestedReviewers(writer, reviewers, meta, summaries=False))
+    parallel = Simulation().simulate(NestedReviewers(writer, reviewers, meta, summaries=False, parallel=True))
+    # draft + reviews + meta + revision: 1 + (1 + 3 + 2) + 1 + 1 vs 1 + max(1, 3, 2) + 1 + 1
+    assert sequential.wall_s == pytest.approx(9.0)
+    assert parallel.wall_s == pytest.approx(6.0)
+    assert "r2" in [s.label for s in parallel.critical_path()]
+
+
+def test_human_time_is_on_the_critical_path():
+    stages = [{"agent": agent("info"), "turns": 2, "human_s": 8}]
+    result = Simulation().simulate(SequentialChats(stages))
+    assert result.wall_s == pytest.approx(1 + 8 + 1 + 1)  # reply, human, reply, summary
+    assert any(s.kind == "wait" for s in result.critical_path())
+
+
+def test_monte_carlo_is_reproducible_and_ordered():
+    topology = RoundRobin([agent("a"), agent("b")], max_turns=6)
+    first = monte_carlo(topology, trials=50, jitter=0.3)
+    assert first == monte_carlo(topology, trials=50, jitter=0.3)
+    assert first["wall_s_p50"] <= first["wall_s_p95"] <= first["wall_s_max"]
+
+
+def test_carryover_is_the_summary_or_the_last_reply():
+    first = AgentSpec("first", output_tokens=100, system_tokens=10)
+    second = AgentSpec("second", output_tokens=40, system_tokens=10)
+
+    def next_stage_prompt(summary):
+        stages = [{"agent": first, "summary": summary}, {"agent": second, "summary": False}]
+        result = Simulation().simulate(SequentialChats(stages, summary_tokens=60))
+        return [c.prompt_tokens for c in result.calls if c.agent == "second"]
+
+    assert next_stage_prompt(True) == [10 + 60]
+    assert next_stage_prompt(False) == [10 + 100]
+
+
+def test_at_least_one_job_is_simulated():
+    with pytest.raises(ValueError):
+        Simulation().simulate(SingleAgent(agent()), jobs=0)
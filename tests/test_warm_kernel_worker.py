@@ -0,0 +1,45 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import pytest
+
+WORKER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Coding agent", "warm_kernel_worker.py")
+
+
+@pytest.fixture
+def worker(tmp_path):
+    process = subprocess.Popen([sys.executable, "-u", WORKER, "--work-dir", str(tmp_path)], stdin=subprocess.PIPE,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    assert json.loads(process.stdout.readline())["ready"]
+    yield process
+    process.kill()
+    process.wait()
+
+
+def run(process, code, request_id=1):
+    process.stdin.write(json.dumps({"id": request_id, "code": code, "filename": "block.py"}) + "\n")
+    process.stdin.flush()
+    return json.loads(process.stdout.readline())
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX file descriptors and signals")
+def test_output_of_child_processes_and_raw_fds_is_returned_in_order(worker):
+    code = "import os, subprocess, sys\nprint('a')\nsubprocess.run([sys.executable, '-c', 'print(1)'])\nos.write(2, b'b\\n')"
+    reply = run(worker, code)
+    assert reply["exit_code"] == 0
+    assert reply["output"] == "a\n1\nb\n"
+    assert run(worker, "print('next')", 2)["output"] == "next\n"  # no leftovers from the previous block
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX signals")
+def test_sigint_between_blocks_does_not_kill_the_worker(worker):
+    run(worker, "x = 41")
+    for _ in range(20):
+        worker.send_signal(signal.SIGINT)
+        time.sleep(0.005)
+    assert worker.poll() is None
+    assert run(worker, "print(x + 1)", 2) == {"id": 2, "exit_code": 0, "output": "42\n"}
@@ -0,0 +1,343 @@
+"""
+Append-only, on-disk transcript store for team runs.
+
+`result.messages` (autogen 0.7) and `chat_history` (AG2) keep every message of a
+run as full Python objects until the script ends, and several long runs in one
+process (log_tailer.py, run_pattern.py --repeat) multiply that. The store writes
+each message to disk as it arrives and keeps only a small offset index in RAM:
+
+    <dir>/segment-000001.log   records: 4-byte little-endian length + JSON payload
+    <dir>/segment-000002.log   a new segment starts when one exceeds segment_bytes
+    <dir>/index.jsonl          one line per message: [run, turn, segment, offset, length]
+
+Segments are read through mmap, so iterating a run or fetching one turn decodes
+only the records asked for. `MessageView` (__slots__) decodes its payload on first
+access. After a crash, records missing from the index are recovered on open: every
+segment is rescanned from the last record indexed without a gap, each record is
+indexed under its own turn, and a partial trailing record is cut off.
+
+Usage:
+    store = TranscriptStore("transcripts")
+    store.append_messages("incident-42", result.messages)     # 0.7 messages
+    store.append_messages("blog-1", chat_result.chat_history)  # AG2 dicts
+    store.get("incident-42", 3).content
+    store.write_markdown("incident-42", "final_report.md", "Incident Response Report")
+
+    python transcript_store.py transcripts                     # runs and message counts
+    python transcript_store.py transcripts --show incident-42
+    python transcript_store.py transcripts --stats
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+
+LENGTH = struct.Struct("<I")
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+
+
+class MessageView:
+    """One stored message. Only run, turn and the location are kept; the payload is
+    read from the segment and decoded when a field is first accessed."""
+
+    __slots__ = ("_store", "run", "turn", "_segment", "_offset", "_length", "_data")
+
+    def __init__(self, store, run, turn, segment, offset, length):
+        self._store = store
+        self.run = run
+        self.turn = turn
+        self._segment = segment
+        self._offset = offset
+        self._length = length
+        self._data = None
+
+    def _load(self):
+        if self._data is None:
+            self._data = json.loads(self._store._read(self._segment, self._offset, self._length))
+        return self._data
+
+    @property
+    def source(self):
+        return self._load()["source"]
+
+    @property
+    def type(self):
+        return self._load()["type"]
+
+    @property
+    def content(self):
+        return self._load()["content"]
+
+    @property
+    def meta(self):
+        return self._load().get("meta", {})
+
+    def as_dict(self):
+        return dict(self._load())
+
+    def __repr__(self):
+        return f"MessageView(run={self.run!r}, turn={self.turn}, bytes={self._length})"
+
+
+def message_fields(message):
+    """(source, type, content, meta) of an autogen 0.7 message or an AG2 history dict."""
+    if isinstance(message, dict):
+        meta = {k: v for k, v in message.items() if k in ("role", "tool_calls", "tool_call_id")}
+        return message.get("name") or message.get("role", ""), "dict", message.get("content"), meta
+    meta = {}
+    usage = getattr(message, "models_usage", None)
+    if usage is not None:
+        meta["prompt_tokens"] = usage.prompt_tokens
+        meta["completion_tokens"] = usage.completion_tokens
+    return getattr(message, "source", ""), type(message).__name__, getattr(message, "content", None), meta
+
+
+class TranscriptStore:
+    """Length-prefixed, append-only segment files with an in-memory offset index.
+
+    Args:
+        path (str): Directory of the store (created if missing).
+        segment_bytes (int): Size after which a new segment file is started.
+        fsync (bool): fsync the segment and the index on every append (durable across
+            power loss, slower).
+    """
+
+    def __init__(self, path, segment_bytes=DEFAULT_SEGMENT_BYTES, fsync=False):
+        self.path = path
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._index = {}  # run -> [(segment, offset, length), ...] in turn order
+        self._maps = {}  # segment -> (mmap, mapped size)
+        terminated = self._load_index()
+        self._segment = max(self._segments(), default=1)
+        self._index_file = open(os.path.join(path, "index.jsonl"), "a", encoding="utf-8")
+        if not terminated:
+            self._index_file.write("\n")  # keep the torn line from swallowing the next entry
+        self._recover()
+        self._file = open(self._segment_path(self._segment), "ab")
+
+    # ----------------------------------------------------------------------------
+    # Files
+    # ----------------------------------------------------------------------------
+    def _segment_path(self, segment):
+        return os.path.join(self.path, f"segment-{segment:06d}.log")
+
+    def _segments(self):
+        return [int(name[8:14]) for name in os.listdir(self.path)
+                if name.startswith("segment-") and name.endswith(".log")]
+
+    def _load_index(self):
+        """Returns False if the index ends in a torn (unterminated) line."""
+        line = "\n"
+        try:
+            with open(os.path.join(self.path, "index.jsonl"), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        run, turn, segment, offset, length = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line after a crash
+                    entries = self._index.setdefault(run, [])
+                    if turn == len(entries):
+                        entries.append((segment, offset, length))
+        except FileNotFoundError:
+            pass
+        return line.endswith("\n")
+
+    def _indexed_end(self):
+        """(segment, offset) just past the last record that is indexed with no
+        unindexed record before it, counting from the first segment."""
+        sizes = {segment: os.path.getsize(self._segment_path(segment)) for segment in self._segments()}
+        segment, offset = min(sizes, default=1), 0
+        for entry in sorted(entry for entries in self._index.values() for entry in entries):
+            if entry[:2] == (segment + 1, 0) and offset == sizes.get(segment):
+                segment, offset = entry[:2]  # the previous segment was indexed to its end
+            if entry[:2] != (segment, offset):
+                break
+            offset += LENGTH.size + entry[2]
+        return segment, offset
+
+    def _recover(self):
+        """Index the records written after the last contiguously indexed one, in that
+        segment and every later one, and cut off a partial trailing record."""
+        start, start_offset = self._indexed_end()
+        recovered = False
+        for segment in sorted(s for s in self._segments() if s >= start):
+            path = self._segment_path(segment)
+            size = os.path.getsize(path)
+            offset = start_offset if segment == start else 0
+            with open(path, "rb") as f:
+                f.seek(offset)
+                while offset + LENGTH.size <= size:
+                    (length,) = LENGTH.unpack(f.read(LENGTH.size))
+                    try:
+                        record = json.loads(f.read(length))
+                    except ValueError:
+                        break  # partial (or never written) payload
+                    # Records of a run are written in turn order; earlier ones may already be indexed.
+                    if record["turn"] == len(self._index.get(record["run"], ())):
+                        self._add_to_index(record["run"], record["turn"], segment, offset, length)
+                        recovered = True
+                    offset += LENGTH.size + length
+            if offset < size:
+                os.truncate(path, offset)
+        if recovered:
+            self._flush_index()
+
+    def _flush_index(self):
+        self._index_file.flush()
+        if self.fsync:
+            os.fsync(self._index_file.fileno())
+
+    def _add_to_index(self, run, turn, segment, offset, length):
+        self._index.setdefault(run, []).append((segment, offset, length))
+        self._index_file.write(json.dumps([run, turn, segment, offset, length]) + "\n")
+
+    def _read(self, segment, offset, length):
+        start, end = offset + LENGTH.size, offset + LENGTH.size + length
+        # Lookup and slice under the lock: another reader may remap (and close) the
+        # segment's map while this one is still slicing it.
+        with self._lock:
+            mapped = self._maps.get(segment)
+            if mapped is None or mapped[1] < end:
+                # Not mapped yet, or the segment grew since: map it (again) at its current size.
+                if segment == self._segment:
+                    self._file.flush()
+                if mapped is not None:
+                    mapped[0].close()
+                with open(self._segment_path(segment), "rb") as f:
+                    size = os.fstat(f.fileno()).st_size
+                    mapped = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), size)
+                self._maps[segment] = mapped
+            return mapped[0][start:end]
+
+    # ----------------------------------------------------------------------------
+    # Writing
+    # ----------------------------------------------------------------------------
+    def append(self, run, source, content, type="TextMessage", meta=None):
+        """Store one message. Returns its turn number within the run."""
+        with self._lock:
+            turn = len(self._index.get(run, ()))
+            record = {"run": run, "turn": turn, "source": source, "type": type, "content": content}
+            if meta:
+                record["meta"] = meta
+            payload = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+            if self._file.tell() and self._file.tell() + LENGTH.size + len(payload) > self.segment_bytes:
+                self._file.close()
+                self._segment += 1
+                self._file = open(self._segment_path(self._segment), "ab")
+            offset = self._file.tell()
+            self._file.write(LENGTH.pack(len(payload)) + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            # Segment first, index second: a crash in between is repaired by _recover().
+            self._add_to_index(run, turn, self._segment, offset, len(payload))
+            self._flush_index()
+            return turn
+
+    def append_message(self, run, message):
+        source, type_, content, meta = message_fields(message)
+        return self.append(run, source, content, type_, meta)
+
+    def append_messages(self, run, messages):
+        for message in messages:
+            self.append_message(run, message)
+
+    # ----------------------------------------------------------------------------
+    # Reading
+    # ----------------------------------------------------------------------------
+    def runs(self):
+        return list(self._index)
+
+    def count(self, run):
+        return len(self._index.get(run, ()))
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._index.values())
+
+    def get(self, run, turn):
+        """MessageView of `turn` (negative counts from the end) of `run`."""
+        entries = self._index[run]
+        turn = turn + len(entries) if turn < 0 else turn
+        return MessageView(self, run, turn, *entries[turn])
+
+    def iter_run(self, run, start=0):
+        """MessageViews of a run in order. The index is not copied, so messages
+        appended while iterating are included."""
+        entries = self._index.get(run, [])
+        turn = start
+        while turn < len(entries):
+            yield MessageView(self, run, turn, *entries[turn])
+            turn += 1
+
+    def __iter__(self):
+        for run in self.runs():
+            yield from self.iter_run(run)
+
+    # ----------------------------------------------------------------------------
+    # Reports & analytics (streamed: one message in memory at a time)
+    # ----------------------------------------------------------------------------
+    def write_markdown(self, run, path, title="Transcript"):
+        """Markdown report of a run: every message with text content, by source."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"# {title}\n\n## Execution Log\n\n")
+            for message in self.iter_run(run):
+                if isinstance(message.content, str):
+                    f.write(f"### **{message.source}**\n\n{message.content}\n\n---\n\n")
+        return path
+
+    def stats(self, run=None):
+        """{source: {"messages", "chars"}} for one run or the whole store."""
+        result = {}
+        for message in self.iter_run(run) if run is not None else self:
+            entry = result.setdefault(message.source, {"messages": 0, "chars": 0})
+            entry["messages"] += 1
+            entry["chars"] += len(message.content) if isinstance(message.content, str) else 0
+        return result
+
+    def close(self):
+        with self._lock:
+            for mapped, _ in self._maps.values():
+                mapped.close()
+            self._maps.clear()
+            self._file.close()
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect a transcript store.")
+    parser.add_argument("path", help="Store directory.")
+    parser.add_argument("--show", metavar="RUN", help="Print the messages of a run.")
+    parser.add_argument("--markdown", nargs=2, metavar=("RUN", "FILE"), help="Write a run as a Markdown report.")
+    parser.add_argument("--stats", action="store_true", help="Messages and characters per source.")
+    args = parser.parse_args(argv)
+
+    with TranscriptStore(args.path) as store:
+        if args.show:
+            for message in store.iter_run(args.show):
+                print(f"[{message.turn}] {message.source} ({message.type}): {message.content}")
+        elif args.markdown:
+            print(store.write_markdown(*args.markdown))
+        elif args.stats:
+            for source, entry in sorted(store.stats().items()):
+                print(f"{source:<24}{entry['messages']:>8} messages{entry['chars']:>12} chars")
+        else:
+            for run in store.runs():
+                print(f"{run:<40}{store.count(run):>6} messages")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
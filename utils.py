@@ -1,10 +1,24 @@
 # Add your utilities or helper functions to this file.
 
+import asyncio
+import copy
+import functools
+import hashlib
+import json
 import os
-from dotenv import load_dotenv, find_dotenv
+import random
+import threading
+import time
+import weakref
+
+from metrics import get_metrics
 
 # these expect to find a .env file at the directory above the lesson.                                                                                                                     # the format for that file is (without the comment)                                                                                                                                       #API_KEYNAME=AStringThatIsTheLongAPIKeyFromSomeService                                                                                                                                     
+@functools.lru_cache(maxsize=None)
 def load_env():
+    # find_dotenv() walks up the filesystem; do it once per process.
+    from dotenv import load_dotenv, find_dotenv
+
     _ = load_dotenv(find_dotenv())
 
 
@@ -13,4 +27,838 @@ def get_gemini_api_key():
     gemini_api_key = os.getenv("GOOGLE_API_KEY")
     if not gemini_api_key:
         gemini_api_key = os.getenv("GEMINI_API_KEY")
+    if not gemini_api_key and offline_mode():
+        gemini_api_key = "offline"
     return gemini_api_key
+
+
+def offline_mode():
+    """True when LLM_OFFLINE=1: model calls are answered locally (see offline.py)."""
+    return os.getenv("LLM_OFFLINE", "").lower() in ("1", "true", "yes")
+
+
+# --------------------------------------------------------------------------------
+# Shared model-client registry
+# --------------------------------------------------------------------------------
+# One place that builds model clients for every pattern:
+#   * configuration (.env) is loaded once,
+#   * OpenAI-compatible clients (autogen_agentchat / autogen_ext) share one pooled
+#     HTTP client per endpoint,
+#   * every call goes through a token-bucket rate limiter shared by all agents that
+#     use the same endpoint and model (requests-per-minute and tokens-per-minute),
+#   * 429 / quota errors are retried with jittered exponential backoff,
+#   * byte-identical requests that are in flight at the same time share one
+#     upstream call (single-flight),
+#   * optionally, near-duplicate prompts of idempotent roles (judges, reviewers)
+#     are answered from a SemanticCache (semantic_cache.py),
+#   * optionally, a ModelRouter (model_router.py) picks the model per role and turn.
+#
+# AG2 scripts:     llm_config = get_llm_config(); ...; configure_agents(writer, critic)
+# 0.7 scripts:     model_client = get_model_client("gemini-2.0-flash-exp")
+# Offline:         LLM_OFFLINE=1 answers every call from offline.py (no key, no network).
+
+GEMINI_OPENAI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/openai/"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+# Limits per (endpoint, model), set with configure_limits() or the LLM_RPM / LLM_TPM
+# environment variables. None: not limited (quotas differ per key and tier, e.g.
+# LLM_RPM=15 for the Gemini free tier).
+DEFAULT_RPM = None
+DEFAULT_TPM = None
+
+DEFAULT_GEMINI_MODEL_INFO = {
+    "vision": True,
+    "function_calling": True,
+    "json_output": True,
+    "structured_output": True,
+    "family": "unknown",
+}
+
+
+def estimate_tokens(text):
+    """Rough token count (~4 characters per token), used for tokens-per-minute limits."""
+    return max(1, len(text) // 4) if text else 0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at `rate_per_minute`.
+
+    `reserve` always succeeds immediately and returns how long the caller must wait,
+    so waiting works the same from threads (AG2) and from asyncio (autogen 0.7).
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity or rate_per_minute
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        """Take `amount` tokens (the balance may go negative) and return seconds to wait."""
+        with self.lock:
+            self._refill()
+            self.tokens -= min(amount, self.capacity)
+            return max(0.0, -self.tokens / self.rate)
+
+    def drain(self, seconds):
+        """Push the bucket into debt so that nobody sends for `seconds` (after a 429)."""
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one endpoint/model.
+
+    A limit of None is not enforced; 429s still make every caller back off.
+    """
+
+    def __init__(self, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.paused_until = 0.0
+        self.throttled_seconds = 0.0
+        self.rate_limit_errors = 0
+
+    def _reserve(self, tokens):
+        wait = max(
+            self.requests.reserve(1) if self.requests else 0.0,
+            self.tokens.reserve(tokens) if self.tokens else 0.0,
+            self.paused_until - time.monotonic(),
+        )
+        self.throttled_seconds += wait
+        return wait
+
+    def acquire(self, tokens=0):
+        wait = self._reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=0):
+        wait = self._reserve(tokens)
+        if wait:
+            await asyncio.sleep(wait)
+
+    def penalize(self, seconds):
+        """Called on a 429: make every agent sharing this limiter back off."""
+        self.rate_limit_errors += 1
+        if self.requests:
+            self.requests.drain(seconds)
+        else:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_limits = {}
+_limiters = {}
+_registry_lock = threading.Lock()
+
+
+def configure_limits(model, rpm=None, tpm=None, base_url=GEMINI_OPENAI_BASE_URL):
+    """Set the quota for `model` on `base_url` (applies to limiters created afterwards)."""
+    _limits[(base_url, model)] = (rpm, tpm)
+
+
+def _env_limit(name, default):
+    value = os.getenv(name, "").strip()
+    return int(value) if value else default
+
+
+def get_rate_limiter(model, base_url=GEMINI_OPENAI_BASE_URL):
+    """Shared RateLimiter for (base_url, model)."""
+    key = (base_url, model)
+    with _registry_lock:
+        if key not in _limiters:
+            load_env()
+            rpm, tpm = _limits.get(key, (None, None))
+            _limiters[key] = RateLimiter(
+                rpm or _env_limit("LLM_RPM", DEFAULT_RPM),
+                tpm or _env_limit("LLM_TPM", DEFAULT_TPM),
+            )
+        return _limiters[key]
+
+
+# --------------------------------------------------------------------------------
+# Retry with jittered backoff
+# --------------------------------------------------------------------------------
+def _retry_after(exc):
+    """Status 429 -> suggested delay in seconds (0 if unknown); anything else -> None."""
+    response = getattr(exc, "response", None)
+    status = getattr(exc, "status_code", None) or getattr(response, "status_code", None) or getattr(exc, "code", None)
+    if status != 429 and "RESOURCE_EXHAUSTED" not in str(exc) and type(exc).__name__ != "RateLimitError":
+        return None
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after", 0))
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _backoff(attempt, retry_after, base_delay, max_delay):
+    # "Full jitter": spreads out agents that were throttled at the same moment.
+    return max(retry_after, random.uniform(0, min(max_delay, base_delay * 2 ** attempt)))
+
+
+def retry_with_backoff(call, retries=5, base_delay=1.0, max_delay=30.0, limiter=None, on_retry=None):
+    """Run `call()`, retrying rate-limit errors with jittered exponential backoff.
+
+    `on_retry()` is called before each retry (used for the retry metrics).
+    """
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as exc:
+            retry_after = _retry_after(exc)
+            if retry_after is None or attempt == retries:
+                raise
+            delay = _backoff(attempt, retry_after, base_delay, max_delay)
+            if limiter is not None:
+                limiter.penalize(delay)
+            if on_retry is not None:
+                on_retry()
+            time.sleep(delay)
+
+
+async def aretry_with_backoff(call, retries=5, base_delay=1.0, max_delay=30.0, limiter=None, on_retry=None):
+    """Async version of retry_with_backoff; `call` returns an awaitable."""
+    for attempt in range(retries + 1):
+        try:
+            return await call()
+        except Exception as exc:
+            retry_after = _retry_after(exc)
+            if retry_after is None or attempt == retries:
+                raise
+            delay = _backoff(attempt, retry_after, base_delay, max_delay)
+            if limiter is not None:
+                limiter.penalize(delay)
+            if on_retry is not None:
+                on_retry()
+            await asyncio.sleep(delay)
+
+
+# --------------------------------------------------------------------------------
+# Single-flight request coalescing
+# --------------------------------------------------------------------------------
+class _Flight:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs one upstream call per key at a time; concurrent callers share its result.
+
+    `do` is for threads (AG2 agents), `do_async` for asyncio (autogen 0.7 clients).
+    Only calls that overlap in time are merged - this is not a cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._tasks = {}
+        self.calls = 0
+        self.deduplicated = 0
+
+    def do(self, key, call):
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.deduplicated += 1
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            # Callers may mutate their reply (e.g. AG2 normalizes tool names).
+            return copy.deepcopy(flight.result)
+        try:
+            flight.result = call()
+            return flight.result
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+    async def do_async(self, key, call):
+        # Tasks belong to an event loop, so flights are tracked per loop.
+        task_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(task_key)
+            if task is None:
+                task = asyncio.ensure_future(call())
+                self._tasks[task_key] = task
+                task.add_done_callback(lambda _: self._tasks.pop(task_key, None))
+            else:
+                self.deduplicated += 1
+        # shield: one caller being cancelled must not cancel the others' result.
+        return await asyncio.shield(task)
+
+    def stats(self):
+        return {
+            "calls": self.calls,
+            "upstream_calls": self.calls - self.deduplicated,
+            "deduplicated": self.deduplicated,
+        }
+
+
+_single_flight = SingleFlight()
+
+
+def single_flight_stats():
+    """Counters of the process-wide single-flight layer."""
+    return _single_flight.stats()
+
+
+def request_key(*parts):
+    """Stable hash of a request description (anything json.dumps can take via `default=str`)."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --------------------------------------------------------------------------------
+# AG2 (autogen) agents
+# --------------------------------------------------------------------------------
+def get_llm_config(model=DEFAULT_MODEL, **overrides):
+    """AG2 llm_config for a Gemini model, built from the cached .env configuration.
+
+    With stream=True the OpenAI-compatible Gemini endpoint is used: AG2's native
+    Gemini client does not stream (see streaming.py).
+    In offline mode the config points at offline.OfflineModelClient.
+    """
+    if offline_mode():
+        return {
+            "config_list": [
+                {
+                    "model": model,
+                    "api_key": "offline",
+                    "model_client_cls": "OfflineModelClient",
+                    **overrides,
+                }
+            ]
+        }
+    if overrides.get("stream"):
+        return {
+            "config_list": [
+                {
+                    "model": model,
+                    "api_key": get_gemini_api_key(),
+                    "base_url": GEMINI_OPENAI_BASE_URL,
+                    **overrides,
+                }
+            ]
+        }
+    return {
+        "config_list": [
+            {
+                "model": model,
+                "api_key": get_gemini_api_key(),
+                "api_type": "google",
+                **overrides,
+            }
+        ]
+    }
+
+
+def _agent_model(agent):
+    config_list = (agent.llm_config or {}).get("config_list") or [{}]
+    return config_list[0].get("model", DEFAULT_MODEL)
+
+
+def _messages_tokens(messages):
+    return sum(estimate_tokens(str(m.get("content") or "")) for m in messages)
+
+
+def _agent_request_key(agent, prompt, model):
+    """Coalescing key: the agent's effective llm_config and the prompt.
+
+    The top-level settings (tools/functions, temperature, response_format, ...) are
+    part of the key as well as the first config_list entry, so agents that differ
+    only in those never share a reply. API keys are left out.
+    """
+    llm_config = agent.llm_config or {}
+    settings = llm_config.model_dump() if hasattr(llm_config, "model_dump") else dict(llm_config)
+    config_list = settings.pop("config_list", None) or [{}]
+    settings = {k: v for k, v in settings.items() if k != "api_key"}
+    config = {k: v for k, v in config_list[0].items() if k != "api_key"}
+    config["model"] = model
+    return request_key(
+        settings,
+        config,
+        [[m.get("role"), m.get("content"), m.get("tool_calls"), m.get("tool_responses")] for m in prompt],
+    )
+
+
+def _prompt_text(prompt):
+    return "\n".join(f"{m.get('role')}: {m.get('content') or ''}" for m in prompt)
+
+
+def _reply_text(reply):
+    """Text of a plain AG2 reply, or None for tool/function calls."""
+    if isinstance(reply, str):
+        return reply
+    if isinstance(reply, dict) and not reply.get("tool_calls") and not reply.get("function_call"):
+        content = reply.get("content")
+        return content if isinstance(content, str) else None
+    return None
+
+
+def _usage_totals(client):
+    """(prompt, completion) tokens reported so far by an OpenAIWrapper."""
+    summary = getattr(client, "total_usage_summary", None) or {}
+    usage = [v for v in summary.values() if isinstance(v, dict)]
+    return sum(u.get("prompt_tokens", 0) for u in usage), sum(u.get("completion_tokens", 0) for u in usage)
+
+
+def _usage_snapshot(client):
+    return copy.deepcopy((client.total_usage_summary, client.actual_usage_summary))
+
+
+def _add_usage_since(target, source, snapshot):
+    """Add the usage `source` reported since `snapshot` to `target`'s summaries, so
+    chat_result.cost (gathered from agent.client) includes routed calls."""
+
+    def merged(summary, before, after):
+        before = before or {}
+        for model, data in (after or {}).items():
+            if not isinstance(data, dict):
+                continue
+            old = before.get(model, {})
+            delta = {k: data.get(k, 0) - old.get(k, 0)
+                     for k in ("cost", "prompt_tokens", "completion_tokens", "total_tokens")}
+            if not any(delta.values()):
+                continue
+            summary = summary if summary is not None else {"total_cost": 0}
+            summary["total_cost"] += delta["cost"]
+            entry = summary.setdefault(model, dict.fromkeys(delta, 0))
+            for key, value in delta.items():
+                entry[key] = entry.get(key, 0) + value
+        return summary
+
+    target.total_usage_summary = merged(target.total_usage_summary, snapshot[0], source.total_usage_summary)
+    target.actual_usage_summary = merged(target.actual_usage_summary, snapshot[1], source.actual_usage_summary)
+
+
+def _routed_client(agent, model):
+    """OpenAIWrapper with the agent's configuration but another model (built once per model)."""
+    from autogen import OpenAIWrapper
+
+    clients = agent.__dict__.setdefault("_routed_clients", {})
+    if model not in clients:
+        config_list = [{**config, "model": model} for config in agent.llm_config["config_list"]]
+        clients[model] = OpenAIWrapper(**{**agent.llm_config, "config_list": config_list})
+        if offline_mode():
+            from offline import OfflineModelClient
+
+            clients[model].register_model_client(OfflineModelClient)
+    return clients[model]
+
+
+class ManagedClient:
+    """Stands in for an AG2 agent's OpenAIWrapper (`agent.client`).
+
+    Every create() goes through the shared rate limiter, the 429 retries,
+    single-flight coalescing, the optional model router and the call metrics:
+    the agent's replies, but also what AG2 calls on agent.client directly, such as
+    summary_method="reflection_with_llm" summaries. Everything else is delegated to
+    the wrapped client, so usage summaries and chat_result.cost work as before.
+
+    Args:
+        agent (ConversableAgent): Owner of the client; its name is the role.
+        client (OpenAIWrapper): The agent's own client.
+        coalesce (bool): Share one upstream call between identical concurrent requests.
+        router (ModelRouter): Choose the model per call (see configure_agents).
+    """
+
+    def __init__(self, agent, client, coalesce=True, router=None):
+        self._agent = agent
+        self._client = client
+        self.coalesce = coalesce
+        self.router = router
+
+    def __getattr__(self, name):
+        if name == "_client":
+            raise AttributeError(name)
+        return getattr(self._client, name)
+
+    def _response_text(self, response):
+        extracted = self._client.extract_text_or_completion_object(response)[0]
+        if hasattr(extracted, "model_dump"):
+            extracted = extracted.model_dump()
+        return _reply_text(extracted)
+
+    def _ask(self, model, params, tokens):
+        agent, metrics = self._agent, get_metrics()
+        client = self._client if model == _agent_model(agent) else _routed_client(agent, model)
+        limiter = get_rate_limiter(model)
+        led = False
+
+        def call():
+            limiter.acquire(tokens)
+            before = _usage_totals(client)
+            snapshot = _usage_snapshot(client) if client is not self._client else None
+            start = time.perf_counter()
+            response = client.create(**params)
+            latency = time.perf_counter() - start
+            after = _usage_totals(client)
+            if snapshot is not None:
+                _add_usage_since(self._client, client, snapshot)
+            # Reported usage if the client has it, otherwise estimates.
+            metrics.record_call(
+                agent.name, model,
+                (after[0] - before[0]) or tokens,
+                (after[1] - before[1]) or estimate_tokens(self._response_text(response) or ""),
+                latency,
+            )
+            return response
+
+        def upstream():
+            nonlocal led
+            led = True
+            return retry_with_backoff(call, limiter=limiter, on_retry=lambda: metrics.record_retry(agent.name, model))
+
+        if not self.coalesce:
+            return upstream()
+        result = _single_flight.do(_agent_request_key(agent, params.get("messages") or [], model), upstream)
+        if not led:
+            metrics.record_cache_hit(agent.name, "coalesced")
+        return result
+
+    def create(self, **params):
+        tokens = _messages_tokens(params.get("messages") or [])
+        if self.router is None:
+            return self._ask(_agent_model(self._agent), params, tokens)
+        # Cascade: start at the role's model, re-ask one tier up on low confidence.
+        name = self._agent.name
+        model, attempt = self.router.route(name, tokens), 0
+        while model is not None:
+            start = time.perf_counter()
+            response = self._ask(model, params, tokens)
+            answer = self._response_text(response)
+            model = self.router.observe(name, model, tokens, answer, time.perf_counter() - start, attempt)
+            attempt += 1
+        return response
+
+
+def _managed_oai_reply(agent, messages=None, sender=None, config=None, semantic_cache=None):
+    """Drop-in for ConversableAgent.generate_oai_reply that answers near-duplicate
+    prompts from the optional semantic cache. Model calls go through agent.client,
+    a ManagedClient."""
+    from autogen import ConversableAgent
+
+    if semantic_cache is None:
+        return ConversableAgent.generate_oai_reply(agent, messages, sender, config)
+    if agent.client is None and config is None:
+        return False, None
+    history = messages if messages is not None else agent.chat_messages.get(sender, [])
+    text = _prompt_text(agent._oai_system_message + history)
+    cached = semantic_cache.lookup(agent.name, text)
+    if cached is not None and not semantic_cache.should_verify():
+        get_metrics().record_cache_hit(agent.name, "semantic")
+        return True, copy.deepcopy(cached[0])
+
+    final, reply = ConversableAgent.generate_oai_reply(agent, messages, sender, config)
+    if final and _reply_text(reply) is not None:
+        if cached is not None:
+            semantic_cache.record_check(agent.name, _reply_text(cached[0]), _reply_text(reply))
+        else:
+            semantic_cache.store(agent.name, text, reply)
+    return final, reply
+
+
+async def _a_managed_oai_reply(agent, messages=None, sender=None, config=None, semantic_cache=None):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, functools.partial(_managed_oai_reply, agent, messages, sender, config, semantic_cache)
+    )
+
+
+def configure_agents(*agents, coalesce=True, semantic_cache=None, router=None):
+    """Route the LLM calls of AG2 agents through the shared limiter and retry policy.
+
+    agent.client is replaced by a ManagedClient, so every model call of the agent -
+    replies and reflection_with_llm summaries alike - is limited, retried, coalesced,
+    routed and recorded in the metrics.
+
+    Args:
+        coalesce (bool): Share one upstream call between identical concurrent requests.
+        semantic_cache (SemanticCache): Serve near-duplicate prompts from this cache.
+            The agent name is the role, so only agents whose name matches one of the
+            cache's thresholds (e.g. "reviewer") are cached.
+        router (ModelRouter): Choose the model per call from the agent name (role),
+            the prompt size, the budget and the latency target.
+
+    Agents without an LLM (llm_config=False) are left untouched. Register tools
+    before calling this: AG2 builds a new agent.client when a tool is registered.
+    """
+    from autogen import ConversableAgent
+
+    for agent in agents:
+        if not agent.llm_config:
+            continue
+        if isinstance(agent.client, ManagedClient):
+            agent.client = agent.client._client
+        if offline_mode():
+            from offline import OfflineModelClient
+
+            agent.register_model_client(OfflineModelClient)
+        # Wrapping the client (not only the reply function) also covers the calls
+        # AG2 makes on agent.client itself, e.g. reflection_with_llm summaries.
+        agent.client = ManagedClient(agent, agent.client, coalesce=coalesce, router=router)
+        agent.replace_reply_func(
+            ConversableAgent.generate_oai_reply,
+            functools.partial(_managed_oai_reply, semantic_cache=semantic_cache),
+        )
+        agent.replace_reply_func(
+            ConversableAgent.a_generate_oai_reply,
+            functools.partial(_a_managed_oai_reply, semantic_cache=semantic_cache),
+        )
+    return agents
+
+
+# --------------------------------------------------------------------------------
+# autogen_agentchat / autogen_ext (v0.7) model clients
+# --------------------------------------------------------------------------------
+# loop -> {base_url: client}. Weak keys: a finished loop does not keep its pools alive.
+_http_clients = weakref.WeakKeyDictionary()
+_unbound_http_clients = {}  # created outside a running loop
+
+
+async def _close_on_loop_shutdown(clients):
+    """Async generator registered with the loop; loop.shutdown_asyncgens() (called by
+    asyncio.run before the loop closes) finalizes it, which closes the clients."""
+    try:
+        yield
+    finally:
+        for client in list(clients.values()):
+            await client.aclose()
+        clients.clear()
+        # The generator references the loop (its finalizer hook): drop the entry.
+        _http_clients.pop(asyncio.get_running_loop(), None)
+
+
+def _loop_http_clients(loop):
+    entry = _http_clients.get(loop)
+    if entry is None:
+        clients = {}
+        closer = _close_on_loop_shutdown(clients)
+        # Runs up to the `yield` (no awaits before it) and registers the generator
+        # with the running loop's asyncgen hooks.
+        try:
+            closer.asend(None).send(None)
+        except StopIteration:
+            pass
+        entry = _http_clients[loop] = (clients, closer)
+    return entry[0]
+
+
+def get_http_client(base_url=GEMINI_OPENAI_BASE_URL, max_connections=20):
+    """Pooled httpx.AsyncClient shared by every model client of `base_url`.
+
+    Connections belong to an event loop, so there is one pool per (endpoint, loop).
+    The pools of a loop are closed when the loop shuts down (asyncio.run).
+    """
+    import httpx
+
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    with _registry_lock:
+        clients = _loop_http_clients(loop) if loop is not None else _unbound_http_clients
+        client = clients.get(base_url)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=httpx.Timeout(120.0, connect=10.0),
+            )
+            clients[base_url] = client
+        return client
+
+
+def _llm_messages_tokens(messages):
+    return sum(estimate_tokens(str(getattr(m, "content", "") or "")) for m in messages)
+
+
+def _llm_prompt_text(messages):
+    return "\n".join(f"{m.type}: {m.content if isinstance(m.content, str) else m.content!r}" for m in messages)
+
+
+def _client_request_key(client, messages, kwargs):
+    tools = [getattr(tool, "schema", tool) for tool in kwargs.get("tools", [])]
+    json_output = kwargs.get("json_output")
+    if isinstance(json_output, type):
+        json_output = f"{json_output.__module__}.{json_output.__qualname__}"
+    return request_key(
+        client._create_args,
+        [m.model_dump() if hasattr(m, "model_dump") else m for m in messages],
+        tools,
+        kwargs.get("tool_choice", "auto"),
+        json_output,
+        dict(kwargs.get("extra_create_args", {})),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _managed_client_class():
+    # Imported lazily: the AG2 scripts do not have autogen_ext installed.
+    from autogen_ext.models.openai import OpenAIChatCompletionClient
+
+    from offline import offline_result, offline_stream
+
+    class ManagedChatCompletionClient(OpenAIChatCompletionClient):
+        """OpenAIChatCompletionClient with the shared rate limiter and 429 retries."""
+
+        _limiter = None
+        _coalesce = True
+        _semantic_cache = None
+        _router = None
+        _role = None
+        _base_url = GEMINI_OPENAI_BASE_URL
+        _offline = False
+
+        async def create(self, messages, **kwargs):
+            cache = self._semantic_cache
+            if cache is None or kwargs.get("tools") or kwargs.get("json_output"):
+                return await self._create(messages, **kwargs)
+            text = _llm_prompt_text(messages)
+            cached = cache.lookup(self._role, text)
+            if cached is not None and not cache.should_verify():
+                get_metrics().record_cache_hit(self._agent_label, "semantic")
+                return cached[0].model_copy(update={"cached": True})
+            result = await self._create(messages, **kwargs)
+            if isinstance(result.content, str):
+                if cached is not None:
+                    cache.record_check(self._role, cached[0].content, result.content)
+                else:
+                    cache.store(self._role, text, result)
+            return result
+
+        async def _create(self, messages, **kwargs):
+            router = self._router
+            if router is None:
+                return await self._ask(self._create_args["model"], messages, kwargs)
+            # Cascade: start at the role's model, re-ask one tier up on low confidence.
+            tokens = _llm_messages_tokens(messages)
+            model, attempt = router.route(self._role, tokens), 0
+            while True:
+                start = time.perf_counter()
+                result = await self._ask(model, messages, kwargs)
+                answer = result.content if isinstance(result.content, str) else None
+                next_model = router.observe(
+                    self._role, model, result.usage.prompt_tokens or tokens, answer,
+                    time.perf_counter() - start, attempt, completion_tokens=result.usage.completion_tokens,
+                )
+                if next_model is None:
+                    return result
+                model, attempt = next_model, attempt + 1
+
+        async def _ask(self, model, messages, kwargs):
+            tokens = _llm_messages_tokens(messages)
+            limiter = self._limiter
+            if model != self._create_args["model"]:
+                # Routed call: same client and connection pool, model overridden per request.
+                kwargs = {**kwargs, "extra_create_args": {**kwargs.get("extra_create_args", {}), "model": model}}
+                limiter = get_rate_limiter(model, self._base_url)
+
+            metrics = get_metrics()
+            led = False
+
+            async def call():
+                await limiter.acquire_async(tokens)
+                start = time.perf_counter()
+                if self._offline:
+                    result = await offline_result(messages, model)
+                else:
+                    result = await OpenAIChatCompletionClient.create(self, messages, **kwargs)
+                self._record(model, result, tokens, time.perf_counter() - start)
+                return result
+
+            async def upstream():
+                nonlocal led
+                led = True
+                return await aretry_with_backoff(
+                    call, limiter=limiter, on_retry=lambda: metrics.record_retry(self._agent_label, model)
+                )
+
+            if not self._coalesce:
+                return await upstream()
+            # Identical requests from other agents (even on other clients for the
+            # same model) share this upstream call while it is in flight.
+            result = await _single_flight.do_async(_client_request_key(self, messages, kwargs), upstream)
+            if not led:
+                metrics.record_cache_hit(self._agent_label, "coalesced")
+            return result
+
+        @property
+        def _agent_label(self):
+            return self._role or "assistant"
+
+        def _record(self, model, result, tokens, latency_s):
+            usage = result.usage
+            completion = usage.completion_tokens or (
+                estimate_tokens(result.content) if isinstance(result.content, str) else 0
+            )
+            get_metrics().record_call(self._agent_label, model, usage.prompt_tokens or tokens, completion, latency_s)
+
+        async def create_stream(self, messages, **kwargs):
+            # Retrying halfway through a stream would duplicate output, so only
+            # the limiter applies here.
+            tokens = _llm_messages_tokens(messages)
+            await self._limiter.acquire_async(tokens)
+            model = self._create_args["model"]
+            start = time.perf_counter()
+            if self._offline:
+                stream = offline_stream(messages, model)
+            else:
+                stream = OpenAIChatCompletionClient.create_stream(self, messages, **kwargs)
+            async for chunk in stream:
+                if not isinstance(chunk, str):  # the final CreateResult
+                    self._record(model, chunk, tokens, time.perf_counter() - start)
+                yield chunk
+
+    return ManagedChatCompletionClient
+
+
+def get_model_client(model="gemini-2.0-flash-exp", base_url=GEMINI_OPENAI_BASE_URL, coalesce=True,
+                     semantic_cache=None, router=None, role=None, **kwargs):
+    """OpenAIChatCompletionClient for `model` using the shared pool and rate limiter.
+
+    Args:
+        coalesce (bool): Share one upstream call between identical concurrent requests.
+        semantic_cache (SemanticCache): Serve near-duplicate prompts from this cache
+            (text-only requests without tools or structured output).
+        router (ModelRouter): Choose the model per call (the client's `model` is
+            only the default).
+        role (str): Role of the agent using this client, e.g. "judge" or
+            "orchestrator"; it selects the cache threshold and the router tier.
+    """
+    kwargs.setdefault("api_key", get_gemini_api_key())
+    kwargs.setdefault("model_info", {**DEFAULT_GEMINI_MODEL_INFO, "family": model})
+    # Retries are handled (and coordinated across agents) by aretry_with_backoff.
+    kwargs.setdefault("max_retries", 0)
+    client = _managed_client_class()(
+        model=model, base_url=base_url, http_client=get_http_client(base_url), **kwargs
+    )
+    client._limiter = get_rate_limiter(model, base_url)
+    client._coalesce = coalesce
+    client._semantic_cache = semantic_cache
+    client._router = router
+    client._role = role
+    client._base_url = base_url
+    client._offline = offline_mode()
+    return client